@@ -43,7 +43,6 @@ def create_app() -> Litestar:
             plugins.alchemy,
             # db.plugin,
             # plugins.vite,
-            # plugins.saq,
             plugins.granian if settings.app.ENABLE_GRANIAN and not settings.app.DEBUG else None,  # type: ignore
         ],
         template_config=template.config,
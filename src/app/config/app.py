@@ -11,8 +11,6 @@ from litestar.config.csrf import CSRFConfig
 from litestar.logging.config import LoggingConfig, StructLoggingConfig
 from litestar.middleware.logging import LoggingMiddlewareConfig
 from litestar.plugins.structlog import StructlogConfig
-
-# from litestar_saq import CronJob, QueueConfig, SAQConfig
 from litestar_vite import ViteConfig
 
 from .base import get_settings
@@ -49,39 +47,6 @@ vite = ViteConfig(
     port=settings.vite.PORT,
     host=settings.vite.HOST,
 )
-# saq = SAQConfig(
-#     redis=settings.redis.client,
-#     web_enabled=settings.saq.WEB_ENABLED,
-#     worker_processes=settings.saq.PROCESSES,
-#     use_server_lifespan=settings.saq.USE_SERVER_LIFESPAN,
-#     queue_configs=[
-#         QueueConfig(
-#             name="system-tasks",
-#             tasks=["app.domain.system.tasks.system_task", "app.domain.system.tasks.system_upkeep"],
-#             scheduled_tasks=[
-#                 CronJob(
-#                     function="app.domain.system.tasks.system_upkeep",
-#                     unique=True,
-#                     cron="0 * * * *",
-#                     timeout=500,
-#                 ),
-#             ],
-#         ),
-#         QueueConfig(
-#             name="background-tasks",
-#             tasks=["app.domain.system.tasks.background_worker_task"],
-#             scheduled_tasks=[
-#                 CronJob(
-#                     function="app.domain.system.tasks.background_worker_task",
-#                     unique=True,
-#                     cron="* * * * *",
-#                     timeout=300,
-#                 ),
-#             ],
-#         ),
-#     ],
-# )
-
 log = StructlogConfig(
     structlog_logging_config=StructLoggingConfig(
         log_exceptions="always",
@@ -130,5 +95,7 @@ log = StructlogConfig(
     middleware_logging_config=LoggingMiddlewareConfig(
         request_log_fields=["method", "path", "path_params", "query"],
         response_log_fields=["status_code"],
+        # the middleware logs the response on every body message, streamed responses opt out
+        exclude_opt_key="exclude_from_logging",
     ),
 )
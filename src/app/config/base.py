@@ -247,27 +247,21 @@ class ServerSettings:
 
 
 @dataclass
-class SaqSettings:
-    """Server configurations."""
-
-    PROCESSES: int = field(default_factory=lambda: int(os.getenv("SAQ_PROCESSES", "1")))
-    """The number of worker processes to start.
-
-    Default is set to 1.
-    """
-    CONCURRENCY: int = field(default_factory=lambda: int(os.getenv("SAQ_CONCURRENCY", "10")))
-    """The number of concurrent jobs allowed to execute per worker process.
-
-    Default is set to 10.
-    """
-    WEB_ENABLED: bool = field(
-        default_factory=lambda: os.getenv("SAQ_WEB_ENABLED", "True") in TRUE_VALUES,
-    )
-    """If true, the worker admin UI is hosted on worker startup."""
-    USE_SERVER_LIFESPAN: bool = field(
-        default_factory=lambda: os.getenv("SAQ_USE_SERVER_LIFESPAN", "True") in TRUE_VALUES,
-    )
-    """Auto start and stop `saq` processes when starting the Litestar application."""
+class ParseQueueSettings:
+    """Background parse queue configurations."""
+
+    ENABLED: bool = field(default_factory=lambda: os.getenv("PARSE_QUEUE_ENABLED", "True") in TRUE_VALUES)
+    """Start the parse workers with the application, the jobs are still queued when disabled."""
+    WORKERS: int = field(default_factory=lambda: int(os.getenv("PARSE_QUEUE_WORKERS", "1")))
+    """Number of jobs run at once by every application process."""
+    MAX_ATTEMPTS: int = field(default_factory=lambda: int(os.getenv("PARSE_QUEUE_MAX_ATTEMPTS", "3")))
+    """Number of runs of a job before the BookText is marked as failed."""
+    RETRY_DELAY: float = field(default_factory=lambda: float(os.getenv("PARSE_QUEUE_RETRY_DELAY", "10")))
+    """Seconds before the first retry of a failed job, doubled on every further attempt."""
+    POLL_INTERVAL: float = field(default_factory=lambda: float(os.getenv("PARSE_QUEUE_POLL_INTERVAL", "2")))
+    """Seconds between two checks of an empty queue, for the jobs queued by other processes."""
+    JOB_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("PARSE_QUEUE_JOB_TIMEOUT", "600")))
+    """Seconds after which a running job is considered lost with its process and run again."""
 
 
 @dataclass
@@ -382,6 +376,52 @@ class LogSettings:
 #         return self._redis_instance
 
 
+@dataclass
+class ParserSettings:
+    """Language parser configurations."""
+
+    BATCH_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_BATCH_SIZE", "64")))
+    """Number of paragraphs sent to `nlp.pipe` at once."""
+    SPACY_PROFILE: str = field(default_factory=lambda: os.getenv("PARSER_SPACY_PROFILE", ""))
+    """Force a spacy pipeline profile (`lean` or `full`) for every language, empty uses the per-language profile."""
+    EXECUTOR: str = field(default_factory=lambda: os.getenv("PARSER_EXECUTOR", "process"))
+    """Where tokenization runs, `process` for a process pool or `thread` for low-memory deployments."""
+    POOL_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_POOL_SIZE", "2")))
+    """Number of parsing workers, every process worker loads its own models."""
+    MAX_QUEUE_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_MAX_QUEUE_SIZE", "32")))
+    """Maximum number of pending tokenize jobs, further requests are rejected until the queue drains."""
+    TOKEN_CACHE_MAX_BYTES: int = field(
+        default_factory=lambda: int(os.getenv("PARSER_TOKEN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    )
+    """Memory budget of the paragraph tokenization cache in every parsing process, 0 disables it."""
+    TAGGER_POOL_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_TAGGER_POOL_SIZE", "1")))
+    """Number of fugashi Taggers of a Japanese parser, one per concurrent caller in the `thread` executor mode."""
+    MODEL_MEMORY_BUDGET: int = field(default_factory=lambda: int(os.getenv("PARSER_MODEL_MEMORY_BUDGET", "0")))
+    """Memory in bytes the loaded models of a process may use, the least recently used are unloaded beyond it.
+
+    0 keeps every model loaded."""
+    MODEL_IDLE_TIMEOUT: float = field(default_factory=lambda: float(os.getenv("PARSER_MODEL_IDLE_TIMEOUT", "0")))
+    """Seconds after which an unused model is unloaded, 0 keeps the models loaded."""
+    WARM_UP: bool = field(default_factory=lambda: os.getenv("PARSER_WARM_UP", "True") in TRUE_VALUES)
+    """Load the parsers of the languages in the database at startup, disable it to start faster in development."""
+    STREAM_BATCH_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_STREAM_BATCH_SIZE", "8")))
+    """Number of paragraphs parsed and matched before their segments are streamed to the client."""
+    PAGE_CHUNK_SIZE: int = field(default_factory=lambda: int(os.getenv("PARSER_PAGE_CHUNK_SIZE", "32")))
+    """Number of text paragraphs stored per row of the segment index, a page only loads the chunks it covers."""
+
+
+@dataclass
+class WordIndexSettings:
+    """In-memory word index configurations."""
+
+    MODE: str = field(default_factory=lambda: os.getenv("WORD_INDEX_MODE", "full"))
+    """`full` loads the whole vocabulary of a language, `lazy` fetches only the words of the requested text."""
+    LAZY_MAX_BUCKETS: int = field(default_factory=lambda: int(os.getenv("WORD_INDEX_LAZY_MAX_BUCKETS", "20000")))
+    """Number of first_word buckets kept per language in `lazy` mode."""
+    LOOKUP_CHUNK_SIZE: int = field(default_factory=lambda: int(os.getenv("WORD_INDEX_LOOKUP_CHUNK_SIZE", "500")))
+    """Number of first words bound in one `IN` query, below the SQLite parameter limit."""
+
+
 @dataclass(kw_only=True)
 class UserDataSettings:
     USER_DATA_FOLDER: Path = field(default_factory=lambda: Path(os.getenv("USER_DATA_FOLDER", Path.cwd() / "data")))
@@ -462,8 +502,10 @@ class Settings:
     server: ServerSettings = field(default_factory=ServerSettings)
     log: LogSettings = field(default_factory=LogSettings)
     # redis: RedisSettings = field(default_factory=RedisSettings)
-    saq: SaqSettings = field(default_factory=SaqSettings)
+    parse_queue: ParseQueueSettings = field(default_factory=ParseQueueSettings)
     user_data: UserDataSettings = field(default_factory=UserDataSettings)
+    parser: ParserSettings = field(default_factory=ParserSettings)
+    word_index: WordIndexSettings = field(default_factory=WordIndexSettings)
 
     @classmethod
     def from_env(cls, dotenv_filename: str = ".env") -> Settings:
@@ -486,3 +528,15 @@ def get_settings() -> Settings:
 
 def get_user_settings() -> UserDataSettings:
     return get_settings().user_data
+
+
+def get_parser_settings() -> ParserSettings:
+    return get_settings().parser
+
+
+def get_word_index_settings() -> WordIndexSettings:
+    return get_settings().word_index
+
+
+def get_parse_queue_settings() -> ParseQueueSettings:
+    return get_settings().parse_queue
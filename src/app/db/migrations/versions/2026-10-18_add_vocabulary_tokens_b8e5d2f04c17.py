@@ -0,0 +1,143 @@
+# type: ignore
+"""add vocabulary tokens
+
+Revision ID: b8e5d2f04c17
+Revises: e6c0b9d3a7f1
+Create Date: 2026-10-18 18:02:31.417052+00:00
+
+"""
+from __future__ import annotations
+
+import json
+import unicodedata
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import GUID, ORA_JSONB, DateTimeUTC, EncryptedString, EncryptedText
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "b8e5d2f04c17"
+down_revision = "e6c0b9d3a7f1"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    op.create_table(
+        "vocabulary_tokens",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("language_id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("token", sa.Text(), nullable=False, comment="NFC normalized token string"),
+        sa.ForeignKeyConstraint(
+            ["language_id"],
+            ["languages.id"],
+            name=op.f("fk_vocabulary_tokens_language_id_languages"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_vocabulary_tokens")),
+        sa.UniqueConstraint("language_id", "token", name=op.f("uq_vocabulary_tokens_language_id_token")),
+        comment="Token strings of the languages",
+    )
+    with op.batch_alter_table("words", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "word_token_ids",
+                sa.Text(),
+                nullable=True,
+                comment="vocabulary_tokens ids of word_tokens, set by WordService",
+            )
+        )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    with op.batch_alter_table("words", schema=None) as batch_op:
+        batch_op.drop_column("word_token_ids")
+
+    op.drop_table("vocabulary_tokens")
+
+
+def _clear_tokenized_texts() -> None:
+    """the stored tokens change format, the texts are tokenized again on their next read"""
+    op.execute(sa.table("booktext_parse_caches").delete())
+    chunks = sa.table(
+        "booktext_segment_chunks",
+        sa.column("parser_name", sa.String),
+        sa.column("parser_version", sa.String),
+        sa.column("tokenized_text", sa.Text),
+    )
+    op.execute(chunks.update().values(parser_name=None, parser_version=None, tokenized_text=None))
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+    bind = op.get_bind()
+    words = sa.table(
+        "words",
+        sa.column("id", sa.Integer),
+        sa.column("language_id", sa.Integer),
+        sa.column("word_tokens", sa.Text),
+        sa.column("word_token_ids", sa.Text),
+    )
+    vocabulary_tokens = sa.table(
+        "vocabulary_tokens",
+        sa.column("id", sa.Integer),
+        sa.column("language_id", sa.Integer),
+        sa.column("token", sa.Text),
+    )
+    word_tokens = {
+        word_id: (language_id, [unicodedata.normalize("NFC", token) for token in json.loads(tokens)])
+        for word_id, language_id, tokens in bind.execute(
+            sa.select(words.c.id, words.c.language_id, words.c.word_tokens)
+        )
+    }
+    tokens = sorted({(language_id, token) for language_id, word in word_tokens.values() for token in word})
+    if tokens:
+        bind.execute(
+            vocabulary_tokens.insert(), [{"language_id": language_id, "token": token} for language_id, token in tokens]
+        )
+    token_ids = {
+        (language_id, token): token_id
+        for token_id, language_id, token in bind.execute(
+            sa.select(vocabulary_tokens.c.id, vocabulary_tokens.c.language_id, vocabulary_tokens.c.token)
+        )
+    }
+    for word_id, (language_id, word) in word_tokens.items():
+        bind.execute(
+            words.update()
+            .where(words.c.id == word_id)
+            .values(word_token_ids=json.dumps([token_ids[(language_id, token)] for token in word]))
+        )
+    _clear_tokenized_texts()
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
+    _clear_tokenized_texts()
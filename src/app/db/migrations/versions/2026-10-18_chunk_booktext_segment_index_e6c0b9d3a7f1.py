@@ -0,0 +1,127 @@
+# type: ignore
+"""chunk booktext segment index
+
+Revision ID: e6c0b9d3a7f1
+Revises: a4d81c6e2f90
+Create Date: 2026-10-18 15:27:44.903215+00:00
+
+"""
+from __future__ import annotations
+
+import warnings
+
+import sqlalchemy as sa
+from advanced_alchemy.types import GUID, ORA_JSONB, DateTimeUTC, EncryptedString, EncryptedText
+from alembic import op
+from sqlalchemy import Text  # noqa: F401
+
+__all__ = ["downgrade", "upgrade", "schema_upgrades", "schema_downgrades", "data_upgrades", "data_downgrades"]
+
+sa.GUID = GUID
+sa.DateTimeUTC = DateTimeUTC
+sa.ORA_JSONB = ORA_JSONB
+sa.EncryptedString = EncryptedString
+sa.EncryptedText = EncryptedText
+
+# revision identifiers, used by Alembic.
+revision = "e6c0b9d3a7f1"
+down_revision = "a4d81c6e2f90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            schema_upgrades()
+            data_upgrades()
+
+
+def downgrade() -> None:
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=UserWarning)
+        with op.get_context().autocommit_block():
+            data_downgrades()
+            schema_downgrades()
+
+
+def _create_segment_indexes(*columns: sa.Column) -> None:
+    op.create_table(
+        "booktext_segment_indexes",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("booktext_id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("text_hash", sa.String(length=64), nullable=False, comment="sha256 of book_text"),
+        *columns,
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.text("(CURRENT_TIMESTAMP)"), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["booktext_id"],
+            ["booktexts.id"],
+            name=op.f("fk_booktext_segment_indexes_booktext_id_booktexts"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_booktext_segment_indexes")),
+        sa.UniqueConstraint("booktext_id", name=op.f("uq_booktext_segment_indexes_booktext_id")),
+        comment="BookText segment index",
+    )
+
+
+def schema_upgrades() -> None:
+    """schema upgrade migrations go here."""
+    # the segment index is a cache of the booktexts, it is rebuilt on the next read
+    op.drop_table("booktext_segment_indexes")
+    _create_segment_indexes(
+        sa.Column("chunk_size", sa.Integer(), nullable=False, comment="number of text paragraphs of every chunk"),
+        sa.Column("total_paragraphs", sa.Integer(), nullable=False),
+    )
+    op.create_table(
+        "booktext_segment_chunks",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("booktext_id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), nullable=False),
+        sa.Column("chunk_order", sa.Integer(), nullable=False),
+        sa.Column("segments", sa.Text(), nullable=False),
+        sa.Column("parser_name", sa.String(length=40), nullable=True),
+        sa.Column("parser_version", sa.String(length=300), nullable=True),
+        sa.Column(
+            "tokenized_text",
+            sa.Text(),
+            nullable=True,
+            comment="tokenized segments of the chunk, see parser_tool.dump_tokenized_segments",
+        ),
+        sa.ForeignKeyConstraint(
+            ["booktext_id"],
+            ["booktexts.id"],
+            name=op.f("fk_booktext_segment_chunks_booktext_id_booktexts"),
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_booktext_segment_chunks")),
+        sa.UniqueConstraint(
+            "booktext_id", "chunk_order", name=op.f("uq_booktext_segment_chunks_booktext_id_chunk_order")
+        ),
+        comment="BookText segments by chunks of paragraphs",
+    )
+
+
+def schema_downgrades() -> None:
+    """schema downgrade migrations go here."""
+    op.drop_table("booktext_segment_chunks")
+    op.drop_table("booktext_segment_indexes")
+    _create_segment_indexes(
+        sa.Column("segments", sa.Text(), nullable=False),
+        sa.Column(
+            "paragraph_offsets",
+            sa.Text(),
+            nullable=False,
+            comment="index in segments of every text paragraph, in paragraph_order",
+        ),
+    )
+
+
+def data_upgrades() -> None:
+    """Add any optional data upgrade migrations here!"""
+
+
+def data_downgrades() -> None:
+    """Add any optional data downgrade migrations here!"""
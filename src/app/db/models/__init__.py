@@ -1,5 +1,24 @@
-from .book import Book, BookText
+from .book import (
+    Book,
+    BookText,
+    BookTextParseCache,
+    BookTextParseJob,
+    BookTextSegmentChunk,
+    BookTextSegmentIndex,
+)
 from .language import Language
-from .word import Word
+from .word import VocabularyToken, Word, WordIndexDeletion, WordIndexGeneration
 
-__all__ = ("Word", "Language", "Book", "BookText")
+__all__ = (
+    "Word",
+    "Language",
+    "Book",
+    "BookText",
+    "BookTextParseCache",
+    "BookTextParseJob",
+    "BookTextSegmentChunk",
+    "BookTextSegmentIndex",
+    "WordIndexDeletion",
+    "WordIndexGeneration",
+    "VocabularyToken",
+)
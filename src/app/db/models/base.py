@@ -84,6 +84,7 @@ class JSONType(TypeDecorator):
     """Represents a JSON data type."""
 
     impl = Text
+    cache_ok = True
 
     def process_bind_param(self, value, dialect):  # type: ignore
         """Convert Python object to a JSON string before storing."""
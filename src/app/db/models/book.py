@@ -1,17 +1,37 @@
 from __future__ import annotations
 
 from datetime import date, datetime
-from typing import TYPE_CHECKING
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
 
 from advanced_alchemy.base import BigIntBase
-from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, func
+from sqlalchemy import Date, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-__all__ = ["Book", "BookText"]
+from app.db.models.base import JSONType
+
+__all__ = [
+    "Book",
+    "BookText",
+    "BookTextParseCache",
+    "BookTextParseJob",
+    "BookTextSegmentChunk",
+    "BookTextSegmentIndex",
+    "ParseStatus",
+]
 if TYPE_CHECKING:
     from app.db.models.language import Language
 
 
+class ParseStatus(StrEnum):
+    """Background parsing state of a BookText and of its parse job."""
+
+    QUEUED = "queued"
+    PARSING = "parsing"
+    PARSED = "parsed"
+    FAILED = "failed"
+
+
 class Book(BigIntBase):
     """Book Model."""
 
@@ -36,7 +56,89 @@ class BookText(BigIntBase):
     ref_book_id: Mapped[Integer] = mapped_column(ForeignKey("books.id"))
     title: Mapped[str] = mapped_column(String(length=300), nullable=True)
     book_text: Mapped[str] = mapped_column(Text)
+    parse_status: Mapped[str | None] = mapped_column(
+        String(length=20), nullable=True, comment="background parsing state, see ParseStatus"
+    )
     book: Mapped[Book] = relationship(back_populates="texts", lazy="noload")
+    parse_caches: Mapped[list[BookTextParseCache]] = relationship(
+        back_populates="booktext", lazy="noload", cascade="all,delete-orphan"
+    )
+    segment_index: Mapped[BookTextSegmentIndex | None] = relationship(
+        back_populates="booktext", lazy="noload", cascade="all,delete-orphan"
+    )
+    parse_job: Mapped[BookTextParseJob | None] = relationship(
+        back_populates="booktext", lazy="noload", cascade="all,delete-orphan"
+    )
 
     def __repr__(self) -> str:
         return f"BookText(id={self.id!r}, book_text={self.book_text!r}, title={self.title!r})"
+
+
+class BookTextParseCache(BigIntBase):
+    """Tokenized BookText, stored before word matching."""
+
+    __tablename__ = "booktext_parse_caches"  # type: ignore[assignment]
+    __table_args__ = (
+        UniqueConstraint("booktext_id", "parser_name"),
+        {"comment": "Tokenized BookText cache"},
+    )
+    booktext_id: Mapped[int] = mapped_column(ForeignKey("booktexts.id", ondelete="CASCADE"))
+    parser_name: Mapped[str] = mapped_column(String(length=40))
+    parser_version: Mapped[str] = mapped_column(String(length=300))
+    text_hash: Mapped[str] = mapped_column(String(length=64), comment="sha256 of book_text")
+    tokenized_text: Mapped[list[dict[str, Any]]] = mapped_column(JSONType)
+    paragraph_hashes: Mapped[list[str]] = mapped_column(
+        JSONType, default=list, server_default="[]", comment="sha256 of every text paragraph, in order"
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    booktext: Mapped[BookText] = relationship(back_populates="parse_caches", lazy="noload")
+
+
+class BookTextSegmentIndex(BigIntBase):
+    """Paragraph count of a BookText split into ``BookTextSegmentChunk`` rows, used to read it by pages."""
+
+    __tablename__ = "booktext_segment_indexes"  # type: ignore[assignment]
+    __table_args__ = {"comment": "BookText segment index"}
+    booktext_id: Mapped[int] = mapped_column(ForeignKey("booktexts.id", ondelete="CASCADE"), unique=True)
+    text_hash: Mapped[str] = mapped_column(String(length=64), comment="sha256 of book_text")
+    chunk_size: Mapped[int] = mapped_column(Integer, comment="number of text paragraphs of every chunk")
+    total_paragraphs: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    booktext: Mapped[BookText] = relationship(back_populates="segment_index", lazy="noload")
+
+
+class BookTextSegmentChunk(BigIntBase):
+    """Markdown segments of ``chunk_size`` text paragraphs of a BookText, with their tokens once parsed.
+
+    The segments between two paragraphs belong to the chunk of the first one, the segments before the first
+    paragraph to the first chunk.
+    """
+
+    __tablename__ = "booktext_segment_chunks"  # type: ignore[assignment]
+    __table_args__ = (
+        UniqueConstraint("booktext_id", "chunk_order"),
+        {"comment": "BookText segments by chunks of paragraphs"},
+    )
+    booktext_id: Mapped[int] = mapped_column(ForeignKey("booktexts.id", ondelete="CASCADE"))
+    chunk_order: Mapped[int] = mapped_column(Integer)
+    segments: Mapped[list[dict[str, Any]]] = mapped_column(JSONType)
+    parser_name: Mapped[str | None] = mapped_column(String(length=40), nullable=True)
+    parser_version: Mapped[str | None] = mapped_column(String(length=300), nullable=True)
+    tokenized_text: Mapped[list[dict[str, Any]] | None] = mapped_column(
+        JSONType, nullable=True, comment="tokenized segments of the chunk, see parser_tool.dump_tokenized_segments"
+    )
+
+
+class BookTextParseJob(BigIntBase):
+    """Pending tokenization of a BookText, run by the workers of the parse queue."""
+
+    __tablename__ = "booktext_parse_jobs"  # type: ignore[assignment]
+    __table_args__ = {"comment": "BookText background parse jobs"}
+    booktext_id: Mapped[int] = mapped_column(ForeignKey("booktexts.id", ondelete="CASCADE"), unique=True)
+    status: Mapped[str] = mapped_column(String(length=20), default=ParseStatus.QUEUED, index=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    run_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), comment="not run before, for retry delays")
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    booktext: Mapped[BookText] = relationship(back_populates="parse_job", lazy="noload")
@@ -4,10 +4,10 @@ from datetime import datetime
 from typing import TYPE_CHECKING
 
 from advanced_alchemy.base import BigIntBase
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, UniqueConstraint, func
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-__all__ = ("Word", "WordImage")
+__all__ = ("VocabularyToken", "Word", "WordImage", "WordIndexDeletion", "WordIndexGeneration")
 
 from app.db.models.base import JSONType
 
@@ -30,9 +30,12 @@ class Word(BigIntBase):
     word_explanation: Mapped[str | None] = mapped_column(String(100))
     word_counts: Mapped[int | None] = mapped_column(Integer)
     word_tokens: Mapped[list[str]] = mapped_column(JSONType)
+    word_token_ids: Mapped[list[int] | None] = mapped_column(
+        JSONType, nullable=True, comment="vocabulary_tokens ids of word_tokens, set by WordService"
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(), server_onupdate=func.now()  # type: ignore
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True
     )
     first_word: Mapped[str] = mapped_column(String(100))
     language: Mapped["Language"] = relationship(lazy="joined")  # noqa
@@ -49,3 +52,40 @@ class WordImage(BigIntBase):
     word_image_name: Mapped[str] = mapped_column(String(100))
     word_image_path: Mapped[str] = mapped_column(String(100))
     word: Mapped[Word] = relationship(back_populates="word_image", lazy="joined")
+
+
+class WordIndexGeneration(BigIntBase):
+    """Per-language counter bumped on every Word write, workers reload their word index when it changes."""
+
+    __tablename__ = "word_index_generations"  # type: ignore[assignment]
+    __table_args__ = {"comment": "Word index generations"}
+
+    language_id: Mapped[int] = mapped_column(ForeignKey("languages.id", ondelete="CASCADE"), unique=True)
+    generation: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class WordIndexDeletion(BigIntBase):
+    """Ids of the deleted Words with the generation of their delete, so workers drop them without a full scan."""
+
+    __tablename__ = "word_index_deletions"  # type: ignore[assignment]
+    __table_args__ = {"comment": "Words deleted since the recent word index generations"}
+
+    language_id: Mapped[int] = mapped_column(ForeignKey("languages.id", ondelete="CASCADE"), index=True)
+    word_id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"))
+    generation: Mapped[int] = mapped_column(Integer)
+
+
+class VocabularyToken(BigIntBase):
+    """Id of a normalized token string of a language, the parse caches and the term trie use the ids."""
+
+    __tablename__ = "vocabulary_tokens"  # type: ignore[assignment]
+    __table_args__ = (
+        UniqueConstraint("language_id", "token"),
+        {"comment": "Token strings of the languages"},
+    )
+
+    language_id: Mapped[int] = mapped_column(ForeignKey("languages.id", ondelete="CASCADE"))
+    token: Mapped[str] = mapped_column(Text, comment="NFC normalized token string")
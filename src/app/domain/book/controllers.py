@@ -1,21 +1,31 @@
-from typing import TYPE_CHECKING, Annotated, Any
+from typing import Annotated, Any
 
 from litestar import Controller, get
 
 __all__ = ("BookController", "BookTextController")
 
-from litestar import MediaType, delete, patch, post
+from litestar import MediaType, Request, Response, delete, patch, post
 from litestar.datastructures import UploadFile
 from litestar.di import Provide
 from litestar.dto import DTOData
 from litestar.enums import RequestEncodingType
+from litestar.openapi.datastructures import ResponseSpec
 from litestar.pagination import OffsetPagination
 from litestar.params import Body, Parameter
+from litestar.response import Stream
+from litestar.serialization import encode_json
 
+from app.config.base import get_parser_settings
 from app.db.models.book import Book, BookText
 from app.db.models.word import Word
-from app.domain.book.dependencies import provides_book_service, provides_booktext_service
+from app.domain.book.dependencies import (
+    provides_book_service,
+    provides_booktext_parse_cache_service,
+    provides_booktext_segment_index_service,
+    provides_booktext_service,
+)
 from app.domain.book.dtos import (
+    COMPACT_JSON_MEDIA_TYPE,
     BookCreate,
     BookCreateDTO,
     BookDTO,
@@ -23,21 +33,26 @@ from app.domain.book.dtos import (
     BookTextCreate,
     BookTextCreateDTO,
     BookTextDTO,
+    BookTextOverlay,
+    BookTextOverlayDTO,
     BookUpdate,
-    ParsedBookText,
-    ParsedBookTextDTO,
+    ParsedBookTextPageStruct,
+    ParsedBookTextStruct,
+    encode_ndjson,
+    encode_parsed_booktext,
 )
-from app.domain.book.services import BookService, BookTextService
-from app.domain.parser import parser_tool
-from app.domain.parser.markdown_text_parser import (
-    parse_markdown,
+from app.domain.book.services import (
+    BookService,
+    BookTextParseCacheService,
+    BookTextSegmentIndexService,
+    BookTextService,
+    iter_parsed_segments,
 )
+from app.domain.parser import parser_tool
 from app.domain.word.dependencies import provides_word_service
 from app.domain.word.dtos import WordDTO
 from app.domain.word.services import WordService
-
-if TYPE_CHECKING:
-    from app.domain.parser import LanguageParser
+from app.lib.response import MSGPACK_MEDIA_TYPES, MsgPackNegotiatedResponse, negotiate_media_type
 
 
 class BookController(Controller):
@@ -96,6 +111,8 @@ class BookTextController(Controller):
     tags = ["book", "booktext"]
     dependencies = {
         "booktext_service": Provide(provides_booktext_service),
+        "booktext_parse_cache_service": Provide(provides_booktext_parse_cache_service),
+        "booktext_segment_index_service": Provide(provides_booktext_segment_index_service),
         "word_service": Provide(provides_word_service),
     }
     return_dto = BookTextDTO
@@ -117,20 +134,109 @@ class BookTextController(Controller):
         await booktext_service.update(BookText(ref_book_id=book_id, book_text=content.decode()), item_id=book_text_id)
         return f"{data.filename} successfully uploaded"
 
-    @get("/list_words", return_dto=WordDTO)
+    @get("/list_words", return_dto=WordDTO, response_class=MsgPackNegotiatedResponse)
     async def list_words(self, word_service: WordService) -> OffsetPagination[Word]:
         # collection_filter = CollectionFilter("is_multiple_words", [True])
         db_obj = await word_service.list()
         return word_service.to_dto(db_obj)
 
-    @get("/booktext/{booktext_id:int}", return_dto=ParsedBookTextDTO)
+    @get(
+        "/booktext/{booktext_id:int}",
+        responses={
+            200: ResponseSpec(
+                data_container=ParsedBookTextStruct, description="Parsed segments", generate_examples=False
+            )
+        },
+    )
     async def get_booktext(
-        self, booktext_service: BookTextService, word_service: WordService, booktext_id: int
-    ) -> ParsedBookText:
+        self,
+        request: Request,
+        booktext_service: BookTextService,
+        booktext_parse_cache_service: BookTextParseCacheService,
+        word_service: WordService,
+        booktext_id: int,
+    ) -> Response[bytes]:
+        """the parsed segments as JSON or MessagePack, ``Accept: application/vnd.lute.compact+json`` sends each
+        distinct word once"""
         db_obj: BookText = await booktext_service.get(item_id=booktext_id)
-        parser: LanguageParser = db_obj.book.language.get_parser()
-        word_index: dict[str, list[Word]] = await word_service.load_word_index(db_obj.book.language_id)
-        segmentlist = parse_markdown(db_obj.book_text)
-        res = await parser_tool.get_parsed_text_segments(segmentlist, parser, word_index)
-
-        return ParsedBookText(data=res)
+        tokenized_segments = await booktext_parse_cache_service.get_tokenized_segments(
+            db_obj, db_obj.book.language.parser_name
+        )
+        term_trie = await word_service.load_term_trie(
+            db_obj.book.language_id, parser_tool.get_token_strings(tokenized_segments)
+        )
+        res = await parser_tool.match_tokenized_segments(tokenized_segments, term_trie)
+
+        # the bodies are encoded here, litestar only serializes the application/json media types
+        headers = {"Vary": "Accept"}
+        media_type = negotiate_media_type(request, [MediaType.JSON, COMPACT_JSON_MEDIA_TYPE, *MSGPACK_MEDIA_TYPES])
+        if media_type == COMPACT_JSON_MEDIA_TYPE:
+            return Response(
+                encode_json(parser_tool.compact_parsed_segments(res)),
+                media_type=COMPACT_JSON_MEDIA_TYPE,
+                headers=headers,
+            )
+        return Response(encode_parsed_booktext(res, media_type), media_type=media_type, headers=headers)
+
+    @get("/booktext/{booktext_id:int}/page")
+    async def get_booktext_page(
+        self,
+        booktext_service: BookTextService,
+        booktext_segment_index_service: BookTextSegmentIndexService,
+        word_service: WordService,
+        booktext_id: int,
+        offset: Annotated[int, Parameter(ge=0)] = 0,
+        limit: Annotated[int, Parameter(ge=1, le=1000)] = 100,
+    ) -> ParsedBookTextPageStruct:
+        """parse and match only the text paragraphs ``offset`` to ``offset + limit`` of the booktext"""
+        db_obj: BookText = await booktext_service.get(item_id=booktext_id)
+        tokenized_segments, total_paragraphs = await booktext_segment_index_service.get_page(
+            db_obj, db_obj.book.language.parser_name, offset, limit
+        )
+        term_trie = await word_service.load_term_trie(
+            db_obj.book.language_id, parser_tool.get_token_strings(tokenized_segments)
+        )
+        res = await parser_tool.match_tokenized_segments(tokenized_segments, term_trie)
+        next_offset = offset + limit if offset + limit < total_paragraphs else None
+        return ParsedBookTextPageStruct(
+            data=[parser_tool.to_parsed_segment_struct(segment) for segment in res],
+            total_paragraphs=total_paragraphs,
+            next_offset=next_offset,
+        )
+
+    @get("/booktext/{booktext_id:int}/overlay", return_dto=BookTextOverlayDTO)
+    async def get_booktext_overlay(
+        self,
+        booktext_service: BookTextService,
+        booktext_parse_cache_service: BookTextParseCacheService,
+        word_service: WordService,
+        booktext_id: int,
+    ) -> BookTextOverlay:
+        """positions and status of the known words, to refresh a chapter after a word status change"""
+        db_obj: BookText = await booktext_service.get(item_id=booktext_id)
+        tokenized_segments = await booktext_parse_cache_service.get_tokenized_segments(
+            db_obj, db_obj.book.language.parser_name
+        )
+        term_trie = await word_service.load_term_trie(
+            db_obj.book.language_id, parser_tool.get_token_strings(tokenized_segments)
+        )
+        return BookTextOverlay(data=parser_tool.get_word_overlay(tokenized_segments, term_trie))
+
+    @get("/booktext/{booktext_id:int}/stream", media_type="application/x-ndjson", exclude_from_logging=True)
+    async def stream_booktext(
+        self,
+        booktext_service: BookTextService,
+        booktext_segment_index_service: BookTextSegmentIndexService,
+        booktext_id: int,
+    ) -> Stream:
+        """the parsed segments of the booktext as NDJSON, sent every ``PARSER_STREAM_BATCH_SIZE`` paragraphs"""
+        db_obj: BookText = await booktext_service.get(item_id=booktext_id)
+        # the chunks are built in the request session, the batches only read them
+        await booktext_segment_index_service.get_segment_index(db_obj)
+        segments = iter_parsed_segments(
+            db_obj,
+            db_obj.book.language.parser_name,
+            db_obj.book.language_id,
+            get_parser_settings().STREAM_BATCH_SIZE,
+        )
+        return Stream(encode_ndjson(segments), media_type="application/x-ndjson")
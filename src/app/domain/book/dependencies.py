@@ -7,11 +7,19 @@ from typing import TYPE_CHECKING
 from sqlalchemy import select
 from sqlalchemy.orm import joinedload, noload, selectinload
 
-from app.db.models.book import Book, BookText
-from app.domain.book.services import BookService, BookTextService
+from app.db.models.book import Book, BookText, BookTextParseCache, BookTextSegmentIndex
+from app.domain.book.services import (
+    BookService,
+    BookTextParseCacheService,
+    BookTextSegmentIndexService,
+    BookTextService,
+)
 
 __all__ = [
     "provides_book_service",
+    "provides_booktext_service",
+    "provides_booktext_parse_cache_service",
+    "provides_booktext_segment_index_service",
 ]
 
 if TYPE_CHECKING:
@@ -47,3 +55,25 @@ async def provides_booktext_service(db_session: AsyncSession) -> AsyncGenerator[
         statement=select(BookText).options(joinedload(BookText.book).options(joinedload(Book.language))),
     ) as service:
         yield service
+
+
+async def provides_booktext_parse_cache_service(
+    db_session: AsyncSession,
+) -> AsyncGenerator[BookTextParseCacheService, None]:
+    """Construct repository and service objects for the request."""
+    async with BookTextParseCacheService.new(
+        session=db_session,
+        statement=select(BookTextParseCache),
+    ) as service:
+        yield service
+
+
+async def provides_booktext_segment_index_service(
+    db_session: AsyncSession,
+) -> AsyncGenerator[BookTextSegmentIndexService, None]:
+    """Construct repository and service objects for the request."""
+    async with BookTextSegmentIndexService.new(
+        session=db_session,
+        statement=select(BookTextSegmentIndex),
+    ) as service:
+        yield service
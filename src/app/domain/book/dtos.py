@@ -1,12 +1,21 @@
+from collections.abc import AsyncIterator
 from dataclasses import dataclass
 from datetime import date, datetime
 
+import msgspec
 from advanced_alchemy.extensions.litestar.dto import SQLAlchemyDTO
 from litestar.dto import DataclassDTO
 
 from app.db.models.book import Book, BookText
-from app.domain.parser.markdown_text_parser import BaseSegment, ParsedTextSegment
+from app.domain.parser import parser_tool
+from app.domain.parser.markdown_text_parser import (
+    BaseSegment,
+    ParsedTextSegment,
+    ParsedTextSegmentStruct,
+    WordOverlay,
+)
 from app.lib import dto
+from app.lib.response import MSGPACK_MEDIA_TYPES, encode_msgpack
 
 __all__ = [
     "BookCreate",
@@ -18,22 +27,53 @@ __all__ = [
     "BookTextCreate",
     "BaseSegment",
     "ParsedTextSegment",
-    "ParsedBookTextDTO",
-    "ParsedBookText",
+    "ParsedBookTextPageStruct",
+    "BookTextOverlay",
+    "BookTextOverlayDTO",
     "BookPatchDTO",
     "BookTextCreateDTO",
+    "COMPACT_JSON_MEDIA_TYPE",
+    "ParsedBookTextStruct",
+    "encode_ndjson",
+    "encode_parsed_booktext",
 ]
 
+COMPACT_JSON_MEDIA_TYPE = "application/vnd.lute.compact+json"
+"""media type of the dictionary encoded ParsedBookTextStruct, see ``parser_tool.compact_parsed_segments``"""
+
+
+class ParsedBookTextStruct(msgspec.Struct):
+    data: list[ParsedTextSegmentStruct]
+
+
+_parsed_booktext_encoder = msgspec.json.Encoder()
+
+
+def encode_parsed_booktext(segments: list[ParsedTextSegment], media_type: str = "application/json") -> bytes:
+    """the JSON of ParsedBookTextStruct, the segments are converted and encoded by msgspec without a DTO transfer
+
+    the MessagePack media types get the same document as MessagePack
+    """
+    booktext = ParsedBookTextStruct(data=[parser_tool.to_parsed_segment_struct(segment) for segment in segments])
+    if media_type in MSGPACK_MEDIA_TYPES:
+        return encode_msgpack(booktext)
+    return _parsed_booktext_encoder.encode(booktext)
+
+
+class ParsedBookTextPageStruct(msgspec.Struct, rename="camel"):
+    data: list[ParsedTextSegmentStruct]
+    total_paragraphs: int
+    next_offset: int | None
+    """paragraph offset of the next page, None on the last page"""
+
 
 @dataclass
-class ParsedBookText:
-    data: list[ParsedTextSegment]
+class BookTextOverlay:
+    data: list[WordOverlay]
 
 
-class ParsedBookTextDTO(DataclassDTO[ParsedBookText]):
-    config = dto.config(
-        max_nested_depth=4,
-    )
+class BookTextOverlayDTO(DataclassDTO[BookTextOverlay]):
+    config = dto.config(max_nested_depth=1)
 
 
 class BookDTO(SQLAlchemyDTO[Book]):
@@ -41,7 +81,7 @@ class BookDTO(SQLAlchemyDTO[Book]):
 
 
 class BookTextDTO(SQLAlchemyDTO[BookText]):
-    config = dto.config(exclude={"book"})
+    config = dto.config(exclude={"book", "parse_caches", "segment_index", "parse_job"})
 
 
 # input
@@ -91,3 +131,9 @@ class BookPatchDTO(DataclassDTO[BookUpdate]):
 
 class BookTextCreateDTO(DataclassDTO[BookTextCreate]):
     config = dto.config()
+
+
+async def encode_ndjson(segments: AsyncIterator[ParsedTextSegment]) -> AsyncIterator[bytes]:
+    """one ``ParsedTextSegmentStruct`` JSON document per line, the segments of ``encode_parsed_booktext``"""
+    async for segment in segments:
+        yield _parsed_booktext_encoder.encode(parser_tool.to_parsed_segment_struct(segment)) + b"\n"
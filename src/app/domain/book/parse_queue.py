@@ -0,0 +1,258 @@
+"""Background parsing of the BookTexts, so the first reader of a chapter does not pay for the tokenization.
+
+Creating or updating a BookText queues a ``BookTextParseJob`` row in the transaction of the write. Every
+application process runs ``PARSE_QUEUE_WORKERS`` asyncio workers which claim the due jobs with a conditional
+update, so a job runs once even with several processes on the same database, and fill the parse cache and
+the segment index of the text through the parse executor. A failed job is retried with an exponential delay
+up to ``PARSE_QUEUE_MAX_ATTEMPTS`` runs and a job left running by a dead process is claimed again after
+``PARSE_QUEUE_JOB_TIMEOUT``. The state of the job is mirrored in ``BookText.parse_status`` for the reader.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from sqlalchemy import and_, event, insert, or_, select, update
+from sqlalchemy.orm import joinedload
+
+from app.config.base import get_parse_queue_settings
+from app.db.models.book import Book, BookText, BookTextParseJob, ParseStatus
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import ColumnElement
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Session
+
+__all__ = ("ParseQueue", "enqueue_parse_jobs", "get_parse_queue", "start_parse_queue", "stop_parse_queue")
+
+logger = structlog.get_logger()
+
+
+def _now() -> datetime:
+    return datetime.now(UTC)
+
+
+async def enqueue_parse_jobs(session: AsyncSession, booktext_ids: Iterable[int]) -> None:
+    """queue the parsing of the booktexts in the current transaction, the queued or failed jobs start over
+
+    the workers of this process are woken up once the transaction is committed
+    """
+    booktext_ids = list(booktext_ids)
+    if not booktext_ids:
+        return
+    now = _now()
+    existing = set(
+        await session.scalars(
+            select(BookTextParseJob.booktext_id).where(BookTextParseJob.booktext_id.in_(booktext_ids))
+        )
+    )
+    if existing:
+        await session.execute(
+            update(BookTextParseJob)
+            .where(BookTextParseJob.booktext_id.in_(existing))
+            .values(status=ParseStatus.QUEUED, attempts=0, last_error=None, run_at=now, started_at=None)
+        )
+    if new_ids := [booktext_id for booktext_id in booktext_ids if booktext_id not in existing]:
+        await session.execute(
+            insert(BookTextParseJob),
+            [
+                {"booktext_id": booktext_id, "status": ParseStatus.QUEUED, "attempts": 0, "run_at": now}
+                for booktext_id in new_ids
+            ],
+        )
+    await session.execute(update(BookText).where(BookText.id.in_(booktext_ids)).values(parse_status=ParseStatus.QUEUED))
+    event.listen(session.sync_session, "after_commit", _notify_parse_queue, once=True)
+
+
+def _notify_parse_queue(session: Session) -> None:
+    get_parse_queue().notify()
+
+
+@dataclass
+class ClaimedJob:
+    id: int
+    booktext_id: int
+    attempts: int
+    started_at: datetime
+
+
+class ParseQueue:
+    """Workers running the ``BookTextParseJob`` of the database in the event loop of the application."""
+
+    def __init__(
+        self,
+        workers: int = 1,
+        max_attempts: int = 3,
+        retry_delay: float = 10.0,
+        poll_interval: float = 2.0,
+        job_timeout: float = 600.0,
+    ) -> None:
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self._tasks: list[asyncio.Task[None]] = []
+        self._wakeup = asyncio.Event()
+
+    def notify(self) -> None:
+        """wake up the idle workers of this process, the other processes find the job when they poll"""
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work(), name=f"parse-queue-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                ran = await self.run_next()
+            except Exception:
+                logger.exception("Parse queue worker failed")
+                ran = False
+            if not ran:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+
+    async def run_next(self) -> bool:
+        """claim and run one due job, False when there is none"""
+        from app.config.app import alchemy
+
+        async with alchemy.get_session() as session:
+            job = await self._claim(session)
+            if job is None:
+                return False
+            try:
+                await self._parse(session, job.booktext_id)
+            except Exception as e:  # noqa: BLE001
+                await session.rollback()
+                await self._fail(session, job, e)
+            else:
+                await self._finish(session, job, ParseStatus.PARSED)
+        return True
+
+    def _due(self, now: datetime) -> ColumnElement[bool]:
+        return or_(
+            and_(BookTextParseJob.status == ParseStatus.QUEUED, BookTextParseJob.run_at <= now),
+            and_(
+                BookTextParseJob.status == ParseStatus.PARSING,
+                BookTextParseJob.started_at < now - timedelta(seconds=self.job_timeout),
+            ),
+        )
+
+    async def _claim(self, session: AsyncSession) -> ClaimedJob | None:
+        now = _now()
+        candidates = await session.execute(
+            select(BookTextParseJob.id, BookTextParseJob.booktext_id, BookTextParseJob.attempts)
+            .where(self._due(now))
+            .order_by(BookTextParseJob.run_at)
+            .limit(self.workers + 1)
+        )
+        for job_id, booktext_id, attempts in candidates.all():
+            result = await session.execute(
+                update(BookTextParseJob)
+                .where(BookTextParseJob.id == job_id, self._due(now))
+                .values(status=ParseStatus.PARSING, attempts=attempts + 1, started_at=now)
+            )
+            if result.rowcount == 1:  # type: ignore[attr-defined]
+                await session.execute(
+                    update(BookText).where(BookText.id == booktext_id).values(parse_status=ParseStatus.PARSING)
+                )
+                await session.commit()
+                return ClaimedJob(job_id, booktext_id, attempts + 1, now)
+        await session.rollback()
+        return None
+
+    @staticmethod
+    async def _parse(session: AsyncSession, booktext_id: int) -> None:
+        from app.domain.book.services import BookTextParseCacheService, BookTextSegmentIndexService
+
+        booktext = await session.scalar(
+            select(BookText)
+            .where(BookText.id == booktext_id)
+            .options(joinedload(BookText.book).options(joinedload(Book.language)))
+        )
+        if booktext is None:
+            return
+        async with BookTextParseCacheService.new(session) as parse_cache_service:
+            tokenized_segments = await parse_cache_service.get_tokenized_segments(
+                booktext, booktext.book.language.parser_name
+            )
+        async with BookTextSegmentIndexService.new(session) as segment_index_service:
+            await segment_index_service.store_tokenized_segments(
+                booktext, booktext.book.language.parser_name, tokenized_segments
+            )
+
+    async def _finish(
+        self,
+        session: AsyncSession,
+        job: ClaimedJob,
+        status: ParseStatus,
+        last_error: str | None = None,
+        run_at: datetime | None = None,
+    ) -> None:
+        """store the outcome unless the text was queued again while the job was running"""
+        values: dict[str, Any] = {"status": status, "last_error": last_error}
+        if run_at is not None:
+            values["run_at"] = run_at
+        result = await session.execute(
+            update(BookTextParseJob)
+            .where(
+                BookTextParseJob.id == job.id,
+                BookTextParseJob.status == ParseStatus.PARSING,
+                BookTextParseJob.started_at == job.started_at,
+            )
+            .values(**values)
+        )
+        if result.rowcount == 1:  # type: ignore[attr-defined]
+            await session.execute(update(BookText).where(BookText.id == job.booktext_id).values(parse_status=status))
+        await session.commit()
+
+    async def _fail(self, session: AsyncSession, job: ClaimedJob, error: Exception) -> None:
+        logger.warning("Parse job failed", booktext_id=job.booktext_id, attempts=job.attempts, error=repr(error))
+        if job.attempts >= self.max_attempts:
+            await self._finish(session, job, ParseStatus.FAILED, repr(error))
+        else:
+            run_at = _now() + timedelta(seconds=self.retry_delay * 2 ** (job.attempts - 1))
+            await self._finish(session, job, ParseStatus.QUEUED, repr(error), run_at)
+
+
+_parse_queue: ParseQueue | None = None
+
+
+def get_parse_queue() -> ParseQueue:
+    global _parse_queue  # noqa: PLW0603
+    if _parse_queue is None:
+        settings = get_parse_queue_settings()
+        _parse_queue = ParseQueue(
+            workers=settings.WORKERS,
+            max_attempts=settings.MAX_ATTEMPTS,
+            retry_delay=settings.RETRY_DELAY,
+            poll_interval=settings.POLL_INTERVAL,
+            job_timeout=settings.JOB_TIMEOUT,
+        )
+    return _parse_queue
+
+
+def start_parse_queue() -> None:
+    if get_parse_queue_settings().ENABLED:
+        get_parse_queue().start()
+
+
+async def stop_parse_queue() -> None:
+    if _parse_queue is not None:
+        await _parse_queue.stop()
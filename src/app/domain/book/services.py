@@ -1,19 +1,51 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import hashlib
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from app.db.models.book import Book, BookText
+from advanced_alchemy.exceptions import IntegrityError
+from sqlalchemy import delete, select, update
+
+from app.config.base import get_parser_settings
+from app.db.models.book import Book, BookText, BookTextParseCache, BookTextSegmentChunk, BookTextSegmentIndex
+from app.domain.book.parse_queue import enqueue_parse_jobs
+from app.domain.parser import parser_tool
+from app.domain.parser.executor import get_parse_executor
+from app.domain.parser.markdown_text_parser import (
+    TextRawParagraphSegment,
+    TokenizedParagraphSegment,
+    parse_markdown,
+)
+from app.domain.word.services import WordService
+from app.domain.word.vocabulary_manager import vocabulary_manager
 from app.lib.repository import SQLAlchemyAsyncRepository
 from app.lib.service import SQLAlchemyAsyncRepositoryService
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import AsyncIterator, Iterable
 
+    from sqlalchemy.ext.asyncio import AsyncSession
     from sqlalchemy.orm import InstrumentedAttribute
 
     from app.domain.book.dtos import BookTextCreate
+    from app.domain.parser.markdown_text_parser import ParsedTextSegment, Segment, TokenizedSegment, WordToken
+
+__all__ = [
+    "BookService",
+    "BookTextService",
+    "BookTextParseCacheService",
+    "BookTextSegmentIndexService",
+    "get_paragraph_page",
+    "hash_book_text",
+    "iter_parsed_segments",
+    "split_paragraph_chunks",
+]
+
+SegmentT = TypeVar("SegmentT", "Segment", "TokenizedSegment")
 
-__all__ = ["BookService", "BookTextService"]
+
+def hash_book_text(book_text: str) -> str:
+    return hashlib.sha256(book_text.encode()).hexdigest()
 
 
 class BookRepository(SQLAlchemyAsyncRepository[Book]):
@@ -28,6 +60,18 @@ class BookTextRepository(SQLAlchemyAsyncRepository[BookText]):
     model_type = BookText
 
 
+class BookTextParseCacheRepository(SQLAlchemyAsyncRepository[BookTextParseCache]):
+    """BookTextParseCache SQLAlchemy Repository."""
+
+    model_type = BookTextParseCache
+
+
+class BookTextSegmentIndexRepository(SQLAlchemyAsyncRepository[BookTextSegmentIndex]):
+    """BookTextSegmentIndex SQLAlchemy Repository."""
+
+    model_type = BookTextSegmentIndex
+
+
 class BookService(SQLAlchemyAsyncRepositoryService[Book]):
     """Handles database operations for users."""
 
@@ -42,7 +86,10 @@ class BookService(SQLAlchemyAsyncRepositoryService[Book]):
         book = await super().create(data=book_obj, auto_commit=False)
         for content in contents:
             book.texts.append(BookText(ref_book_id=book.id, book_text=content.book_text, title=content.book_title))
-        return await self.update(item_id=book.id, data=book)
+        book = await self.update(item_id=book.id, data=book)
+        await enqueue_parse_jobs(self.repository.session, [booktext.id for booktext in book.texts])
+        await self.repository.session.commit()
+        return book
 
     async def create(
         self,
@@ -96,7 +143,9 @@ class BookTextService(SQLAlchemyAsyncRepositoryService[BookText]):
         auto_refresh: bool | None = None,
     ) -> BookText:
         db_obj = await self.to_model(data, "create")
-        return await super().create(data=db_obj, auto_commit=auto_commit)
+        db_obj = await super().create(data=db_obj, auto_commit=False)
+        await self.enqueue_parse(db_obj, auto_commit=auto_commit)
+        return db_obj
 
     async def update(
         self,
@@ -110,7 +159,295 @@ class BookTextService(SQLAlchemyAsyncRepositoryService[BookText]):
         id_attribute: str | InstrumentedAttribute | None = None,
     ) -> BookText:
         db_obj = await self.to_model(data, "update")
-        return await super().update(item_id=item_id, data=db_obj, auto_commit=auto_commit)
+        # a modified persistent instance must not be flushed before its stored text is read
+        with self.repository.session.no_autoflush:
+            previous_text = await self.repository.session.scalar(
+                select(BookText.book_text).where(BookText.id == (db_obj.id if item_id is None else item_id))
+            )
+        # the parse caches are kept, the next read re-tokenizes only the changed paragraphs
+        db_obj = await super().update(item_id=item_id, data=db_obj, auto_commit=False)
+        if db_obj.book_text != previous_text:
+            await self.enqueue_parse(db_obj, auto_commit=auto_commit)
+        elif auto_commit:
+            await self.repository.session.commit()
+        return db_obj
+
+    async def enqueue_parse(self, db_obj: BookText, auto_commit: bool | None = None) -> None:
+        """tokenize the text in the background, before its first read"""
+        await enqueue_parse_jobs(self.repository.session, [db_obj.id])
+        if auto_commit:
+            await self.repository.session.commit()
 
     async def to_model(self, data: BookText | dict[str, Any], operation: str | None = None) -> BookText:
         return await super().to_model(data, operation)
+
+
+class BookTextParseCacheService(SQLAlchemyAsyncRepositoryService[BookTextParseCache]):
+    """Keeps the tokenized BookText, so a read only has to run the word matching."""
+
+    repository_type = BookTextParseCacheRepository
+
+    def __init__(self, **repo_kwargs: Any) -> None:
+        self.repository: BookTextParseCacheRepository = self.repository_type(**repo_kwargs)
+        self.model_type = self.repository.model_type
+
+    async def get_tokenized_segments(self, booktext: BookText, parser_name: str) -> list[TokenizedSegment]:
+        """Load the tokenized segments of the booktext, tokenize and store them on a cache miss.
+
+        The cache entry is only used as is when both the sha256 of the text and the parser version match.
+        After an edit, the paragraphs whose sha256 is still in ``paragraph_hashes`` are reused and only the
+        changed ones are tokenized, upgrading the spacy model / unidic dictionary re-tokenizes everything.
+        The tokenization runs in the parse executor, off the event loop. The tokens are stored as the ids of the
+        vocabulary of the language of the book.
+        """
+        parse_executor = get_parse_executor()
+        session = self.repository.session
+        language_id = await _get_language_id(session, booktext)
+        text_hash = hash_book_text(booktext.book_text)
+        parser_version = await parse_executor.get_parser_version(parser_name)
+        db_obj = await self.get_one_or_none(booktext_id=booktext.id, parser_name=parser_name)
+        if db_obj is not None and db_obj.text_hash == text_hash and db_obj.parser_version == parser_version:
+            return await vocabulary_manager.load_tokenized_segments(session, language_id, db_obj.tokenized_text)
+
+        segmentlist = parse_markdown(booktext.book_text)
+        texts = [segment.segment_value for segment in segmentlist if isinstance(segment, TextRawParagraphSegment)]
+        paragraph_hashes = [hash_book_text(text) for text in texts]
+        paragraphs: dict[str, list[list[WordToken]]] = {}
+        if db_obj is not None and db_obj.parser_version == parser_version:
+            cached_paragraphs = [
+                segment.segment_value
+                for segment in await vocabulary_manager.load_tokenized_segments(
+                    session, language_id, db_obj.tokenized_text
+                )
+                if isinstance(segment, TokenizedParagraphSegment)
+            ]
+            paragraphs.update(zip(db_obj.paragraph_hashes, cached_paragraphs, strict=False))
+        missing = [i for i, paragraph_hash in enumerate(paragraph_hashes) if paragraph_hash not in paragraphs]
+        if missing:
+            tokenized_paragraphs = await parse_executor.split_sentences_and_tokenize_many(
+                parser_name, [texts[i] for i in missing]
+            )
+            for i, sentences in zip(missing, tokenized_paragraphs, strict=True):
+                paragraphs[paragraph_hashes[i]] = sentences
+        tokenized_segments = parser_tool.assemble_tokenized_segments(
+            segmentlist, [paragraphs[paragraph_hash] for paragraph_hash in paragraph_hashes]
+        )
+
+        # the new tokens are added to the vocabulary outside of the savepoint of the insert
+        tokenized_text = await vocabulary_manager.dump_tokenized_segments(session, language_id, tokenized_segments)
+        if db_obj is None:
+            try:
+                async with session.begin_nested():
+                    await self.create(
+                        {
+                            "booktext_id": booktext.id,
+                            "parser_name": parser_name,
+                            "parser_version": parser_version,
+                            "text_hash": text_hash,
+                            "paragraph_hashes": paragraph_hashes,
+                            "tokenized_text": tokenized_text,
+                        },
+                        auto_commit=False,
+                    )
+            except IntegrityError:
+                # the parse queue or a concurrent read stored the tokens first, their entry is kept
+                pass
+            await session.commit()
+        else:
+            db_obj.parser_version = parser_version
+            db_obj.text_hash = text_hash
+            db_obj.paragraph_hashes = paragraph_hashes
+            db_obj.tokenized_text = tokenized_text
+            await self.update(item_id=db_obj.id, data=db_obj, auto_commit=True)
+        return tokenized_segments
+
+
+class BookTextSegmentIndexService(SQLAlchemyAsyncRepositoryService[BookTextSegmentIndex]):
+    """Keeps the markdown segments of a BookText by chunks of paragraphs, so a page is read without parsing the text."""
+
+    repository_type = BookTextSegmentIndexRepository
+
+    def __init__(self, **repo_kwargs: Any) -> None:
+        self.repository: BookTextSegmentIndexRepository = self.repository_type(**repo_kwargs)
+        self.model_type = self.repository.model_type
+
+    async def get_segment_index(self, booktext: BookText) -> BookTextSegmentIndex:
+        """Load the segment index of the booktext, split the text again in chunks when it or the chunk size changed."""
+        text_hash = hash_book_text(booktext.book_text)
+        chunk_size = get_parser_settings().PAGE_CHUNK_SIZE
+        db_obj = await self.get_one_or_none(booktext_id=booktext.id)
+        if db_obj is not None and db_obj.text_hash == text_hash and db_obj.chunk_size == chunk_size:
+            return db_obj
+
+        segmentlist = parse_markdown(booktext.book_text)
+        session = self.repository.session
+        data = {
+            "booktext_id": booktext.id,
+            "text_hash": text_hash,
+            "chunk_size": chunk_size,
+            "total_paragraphs": sum(isinstance(segment, TextRawParagraphSegment) for segment in segmentlist),
+        }
+        try:
+            async with session.begin_nested():
+                await session.execute(
+                    delete(BookTextSegmentChunk).where(BookTextSegmentChunk.booktext_id == booktext.id)
+                )
+                session.add_all(
+                    BookTextSegmentChunk(
+                        booktext_id=booktext.id, chunk_order=chunk_order, segments=parser_tool.dump_segments(chunk)
+                    )
+                    for chunk_order, chunk in enumerate(split_paragraph_chunks(segmentlist, chunk_size))
+                )
+                if db_obj is None:
+                    db_obj = await self.create(data, auto_commit=False)
+                else:
+                    db_obj = await self.update(item_id=db_obj.id, data=data, auto_commit=False)
+        except IntegrityError:
+            # the parse queue or a concurrent read split the same text first, its chunks are read instead
+            db_obj = await self.get_one(booktext_id=booktext.id)
+            if db_obj.text_hash != text_hash or db_obj.chunk_size != chunk_size:
+                raise
+        await session.commit()
+        return db_obj
+
+    async def get_page(
+        self, booktext: BookText, parser_name: str, offset: int, limit: int
+    ) -> tuple[list[TokenizedSegment], int]:
+        """the tokenized segments of the paragraphs ``offset`` to ``offset + limit`` and the number of paragraphs
+
+        Only the chunks covering the page are loaded. Their tokens are used when they were stored with the current
+        parser version, by a previous read or by ``store_tokenized_segments``, otherwise the chunk is tokenized
+        and its tokens are stored.
+        """
+        parse_executor = get_parse_executor()
+        session = self.repository.session
+        language_id = await _get_language_id(session, booktext)
+        segment_index = await self.get_segment_index(booktext)
+        chunk_size = segment_index.chunk_size
+        last_chunk = max(segment_index.total_paragraphs - 1, 0) // chunk_size
+        first_chunk = min(offset // chunk_size, last_chunk)
+        chunks = await session.scalars(
+            select(BookTextSegmentChunk)
+            .where(
+                BookTextSegmentChunk.booktext_id == booktext.id,
+                BookTextSegmentChunk.chunk_order.between(
+                    first_chunk, min((offset + limit - 1) // chunk_size, last_chunk)
+                ),
+            )
+            .order_by(BookTextSegmentChunk.chunk_order)
+        )
+        parser_version = await parse_executor.get_parser_version(parser_name)
+        tokenized_segments: list[TokenizedSegment] = []
+        tokenized_chunks = False
+        for chunk in chunks:
+            if (
+                chunk.tokenized_text is not None
+                and chunk.parser_name == parser_name
+                and chunk.parser_version == parser_version
+            ):
+                tokenized_segments.extend(
+                    await vocabulary_manager.load_tokenized_segments(session, language_id, chunk.tokenized_text)
+                )
+                continue
+            chunk_segments = await parse_executor.tokenize_segments(
+                parser_tool.load_segments(chunk.segments),
+                parser_name,
+                first_paragraph_order=chunk.chunk_order * chunk_size + 1,
+            )
+            chunk.parser_name = parser_name
+            chunk.parser_version = parser_version
+            chunk.tokenized_text = await vocabulary_manager.dump_tokenized_segments(
+                session, language_id, chunk_segments
+            )
+            tokenized_segments.extend(chunk_segments)
+            tokenized_chunks = True
+        if tokenized_chunks:
+            await session.commit()
+        page = get_paragraph_page(tokenized_segments, offset - first_chunk * chunk_size, limit)
+        return page, segment_index.total_paragraphs
+
+    async def store_tokenized_segments(
+        self, booktext: BookText, parser_name: str, tokenized_segments: list[TokenizedSegment]
+    ) -> None:
+        """fill the tokens of the chunks from the tokenized segments of the whole text, kept by the parse cache"""
+        session = self.repository.session
+        language_id = await _get_language_id(session, booktext)
+        segment_index = await self.get_segment_index(booktext)
+        parser_version = await get_parse_executor().get_parser_version(parser_name)
+        for chunk_order, chunk in enumerate(split_paragraph_chunks(tokenized_segments, segment_index.chunk_size)):
+            tokenized_text = await vocabulary_manager.dump_tokenized_segments(session, language_id, chunk)
+            await session.execute(
+                update(BookTextSegmentChunk)
+                .where(BookTextSegmentChunk.booktext_id == booktext.id, BookTextSegmentChunk.chunk_order == chunk_order)
+                .values(
+                    parser_name=parser_name,
+                    parser_version=parser_version,
+                    tokenized_text=tokenized_text,
+                )
+            )
+        await session.commit()
+
+
+async def _get_language_id(session: AsyncSession, booktext: BookText) -> int:
+    """the language of the vocabulary of the tokens, read from the database when the book is not loaded"""
+    if booktext.book is not None:
+        return booktext.book.language_id
+    return await session.scalar(select(Book.language_id).where(Book.id == booktext.ref_book_id))  # type: ignore[return-value]
+
+
+def _is_paragraph(segment: Segment | TokenizedSegment) -> bool:
+    return isinstance(segment, TextRawParagraphSegment | TokenizedParagraphSegment)
+
+
+def split_paragraph_chunks(segmentlist: list[SegmentT], chunk_size: int) -> list[list[SegmentT]]:
+    """split the segments in chunks of ``chunk_size`` text paragraphs, there is always at least one chunk
+
+    the segments between two paragraphs belong to the chunk of the first one, the segments before the first
+    paragraph to the first chunk
+    """
+    starts = [0]
+    paragraph_count = 0
+    for i, segment in enumerate(segmentlist):
+        if _is_paragraph(segment):
+            if paragraph_count and paragraph_count % chunk_size == 0:
+                starts.append(i)
+            paragraph_count += 1
+    return [segmentlist[start:end] for start, end in zip(starts, [*starts[1:], len(segmentlist)], strict=True)]
+
+
+def get_paragraph_page(segmentlist: list[SegmentT], offset: int, limit: int) -> list[SegmentT]:
+    """the segments of the text paragraphs ``offset`` to ``offset + limit`` of ``segmentlist``
+
+    the segments between two paragraphs belong to the page of the first one
+    """
+    paragraph_offsets = [i for i, segment in enumerate(segmentlist) if _is_paragraph(segment)]
+    paragraph_offsets.append(len(segmentlist))
+    start = 0 if offset == 0 else paragraph_offsets[min(offset, len(paragraph_offsets) - 1)]
+    end = paragraph_offsets[min(offset + limit, len(paragraph_offsets) - 1)]
+    return segmentlist[start:end]
+
+
+async def iter_parsed_segments(
+    booktext: BookText, parser_name: str, language_id: int, batch_size: int
+) -> AsyncIterator[ParsedTextSegment]:
+    """parse and match the text ``batch_size`` paragraphs at a time, yielding the segments of every batch
+
+    The request session can not be used: the sqlalchemy plugin closes it on ``http.response.start``, before
+    the body of the ``Stream`` is iterated. Every batch reads its chunks and its term trie in a session of its
+    own, released before the segments are yielded, so a slow client does not hold a database connection.
+    """
+    offset = 0
+    while True:
+        async with BookTextSegmentIndexService.new() as segment_index_service:
+            tokenized_segments, total_paragraphs = await segment_index_service.get_page(
+                booktext, parser_name, offset, batch_size
+            )
+            async with WordService.new(session=segment_index_service.repository.session) as word_service:
+                term_trie = await word_service.load_term_trie(
+                    language_id, parser_tool.get_token_strings(tokenized_segments)
+                )
+        for segment in await parser_tool.match_tokenized_segments(tokenized_segments, term_trie):
+            yield segment
+        offset += batch_size
+        if offset >= total_paragraphs:
+            return
@@ -5,9 +5,12 @@ from litestar.pagination import OffsetPagination
 
 from app.db.models.language import Language
 from app.domain.language.dependencies import provides_language_service
-from app.domain.language.dtos import LanguageCreateDTO, LanguageData, LanguageDTO
+from app.domain.language.dtos import LanguageCreateDTO, LanguageData, LanguageDTO, LoadedModelDTO
 from app.domain.language.services import LanguageService
 from app.domain.parser import parser_tool
+from app.domain.parser.executor import get_parse_executor
+from app.domain.parser.language_parsers.model_manager import LoadedModelInfo
+from app.lib.response import MsgPackNegotiatedResponse
 
 __all__ = ("LanguageController",)
 
@@ -20,7 +23,7 @@ class LanguageController(Controller):
     }
     return_dto = LanguageDTO
 
-    @get("/languages")
+    @get("/languages", response_class=MsgPackNegotiatedResponse)
     async def list_languages(self, language_service: LanguageService) -> OffsetPagination[Language]:
         languages = await language_service.list()
         return language_service.to_dto(languages)
@@ -29,6 +32,11 @@ class LanguageController(Controller):
     async def list_parsers(self) -> list[str]:
         return parser_tool.list_all_parsers()
 
+    @get("/parsers/loaded", return_dto=LoadedModelDTO)
+    async def list_loaded_parsers(self) -> list[LoadedModelInfo]:
+        """the language models loaded in the parsing processes, see ``PARSER_MODEL_MEMORY_BUDGET``"""
+        return await get_parse_executor().get_loaded_models()
+
     @post("/create", dto=LanguageCreateDTO)
     async def create_language(self, language_service: LanguageService, data: DTOData[LanguageData]) -> Language:
         db_obj = await language_service.create(data.as_builtins())
@@ -4,9 +4,17 @@ from advanced_alchemy.extensions.litestar.dto import SQLAlchemyDTO
 from litestar.dto import DataclassDTO
 
 from app.db.models.language import Language
+from app.domain.parser.language_parsers.model_manager import LoadedModelInfo
 from app.lib import dto
 
-__all__ = ["LanguageDTO", "LanguageData", "LanguageCreateDTO", "LanguageUpdateDTO", "LanguagePatchDTO"]
+__all__ = [
+    "LanguageDTO",
+    "LanguageData",
+    "LanguageCreateDTO",
+    "LanguageUpdateDTO",
+    "LanguagePatchDTO",
+    "LoadedModelDTO",
+]
 
 
 # database model
@@ -37,3 +45,7 @@ class LanguageUpdateDTO(DataclassDTO[LanguageData]):
 
 class LanguagePatchDTO(DataclassDTO[LanguageData]):
     config = dto.config(partial=True)
+
+
+class LoadedModelDTO(DataclassDTO[LoadedModelInfo]):
+    config = dto.config()
@@ -0,0 +1,190 @@
+"""Run the CPU bound tokenization outside the event loop.
+
+In ``process`` mode the tokenization runs in a process pool, every worker loads the models of
+``paser_config.spacy_model_mapping`` and ``paser_config.fugashi_parser_names`` when it starts, and the
+tokens come back as flat arrays (see ``parser_tool.dump_token``) instead of pickled dataclasses.
+The ``thread`` mode keeps a single copy of the models in the web process for low-memory deployments.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
+
+import structlog
+
+from app.config.base import get_parser_settings
+from app.domain.parser.language_parsers import parser_tool
+from app.domain.parser.language_parsers.language_parser import LanguageParser
+from app.domain.parser.language_parsers.model_manager import get_model_manager
+from app.domain.parser.markdown_text_parser import TextRawParagraphSegment
+from app.lib.exceptions import LanguageParserError, ParserBusyError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from app.domain.parser.language_parsers.model_manager import LoadedModelInfo
+    from app.domain.parser.markdown_text_parser import Segment, TokenizedSegment, WordToken
+
+__all__ = ("ParseExecutor", "get_parse_executor", "shutdown_parse_executor")
+
+logger = structlog.get_logger()
+
+TokenArrays = list[list[list[list[Any]]]]
+
+
+def _preload_parsers(parser_names: list[str] | None = None) -> dict[str, str]:
+    """instantiate the parsers, all the configured models by default, and return their versions"""
+    from app.domain.parser.language_parsers.paser_config import fugashi_parser_names, spacy_model_mapping
+
+    parser_versions = {}
+    for parser_name in parser_names if parser_names is not None else (*spacy_model_mapping, *fugashi_parser_names):
+        try:
+            parser_versions[parser_name] = LanguageParser.get_parser(parser_name).get_parser_version()
+        except (ValueError, OSError, NotImplementedError, ImportError):
+            logger.warning("Failed to preload parser", parser_name=parser_name)
+    return parser_versions
+
+
+def _tokenize_many(parser_name: str, texts: list[str], batch_size: int | None) -> TokenArrays:
+    parser = LanguageParser.get_parser(parser_name)
+    return [
+        [[parser_tool.dump_token(token) for token in sent] for sent in paragraph]
+        for paragraph in parser.split_sentences_and_tokenize_many(texts, batch_size)
+    ]
+
+
+def _get_loaded_models() -> list[LoadedModelInfo]:
+    return get_model_manager().model_info()
+
+
+def _get_parser_version(parser_name: str) -> str:
+    return LanguageParser.get_parser(parser_name).get_parser_version()
+
+
+class ParseExecutor:
+    """Bounded executor for the tokenize stage of the booktext pipeline."""
+
+    def __init__(self, mode: str = "process", pool_size: int = 2, max_queue_size: int = 32) -> None:
+        if mode not in {"process", "thread"}:
+            raise ValueError(f"Unknown parser executor mode '{mode}'")
+        self.mode = mode
+        self.pool_size = pool_size
+        self.max_queue_size = max_queue_size
+        self.pending = 0
+        self._executor: Executor | None = None
+        self._parser_versions: dict[str, str] = {}
+        self._preload_parser_names: list[str] | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.pool_size,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_preload_parsers,
+                    initargs=(self._preload_parser_names,),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="parser")
+        return self._executor
+
+    async def _run(self, func: Any, *args: Any) -> Any:
+        if self.pending >= self.max_queue_size:
+            raise ParserBusyError(f"Parsing queue is full ({self.max_queue_size} pending jobs), try again later")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise LanguageParserError("Parser worker died unexpectedly") from e
+        finally:
+            self.pending -= 1
+
+    async def get_parser_version(self, parser_name: str) -> str:
+        if parser_name not in self._parser_versions:
+            self._parser_versions[parser_name] = await self._run(_get_parser_version, parser_name)
+        return self._parser_versions[parser_name]
+
+    async def warm_up(self, parser_names: Iterable[str]) -> list[str]:
+        """instantiate the parsers before the first request and return the ones which failed to load
+
+        in ``process`` mode the loading relies on the initializer of the pool: when the pool is created here,
+        every worker it spawns loads ``parser_names`` before its first job. The ``pool_size`` jobs only make
+        the pool spawn its workers and report the versions, the pool does not guarantee one job per worker.
+        When the pool already exists, its workers keep the parsers loaded by their initializer and only the
+        ones which run a job are sure to have ``parser_names`` loaded. In ``thread`` mode the parsers are
+        loaded concurrently.
+        """
+        parser_names = sorted(set(parser_names))
+        if self.mode == "process":
+            if self._executor is None:
+                self._preload_parser_names = parser_names
+            jobs = [self._run(_preload_parsers, parser_names) for _ in range(self.pool_size)]
+        else:
+            jobs = [self._run(_preload_parsers, [parser_name]) for parser_name in parser_names]
+        for parser_versions in await asyncio.gather(*jobs):
+            self._parser_versions.update(parser_versions)
+        return [parser_name for parser_name in parser_names if parser_name not in self._parser_versions]
+
+    async def get_loaded_models(self) -> list[LoadedModelInfo]:
+        """the parsers loaded in the parsing processes
+
+        in ``process`` mode the report asks as many jobs as there are workers, a worker busy with a long
+        tokenization may be missing from it
+        """
+        if self.mode == "thread":
+            return _get_loaded_models()
+        if self._executor is None:
+            return []
+        reports = await asyncio.gather(*(self._run(_get_loaded_models) for _ in range(self.pool_size)))
+        models: dict[tuple[int, str], LoadedModelInfo] = {}
+        for report in reports:
+            for model in report:
+                models[(model.pid, model.parser_name)] = model
+        return list(models.values())
+
+    async def split_sentences_and_tokenize_many(
+        self, parser_name: str, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        paragraphs: TokenArrays = await self._run(_tokenize_many, parser_name, texts, batch_size)
+        return [[[parser_tool.load_token(token) for token in sent] for sent in paragraph] for paragraph in paragraphs]
+
+    async def tokenize_segments(
+        self,
+        segmentlist: list[Segment],
+        parser_name: str,
+        batch_size: int | None = None,
+        first_paragraph_order: int = 1,
+    ) -> list[TokenizedSegment]:
+        """async version of ``parser_tool.tokenize_segments``"""
+        texts = [segment.segment_value for segment in segmentlist if isinstance(segment, TextRawParagraphSegment)]
+        paragraphs = await self.split_sentences_and_tokenize_many(parser_name, texts, batch_size)
+        return parser_tool.assemble_tokenized_segments(segmentlist, paragraphs, first_paragraph_order)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        self._parser_versions.clear()
+
+
+_parse_executor: ParseExecutor | None = None
+
+
+def get_parse_executor() -> ParseExecutor:
+    global _parse_executor  # noqa: PLW0603
+    if _parse_executor is None:
+        settings = get_parser_settings()
+        _parse_executor = ParseExecutor(
+            mode=settings.EXECUTOR, pool_size=settings.POOL_SIZE, max_queue_size=settings.MAX_QUEUE_SIZE
+        )
+    return _parse_executor
+
+
+def shutdown_parse_executor() -> None:
+    if _parse_executor is not None:
+        _parse_executor.shutdown()
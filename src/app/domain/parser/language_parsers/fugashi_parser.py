@@ -1,14 +1,21 @@
+import contextlib
+import functools
 import pathlib
+import queue
 import re
+import threading
+from collections.abc import Iterator
+from importlib import metadata
 
 import jaconv
 from fugashi import Tagger, UnidicNode
 from konoha import SentenceTokenizer
 
+from app.config.base import get_parser_settings
 from app.domain.parser.markdown_text_parser import WordToken
 
+from .japanese_sentence_splitter import get_sentence_splitter_name, split_japanese_sentences
 from .language_parser import LanguageParser
-from .parser_tool import register_parser
 
 CSJ_PATH = r"C:Users\fanzh\PycharmProjects\lute-backend\data\csj"
 csj_path = pathlib.Path(CSJ_PATH).as_posix()
@@ -26,34 +33,141 @@ class JapaneseHelper:
         return str(jaconv.kata2hira(katakana))
 
 
-@register_parser("fugashi")
+READING_CACHE_SIZE = 2**16
+
+
+@functools.lru_cache(maxsize=READING_CACHE_SIZE)
+def _reading(surface: str, kana: str) -> str:
+    """hiragana reading of a native word, the kana check and the conversion are memoized per surface form"""
+    return "" if JapaneseHelper.string_is_kana(surface) else JapaneseHelper.kata2hira(kana)
+
+
+FEATURE_FIELDS = ("pos1", "lemma", "orthBase", "goshu", "kana")
+
+
+def _feature_indices(tagger: Tagger) -> tuple[int, ...]:
+    """positions of ``FEATURE_FIELDS`` in the raw feature string of the dictionary of the tagger"""
+    fields = tagger.parseToNodeList("テスト")[0].feature._fields
+    return tuple(fields.index(field) for field in FEATURE_FIELDS)
+
+
+class TaggerPool:
+    """Checkout/return pool of fugashi Taggers, a MeCab tagger must not be used by two threads at once.
+
+    The taggers are created on demand up to ``size``, they share the memory mapped unidic dictionary.
+    """
+
+    def __init__(self, undic_path: str, size: int) -> None:
+        self.undic_path = undic_path
+        self.size = max(size, 1)
+        self._idle: queue.LifoQueue[Tagger] = queue.LifoQueue()
+        self._created = 1
+        self._lock = threading.Lock()
+        tagger = Tagger(undic_path)
+        self.feature_indices = _feature_indices(tagger)
+        self._idle.put(tagger)
+
+    @contextlib.contextmanager
+    def checkout(self) -> Iterator[Tagger]:
+        try:
+            tagger = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            tagger = Tagger(self.undic_path) if create else self._idle.get()
+        try:
+            yield tagger
+        finally:
+            self._idle.put(tagger)
+
+
 class SpokenJapaneseParser(LanguageParser):
     def __init__(self, language_name: str, **kwargs: str) -> None:
         super().__init__(language_name)
-        self._tagger = Tagger(kwargs["undic_path"])
+        self._tagger_pool = TaggerPool(kwargs["undic_path"], get_parser_settings().TAGGER_POOL_SIZE)
+        self.sentence_splitter = get_sentence_splitter_name(language_name, ("konoha", "rules"))
+        # the konoha sentence tokenizer only holds compiled regexes, it is shared by the threads
         self._sentence_tokenizer = SentenceTokenizer()
 
+    def get_parser_version(self) -> str:
+        with self._tagger_pool.checkout() as tagger:
+            dictionaries = ",".join(
+                f"{pathlib.Path(info['filename']).name}-{info['version']}-{info['size']}"
+                for info in tagger.dictionary_info
+            )
+        version = f"fugashi-{metadata.version('fugashi')}/{dictionaries}"
+        if self.sentence_splitter == "konoha":
+            return version
+        return f"{version}/sentences-{self.sentence_splitter}"
+
     def tokenize(self, text: str) -> list[WordToken]:
-        token: UnidicNode
+        with self._tagger_pool.checkout() as tagger:
+            return self._tokenize(tagger, text)
+
+    def tokenize_many(self, sentences: list[str]) -> list[list[WordToken]]:
+        """tokenize the sentences with a single tagger checkout
+
+        MeCab holds the GIL while it parses, splitting a batch over several taggers does not run faster
+        """
+        with self._tagger_pool.checkout() as tagger:
+            return [self._tokenize(tagger, sentence) for sentence in sentences]
+
+    def _tokenize(self, tagger: Tagger, text: str) -> list[WordToken]:
+        """reads the features from the raw feature string of the node instead of the feature named tuple"""
+        pos1_index, lemma_index, orth_base_index, goshu_index, kana_index = self._tagger_pool.feature_indices
+        last_index = max(self._tagger_pool.feature_indices)
         res = []
-        for token in self._tagger(text):
+        for token in tagger(text):
+            raw = token.feature_raw
+            features = raw.split(",", last_index + 1)
+            # unknown words have a short feature, quoted fields hold commas, both take the named tuple path
+            if len(features) <= last_index or '"' in raw[: len(raw) - len(features[-1])]:
+                res.append(self._node_word_token(token))
+                continue
+            surface = token.surface
             word_token = WordToken(
-                word_string=token.surface,
-                word_lemma=token.feature.orthBase,
-                word_pos=token.feature.pos1,
+                word_string=surface,
+                word_lemma=features[orth_base_index],
+                word_pos=features[pos1_index],
                 is_word=token.char_type in {2, 6, 7, 8},
             )
-            if token.feature.goshu == "外":
-                word_token.word_pronunciation = token.feature.lemma.split("-")[-1]
-            elif JapaneseHelper.string_is_kana(token.surface):
-                word_token.word_pronunciation = ""
+            if features[goshu_index] == "外":
+                word_token.word_pronunciation = features[lemma_index].split("-")[-1]
             else:
-                word_token.word_pronunciation = JapaneseHelper.kata2hira(token.feature.kana)
+                word_token.word_pronunciation = _reading(surface, features[kana_index])
             res.append(word_token)
         return res
 
+    @staticmethod
+    def _node_word_token(token: UnidicNode) -> WordToken:
+        word_token = WordToken(
+            word_string=token.surface,
+            word_lemma=token.feature.orthBase,
+            word_pos=token.feature.pos1,
+            is_word=token.char_type in {2, 6, 7, 8},
+        )
+        if token.feature.goshu == "外":
+            word_token.word_pronunciation = token.feature.lemma.split("-")[-1]
+        elif JapaneseHelper.string_is_kana(token.surface) or token.feature.kana is None:
+            word_token.word_pronunciation = ""
+        else:
+            word_token.word_pronunciation = JapaneseHelper.kata2hira(token.feature.kana)
+        return word_token
+
     def split_sentences(self, text: str) -> list[str]:
+        if self.sentence_splitter == "rules":
+            return split_japanese_sentences(text)
         return self._sentence_tokenizer.tokenize(text)  # type: ignore[no-any-return]
 
-    def split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
-        return [self.tokenize(sentence) for sentence in self.split_sentences(text)]
+    def _split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
+        return self.tokenize_many(self.split_sentences(text))
+
+    def _split_sentences_and_tokenize_many(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        """the sentences of every paragraph are tokenized with one tagger checkout"""
+        paragraphs = [self.split_sentences(text) for text in texts]
+        tokens = iter(self.tokenize_many([sentence for sentences in paragraphs for sentence in sentences]))
+        return [[next(tokens) for _ in sentences] for sentences in paragraphs]
@@ -1,28 +1,48 @@
-import spacy
-
 from app.domain.parser.markdown_text_parser import WordToken
 
+from .japanese_sentence_splitter import get_sentence_splitter_name, split_japanese_sentences
 from .language_parser import LanguageParser
-from .parser_tool import register_parser
-from .spacy_parser import split_sentences_and_tokenize
+from .spacy_parser import (
+    get_pipeline_profile,
+    get_pipeline_version,
+    load_pipeline,
+    split_sentences_and_tokenize,
+    split_sentences_and_tokenize_many,
+    tokenize_sentences_many,
+)
 
 
-@register_parser("japanese")
 class JapaneseParser(LanguageParser):
     def __init__(self, language_name: str) -> None:
         super().__init__(language_name)
         try:
-            self.nlp = spacy.load("ja_core_news_sm")
+            self.nlp = load_pipeline("ja_core_news_sm", get_pipeline_profile(language_name))
         except OSError:
             raise ValueError("ja_core_news_sm is not installed") from None
+        self.sentence_splitter = get_sentence_splitter_name(language_name, ("spacy", "rules"))
+
+    def get_parser_version(self) -> str:
+        if self.sentence_splitter == "spacy":
+            return get_pipeline_version(self.nlp)
+        return f"{get_pipeline_version(self.nlp)}/sentences-{self.sentence_splitter}"
 
-    @classmethod
-    def split_sentences(cls, text: str) -> list[str]:  # type: ignore
-        pass
+    def split_sentences(self, text: str) -> list[str]:
+        if self.sentence_splitter == "rules":
+            return split_japanese_sentences(text)
+        return [sent.text for sent in self.nlp(text).sents]
 
-    def split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
+    def _split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
+        if self.sentence_splitter == "rules":
+            return tokenize_sentences_many(self.nlp, [split_japanese_sentences(text)])[0]
         return split_sentences_and_tokenize(self.nlp, text)
 
+    def _split_sentences_and_tokenize_many(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        if self.sentence_splitter == "rules":
+            return tokenize_sentences_many(self.nlp, [split_japanese_sentences(text) for text in texts], batch_size)
+        return split_sentences_and_tokenize_many(self.nlp, texts, batch_size)
+
     def tokenize(self, text: str) -> list[WordToken]:
         return [
             WordToken(
@@ -0,0 +1,56 @@
+"""Rule based sentence splitter of the Japanese parsers.
+
+It follows konoha's ``SentenceTokenizer``: the text is split into lines, every line is stripped of its trailing
+whitespace and split after the sentence terminators which are not inside a ``（…）`` or ``「…」`` pair of the
+line, and the empty sentences are dropped. Unlike konoha it also ends the sentences at ``！`` and ``？``, and a
+run of terminators such as ``？！`` or ``。。`` ends a single sentence.
+"""
+
+from __future__ import annotations
+
+import re
+
+from .paser_config import japanese_sentence_splitters
+
+__all__ = ("get_sentence_splitter_name", "split_japanese_sentences")
+
+_TERMINATORS = re.compile("[。！？]+")
+_SENTENCES = re.compile("[^。！？]*[。！？]+|[^。！？]+")
+# the protected spans of the two patterns are computed separately, as konoha substitutes them one after the other
+_PROTECTED_PATTERNS = (re.compile("（.*?）"), re.compile("「.*?」"))
+
+
+def _protected_spans(line: str) -> list[tuple[int, int]]:
+    if "（" not in line and "「" not in line:
+        return []
+    return [match.span() for pattern in _PROTECTED_PATTERNS for match in pattern.finditer(line)]
+
+
+def split_japanese_sentences(text: str) -> list[str]:
+    sentences = []
+    for raw_line in text.split("\n"):
+        line = raw_line.rstrip().replace("\r", "")
+        if not line:
+            continue
+        protected = _protected_spans(line)
+        if not protected:
+            sentences += _SENTENCES.findall(line)
+            continue
+        start = 0
+        for match in _TERMINATORS.finditer(line):
+            # a run of terminators can not hold a closing bracket, so it is protected as a whole or not at all
+            if any(span_start < match.start() < span_end for span_start, span_end in protected):
+                continue
+            sentences.append(line[start : match.end()])
+            start = match.end()
+        if start < len(line):
+            sentences.append(line[start:])
+    return sentences
+
+
+def get_sentence_splitter_name(parser_name: str, choices: tuple[str, ...]) -> str:
+    """sentence splitter of the parser in ``paser_config.japanese_sentence_splitters``, one of ``choices``"""
+    splitter_name = japanese_sentence_splitters.get(parser_name, choices[0])
+    if splitter_name not in choices:
+        raise ValueError(f"Sentence splitter '{splitter_name}' is not supported by parser '{parser_name}'")
+    return splitter_name
@@ -1,28 +1,41 @@
 import abc
+import importlib
 
 __all__ = ("LanguageParser",)
 
 from typing import Any
 
-from app.domain.parser.language_parsers.paser_config import parser_instances, parser_mapping
+from app.domain.parser.language_parsers.model_manager import get_model_manager
+from app.domain.parser.language_parsers.paser_config import parser_mapping, parser_registry
+from app.domain.parser.language_parsers.token_cache import get_token_cache
 from app.domain.parser.markdown_text_parser import WordToken
 
-# register in the @parser_tool.register_parser
+# register in paser_config.parser_registry or with parser_tool.register_parser
 
 
-def _get_parser(language_name: str) -> "LanguageParser":
-    from app.domain.parser.language_parsers.paser_config import fugashi_unidic
-
-    if language_name not in parser_instances:
-        if language_name not in parser_mapping:
+def _get_parser_class(language_name: str) -> type["LanguageParser"]:
+    """import the module of the parser on its first use"""
+    if language_name not in parser_mapping:
+        if language_name not in parser_registry:
             raise ValueError(f"Parser '{language_name}' is not registered")
-        if language_name in fugashi_unidic:
-            parser_instances[language_name] = parser_mapping[language_name](
-                language_name, undic_path=fugashi_unidic[language_name]
-            )
-        else:
-            parser_instances[language_name] = parser_mapping[language_name](language_name)
-    return parser_instances[language_name]
+        module_name, class_name = parser_registry[language_name].split(":")
+        parser_mapping[language_name] = getattr(importlib.import_module(module_name), class_name)
+    return parser_mapping[language_name]
+
+
+def _load_parser(language_name: str) -> "LanguageParser":
+    from app.domain.parser.language_parsers.paser_config import fugashi_parser_names, get_fugashi_unidic
+
+    parser_class = _get_parser_class(language_name)
+    if language_name in fugashi_parser_names:
+        return parser_class(language_name, undic_path=get_fugashi_unidic()[language_name])
+    return parser_class(language_name)
+
+
+def _get_parser(language_name: str) -> "LanguageParser":
+    """the parser instances are kept by the model manager, which unloads the idle ones"""
+    _get_parser_class(language_name)
+    return get_model_manager().get(language_name, lambda: _load_parser(language_name))
 
 
 class LanguageParser(abc.ABC):
@@ -37,6 +50,10 @@ class LanguageParser(abc.ABC):
     def get_language_name(self) -> str:
         return self.language_name.capitalize()
 
+    def get_parser_version(self) -> str:
+        """identify the tokenizer output, cached parse results are dropped when it changes"""
+        return self.__class__.__name__
+
     def load_resource(self, resource: Any) -> Any:  # noqa
         ...
 
@@ -47,10 +64,38 @@ class LanguageParser(abc.ABC):
     def split_sentences(self, text: str) -> list[str]:
         pass
 
-    @abc.abstractmethod
     def split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
+        token_cache = get_token_cache()
+        sentences = token_cache.get(self.language_name, text)
+        if sentences is None:
+            sentences = self._split_sentences_and_tokenize(text)
+            token_cache.put(self.language_name, text, sentences)
+        return sentences
+
+    def split_sentences_and_tokenize_many(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        """split and tokenize several paragraphs, only the paragraphs missing from the token cache are parsed"""
+        token_cache = get_token_cache()
+        res = [token_cache.get(self.language_name, text) for text in texts]
+        missing = [i for i, sentences in enumerate(res) if sentences is None]
+        if missing:
+            parsed = self._split_sentences_and_tokenize_many([texts[i] for i in missing], batch_size)
+            for i, sentences in zip(missing, parsed, strict=True):
+                token_cache.put(self.language_name, texts[i], sentences)
+                res[i] = sentences
+        return res  # type: ignore[return-value]
+
+    @abc.abstractmethod
+    def _split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
         pass
 
+    def _split_sentences_and_tokenize_many(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        """parsers with a batch pipeline should override it"""
+        return [self._split_sentences_and_tokenize(text) for text in texts]
+
     @abc.abstractmethod
     def tokenize(self, text: str) -> list[WordToken]:
         pass
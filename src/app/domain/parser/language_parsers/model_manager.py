@@ -0,0 +1,183 @@
+"""Loaded parsers of the process, unloaded when they are idle or over the memory budget.
+
+A spacy pipeline or a fugashi Tagger takes hundreds of MB. The manager keeps the ``LanguageParser``
+instances in least recently used order with the resident memory the process grew by while loading each
+one, evicts the least recently used parsers once the total exceeds ``PARSER_MODEL_MEMORY_BUDGET`` and the
+parsers unused for ``PARSER_MODEL_IDLE_TIMEOUT`` seconds. An evicted parser is loaded again on its next use.
+"""
+
+from __future__ import annotations
+
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import structlog
+
+from app.config.base import get_parser_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from app.domain.parser.language_parsers.language_parser import LanguageParser
+
+__all__ = ("LoadedModelInfo", "LoadedParser", "ParserModelManager", "get_model_manager")
+
+logger = structlog.get_logger()
+
+
+def get_rss_bytes() -> int | None:
+    """resident memory of the process, None where ``/proc`` is not available"""
+    try:
+        return int(Path("/proc/self/statm").read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class LoadedParser:
+    parser_name: str
+    parser: LanguageParser
+    size_bytes: int
+    """growth of the resident memory while loading, 0 when it can not be measured"""
+    loaded_at: float
+    last_used_at: float
+
+
+@dataclass
+class LoadedModelInfo:
+    """report of a loaded parser, sent back from the parsing processes"""
+
+    parser_name: str
+    pid: int
+    size_bytes: int
+    loaded_seconds: float
+    idle_seconds: float
+
+
+class ParserModelManager:
+    def __init__(self, memory_budget: int = 0, idle_timeout: float = 0) -> None:
+        """``memory_budget`` in bytes and ``idle_timeout`` in seconds, 0 disables them"""
+        self.memory_budget = memory_budget
+        self.idle_timeout = idle_timeout
+        self.parsers: OrderedDict[str, LoadedParser] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._sweeper: threading.Thread | None = None
+
+    def get(self, parser_name: str, load: Callable[[], LanguageParser]) -> LanguageParser:
+        """the loaded parser, ``load`` builds it when it is not loaded"""
+        with self._lock:
+            if loaded := self._touch(parser_name):
+                return loaded.parser
+        # the loads are serialized so the memory growth of one is not counted for another
+        with self._load_lock:
+            with self._lock:
+                if loaded := self._touch(parser_name):
+                    return loaded.parser
+            rss_before = get_rss_bytes()
+            parser = load()
+            rss_after = get_rss_bytes()
+            now = time.monotonic()
+            size_bytes = max(rss_after - rss_before, 0) if rss_before is not None and rss_after is not None else 0
+            with self._lock:
+                self.parsers[parser_name] = LoadedParser(parser_name, parser, size_bytes, now, now)
+                evicted = self._evict_over_budget()
+        self._release(evicted)
+        logger.info("Parser loaded", parser_name=parser_name, size_mib=round(size_bytes / 2**20, 1))
+        self._start_sweeper()
+        return parser
+
+    def _touch(self, parser_name: str) -> LoadedParser | None:
+        loaded = self.parsers.get(parser_name)
+        if loaded is not None:
+            loaded.last_used_at = time.monotonic()
+            self.parsers.move_to_end(parser_name)
+        return loaded
+
+    def _evict_over_budget(self) -> list[LoadedParser]:
+        """the last loaded parser is kept even when it alone exceeds the budget"""
+        evicted = []
+        if self.memory_budget:
+            while len(self.parsers) > 1 and sum(loaded.size_bytes for loaded in self.parsers.values()) > (
+                self.memory_budget
+            ):
+                evicted.append(self.parsers.popitem(last=False)[1])
+        return evicted
+
+    def evict_idle(self, now: float | None = None) -> list[str]:
+        if not self.idle_timeout:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            evicted = [
+                self.parsers.pop(parser_name)
+                for parser_name, loaded in list(self.parsers.items())
+                if now - loaded.last_used_at > self.idle_timeout
+            ]
+        parser_names = [loaded.parser_name for loaded in evicted]
+        self._release(evicted)
+        return parser_names
+
+    def unload(self, parser_name: str) -> bool:
+        with self._lock:
+            evicted = [self.parsers.pop(parser_name)] if parser_name in self.parsers else []
+        if not evicted:
+            return False
+        self._release(evicted)
+        return True
+
+    def loaded(self) -> list[LoadedParser]:
+        """the loaded parsers, least recently used first"""
+        with self._lock:
+            return list(self.parsers.values())
+
+    def model_info(self) -> list[LoadedModelInfo]:
+        now = time.monotonic()
+        return [
+            LoadedModelInfo(
+                parser_name=loaded.parser_name,
+                pid=os.getpid(),
+                size_bytes=loaded.size_bytes,
+                loaded_seconds=round(now - loaded.loaded_at, 1),
+                idle_seconds=round(now - loaded.last_used_at, 1),
+            )
+            for loaded in self.loaded()
+        ]
+
+    @staticmethod
+    def _release(evicted: list[LoadedParser]) -> None:
+        if evicted:
+            for loaded in evicted:
+                logger.info("Parser unloaded", parser_name=loaded.parser_name)
+            evicted.clear()
+            # the spacy pipelines are full of reference cycles
+            gc.collect()
+
+    def _start_sweeper(self) -> None:
+        if self.idle_timeout and self._sweeper is None:
+            self._sweeper = threading.Thread(target=self._sweep, name="parser-model-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self) -> None:
+        while True:
+            time.sleep(max(self.idle_timeout / 2, 1))
+            self.evict_idle()
+
+
+_model_manager: ParserModelManager | None = None
+
+
+def get_model_manager() -> ParserModelManager:
+    global _model_manager  # noqa: PLW0603
+    if _model_manager is None:
+        settings = get_parser_settings()
+        _model_manager = ParserModelManager(
+            memory_budget=settings.MODEL_MEMORY_BUDGET, idle_timeout=settings.MODEL_IDLE_TIMEOUT
+        )
+    return _model_manager
@@ -1,93 +1,112 @@
 from __future__ import annotations
 
-from collections.abc import Callable
-from typing import TYPE_CHECKING
+import sys
+from array import array
+from typing import TYPE_CHECKING, Any
 
-from .paser_config import parser_mapping
+from .paser_config import parser_registry
+from .vocabulary import ID_TYPECODE, UNKNOWN_ID
 
-__all__ = ("register_parser", "list_all_parsers", "parser_exists", "match_word_in_sentence")
-
-from .paser_config import fugashi_unidic, spacy_model_mapping
+__all__ = (
+    "register_parser",
+    "list_all_parsers",
+    "parser_exists",
+    "match_word_in_sentence",
+    "tokenize_segments",
+    "match_tokenized_segments",
+    "get_token_strings",
+    "get_vocabulary_strings",
+    "set_token_ids",
+    "get_word_overlay",
+    "get_parsed_text_segments",
+    "compact_parsed_segments",
+    "to_parsed_segment_struct",
+    "to_vword",
+    "to_vword_struct",
+    "assemble_tokenized_segments",
+    "dump_tokenized_segments",
+    "load_tokenized_segments",
+    "get_stored_token_ids",
+    "dump_sentence",
+    "load_sentence",
+    "dump_segments",
+    "load_segments",
+    "dump_token",
+    "load_token",
+)
 
 if TYPE_CHECKING:
-    from app.db.models.word import Word
-    from app.domain.parser.markdown_text_parser import WordToken
+    from collections.abc import Sequence
 
     from .language_parser import LanguageParser
+    from .term_trie import TermTrie
+    from .vocabulary import Vocabulary
 from app.domain.parser.markdown_text_parser import (
+    COMPACT_WORD_FIELDS,
+    BlockSegment,
+    CompactBookText,
+    CompactSegment,
+    CompactWord,
+    HardLineBreakSegment,
+    ImageSegment,
+    MatchedWord,
     ParsedTextSegment,
+    ParsedTextSegmentStruct,
+    ParsedWord,
     Segment,
     SentenceSegment,
+    SoftLineBreakSegment,
     TextRawParagraphSegment,
+    TokenizedParagraphSegment,
+    TokenizedSegment,
     VWord,
+    VWordStruct,
+    WordOverlay,
+    WordToken,
 )
 
+TOKEN_STRIDE = 5
+"""ints per token in the sentences of ``dump_sentence``"""
+IS_WORD = 1
+NEXT_IS_WS = 2
 
-def register_parser(parser_name: str) -> Callable[[type[LanguageParser]], type[LanguageParser]]:
-    def wrapper(cls: type[LanguageParser]) -> type[LanguageParser]:
-        if parser_name in parser_mapping:
-            raise ValueError(f"Parser {parser_name} is already registered")
-        if parser_name == "spacy":
-            for key in spacy_model_mapping:
-                parser_mapping[key] = cls
-        elif parser_name == "fugashi":
-            for key in fugashi_unidic:
-                parser_mapping[key] = cls
-        else:
-            parser_mapping[parser_name] = cls
-        return cls
 
-    return wrapper
+def register_parser(parser_name: str, import_path: str) -> None:
+    """register the ``module:ClassName`` of a parser, the module is imported on the first ``get_parser``"""
+    if parser_name in parser_registry:
+        raise ValueError(f"Parser {parser_name} is already registered")
+    parser_registry[parser_name] = import_path
 
 
 def list_all_parsers() -> list[str]:
-    return list(parser_mapping.keys())
+    return list(parser_registry.keys())
 
 
 def parser_exists(parser_name: str) -> bool:
-    return parser_name in parser_mapping
+    return parser_name in parser_registry
 
 
 async def match_word_in_sentence(
-    sentence_iter: list[WordToken], word_index: dict[str, list[Word]], max_loop_num: int
+    sentence_iter: list[WordToken], token_ids: Sequence[int], term_trie: TermTrie, max_loop_num: int
 ) -> SentenceSegment:
+    """match the longest vocabulary words of the sentence on its ``token_ids``, the VWords are only built by
+    ``to_vword`` when encoded"""
     start_position = 0
-    res_word_list = []
+    res_word_list: list[ParsedWord] = []
     dead_loop_indicator = 0
     sentence = [*sentence_iter]
     sentence_length = len(sentence)
     sentence_raw = str(sentence)
 
     while start_position < sentence_length:
-        current_word = sentence[start_position].word_string
-        current_token: WordToken = sentence[start_position]
-        vword: VWord = VWord(**current_token.__dict__, word_tokens=[current_token.word_string])
-
-        if current_word in word_index:
-            for db_word in word_index[current_word]:
-                end_position = start_position
-                for word_token in db_word.word_tokens:
-                    if end_position >= sentence_length or word_token != sentence[end_position].word_string:
-                        break
-                    end_position += 1
-                else:
-                    # it means all words matches, update word properties with db_word
-                    end_position -= 1
-                    vword.word_string = db_word.word_string
-                    vword.word_lemma = db_word.word_lemma or db_word.word_string
-                    vword.word_pos = db_word.word_pos or "UNKNOWN"
-                    vword.is_multiple_words = db_word.is_multiple_words
-                    vword.is_word = True
-                    vword.next_is_ws = sentence[end_position].next_is_ws
-                    vword.word_status = db_word.word_status
-                    vword.word_explanation = db_word.word_explanation or ""
-                    vword.word_pronunciation = db_word.word_pronunciation or ""
-                    vword.word_tokens = db_word.word_tokens
-                    vword.word_image_src = db_word.word_image.word_image_path if db_word.word_image else None
-                    vword.word_db_id = db_word.id
-                    start_position = end_position
-                    break
-        res_word_list.append(vword)
+        match = term_trie.longest_match(token_ids, start_position)
+        if match is None:
+            res_word_list.append(sentence[start_position])
+        else:
+            # the longest db_word starting at this position
+            db_word, end_position = match
+            res_word_list.append(MatchedWord(word=db_word, next_is_ws=sentence[end_position].next_is_ws))
+            start_position = end_position
 
         start_position += 1
         dead_loop_indicator += 1
@@ -98,43 +117,410 @@ async def match_word_in_sentence(
     return SentenceSegment(segment_value=res_word_list, segment_raw=sentence_raw)
 
 
-async def text2segment(
-    text: str, language_parser: LanguageParser, paragraph_order: int, word_index: dict[str, list[Word]]
-) -> list[SentenceSegment]:
+def _vword_values(word: ParsedWord) -> tuple[Any, ...]:
+    """the VWord fields of a parsed word but next_is_ws, in the ``CompactWord`` order"""
+    if isinstance(word, MatchedWord):
+        db_word = word.word
+        return (
+            db_word.word_string,
+            db_word.word_lemma or db_word.word_string,
+            db_word.word_pos or "UNKNOWN",
+            True,
+            db_word.word_pronunciation or "",
+            db_word.word_tokens,
+            db_word.word_status,
+            db_word.is_multiple_words,
+            db_word.word_explanation or "",
+            db_word.word_image_path,
+            db_word.id,
+        )
+    return (
+        word.word_string,
+        word.word_lemma,
+        word.word_pos,
+        word.is_word,
+        word.word_pronunciation,
+        (word.word_string,),
+        0,
+        False,
+        "",
+        None,
+        -1,
+    )
+
+
+def to_vword(word: ParsedWord) -> VWord:
+    (
+        word_string,
+        word_lemma,
+        word_pos,
+        is_word,
+        word_pronunciation,
+        word_tokens,
+        word_status,
+        is_multiple_words,
+        word_explanation,
+        word_image_src,
+        word_db_id,
+    ) = _vword_values(word)
+    return VWord(
+        word_string=word_string,
+        word_lemma=word_lemma,
+        word_pos=word_pos,
+        is_word=is_word,
+        next_is_ws=word.next_is_ws,
+        word_pronunciation=word_pronunciation,
+        word_tokens=list(word_tokens),
+        word_status=word_status,
+        is_multiple_words=is_multiple_words,
+        word_explanation=word_explanation,
+        word_image_src=word_image_src,
+        word_db_id=word_db_id,
+    )
+
+
+def to_vword_struct(word: ParsedWord) -> VWordStruct:
+    (
+        word_string,
+        word_lemma,
+        word_pos,
+        is_word,
+        word_pronunciation,
+        word_tokens,
+        word_status,
+        is_multiple_words,
+        word_explanation,
+        word_image_src,
+        word_db_id,
+    ) = _vword_values(word)
+    return VWordStruct(
+        word_string=word_string,
+        word_lemma=word_lemma,
+        word_pos=word_pos,
+        is_word=is_word,
+        next_is_ws=word.next_is_ws,
+        word_pronunciation=word_pronunciation,
+        word_tokens=list(word_tokens),
+        word_status=word_status,
+        is_multiple_words=is_multiple_words,
+        word_explanation=word_explanation,
+        word_image_src=word_image_src,
+        word_db_id=word_db_id,
+    )
+
+
+def to_parsed_segment_struct(segment: ParsedTextSegment) -> ParsedTextSegmentStruct:
+    """the encoded form of a parsed segment, its words are converted here rather than when they are matched"""
+    return ParsedTextSegmentStruct(
+        segment_words=[to_vword_struct(word) for word in segment.segment_words],
+        segment_value=segment.segment_value,
+        segment_raw=segment.segment_raw,
+        segment_type=segment.segment_type,
+        paragraph_order=segment.paragraph_order,
+        sentence_order=segment.sentence_order,
+    )
+
+
+async def paragraph2segment(paragraph: TokenizedParagraphSegment, term_trie: TermTrie) -> list[SentenceSegment]:
     """
     Returns:
         object: TextParagraphSegment
     """
-    sents: list[list[WordToken]] = language_parser.split_sentences_and_tokenize(text)
-    max_loop_num = len(text) * 100
+    sents: list[list[WordToken]] = paragraph.segment_value
+    max_loop_num = sum(len(sent) for sent in sents) * 100
 
     sentences = []
-    for index, sent in enumerate(sents, 1):
-        parsed_sent = await match_word_in_sentence(sent, word_index, max_loop_num)
-        parsed_sent.paragraph_order = paragraph_order
+    for index, (sent, token_ids) in enumerate(zip(sents, paragraph.token_ids, strict=True), 1):
+        parsed_sent = await match_word_in_sentence(sent, token_ids, term_trie, max_loop_num)
+        parsed_sent.paragraph_order = paragraph.paragraph_order
         parsed_sent.sentence_order = index
         sentences.append(parsed_sent)
     return sentences
 
 
-async def get_parsed_text_segments(
-    segmentlist: list[Segment], parser: LanguageParser, word_index: dict[str, list[Word]]
-) -> list[ParsedTextSegment]:
-    paragraph_order = 1
-    res: list[ParsedTextSegment] = []
+def assemble_tokenized_segments(
+    segmentlist: list[Segment], paragraphs: list[list[list[WordToken]]], first_paragraph_order: int = 1
+) -> list[TokenizedSegment]:
+    """put the tokenized text paragraphs back in place of the raw paragraphs"""
+    paragraph_iter = iter(paragraphs)
+    paragraph_order = first_paragraph_order
+    res: list[TokenizedSegment] = []
     for segment in segmentlist:
         if isinstance(segment, TextRawParagraphSegment):
-            sentence_segments = await text2segment(segment.segment_value, parser, paragraph_order, word_index)
+            res.append(TokenizedParagraphSegment(segment_value=next(paragraph_iter), paragraph_order=paragraph_order))
+            paragraph_order += 1
+        else:
+            res.append(segment)  # type: ignore[arg-type]
+    return res
+
+
+def tokenize_segments(
+    segmentlist: list[Segment], parser: LanguageParser, batch_size: int | None = None
+) -> list[TokenizedSegment]:
+    """split and tokenize every text paragraph, the result does not depend on the word index
+
+    all paragraphs are sent to the parser in one batch call
+    """
+    texts = [segment.segment_value for segment in segmentlist if isinstance(segment, TextRawParagraphSegment)]
+    return assemble_tokenized_segments(segmentlist, parser.split_sentences_and_tokenize_many(texts, batch_size))
+
+
+def get_token_strings(segmentlist: list[TokenizedSegment]) -> set[str]:
+    """distinct token strings of the text, the only first words its matching can use"""
+    return {
+        token.word_string
+        for segment in segmentlist
+        if isinstance(segment, TokenizedParagraphSegment)
+        for sent in segment.segment_value
+        for token in sent
+    }
+
+
+def get_vocabulary_strings(segmentlist: list[TokenizedSegment]) -> set[str]:
+    """distinct strings of the tokens of the text, the ones ``dump_tokenized_segments`` stores as vocabulary ids"""
+    strings = {
+        string
+        for segment in segmentlist
+        if isinstance(segment, TokenizedParagraphSegment)
+        for sent in segment.segment_value
+        for token in sent
+        for string in (token.word_string, token.word_lemma, token.word_pos, token.word_pronunciation)
+    }
+    strings.discard(None)  # type: ignore[arg-type]
+    return strings
+
+
+def set_token_ids(segmentlist: list[TokenizedSegment], vocabulary: Vocabulary) -> None:
+    """fill the ``token_ids`` of the tokenized paragraphs, the sentences are matched on them"""
+    for segment in segmentlist:
+        if isinstance(segment, TokenizedParagraphSegment):
+            segment.token_ids = [
+                vocabulary.encode(token.word_string for token in sent) for sent in segment.segment_value
+            ]
+
+
+def get_word_overlay(segmentlist: list[TokenizedSegment], term_trie: TermTrie) -> list[WordOverlay]:
+    """positions of the matched words in the token stream, with the same matching as match_word_in_sentence"""
+    res: list[WordOverlay] = []
+    for segment in segmentlist:
+        if not isinstance(segment, TokenizedParagraphSegment):
+            continue
+        for sentence_order, token_ids in enumerate(segment.token_ids, 1):
+            start_position = 0
+            while start_position < len(token_ids):
+                match = term_trie.longest_match(token_ids, start_position)
+                if match is not None:
+                    db_word, end_position = match
+                    res.append(
+                        WordOverlay(
+                            paragraph_order=segment.paragraph_order,
+                            sentence_order=sentence_order,
+                            token_start=start_position,
+                            token_count=end_position - start_position + 1,
+                            word_db_id=db_word.id,
+                            word_status=db_word.word_status,
+                        )
+                    )
+                    start_position = end_position
+                start_position += 1
+    return res
+
+
+async def match_tokenized_segments(segmentlist: list[TokenizedSegment], term_trie: TermTrie) -> list[ParsedTextSegment]:
+    res: list[ParsedTextSegment] = []
+    for segment in segmentlist:
+        if isinstance(segment, TokenizedParagraphSegment):
+            sentence_segments = await paragraph2segment(segment, term_trie)
             for sentence_segment in sentence_segments:
                 res.append(
                     ParsedTextSegment(
                         segment_words=sentence_segment.segment_value,
                         segment_type=sentence_segment.segment_type,
-                        paragraph_order=paragraph_order,
+                        paragraph_order=segment.paragraph_order,
                         sentence_order=sentence_segment.sentence_order,
                     )
                 )
-            paragraph_order += 1
         else:
             res.append(ParsedTextSegment(**segment.__dict__))
     return res
+
+
+async def get_parsed_text_segments(
+    segmentlist: list[Segment], parser: LanguageParser, term_trie: TermTrie, vocabulary: Vocabulary
+) -> list[ParsedTextSegment]:
+    tokenized_segments = tokenize_segments(segmentlist, parser)
+    set_token_ids(tokenized_segments, vocabulary)
+    return await match_tokenized_segments(tokenized_segments, term_trie)
+
+
+def compact_parsed_segments(segmentlist: list[ParsedTextSegment]) -> CompactBookText:
+    """encode the parsed segments with the table of their distinct words, each word is sent once per chapter"""
+    word_index: dict[tuple[Any, ...], int] = {}
+    words: list[CompactWord] = []
+    token_words: list[int] = []
+    token_ws: list[int] = []
+    segments: list[CompactSegment] = []
+    for segment in segmentlist:
+        token_start = len(token_words)
+        for word in segment.segment_words:
+            key = _vword_values(word)
+            index = word_index.get(key)
+            if index is None:
+                index = word_index[key] = len(words)
+                words.append(CompactWord(*key[:5], list(key[5]), *key[6:]))
+            token_words.append(index)
+            token_ws.append(int(word.next_is_ws))
+        token_count = len(token_words) - token_start
+        segments.append(
+            CompactSegment(
+                segment_type=segment.segment_type,
+                segment_value=segment.segment_value,
+                segment_raw=segment.segment_raw,
+                paragraph_order=segment.paragraph_order,
+                sentence_order=segment.sentence_order,
+                token_start=token_start if token_count else 0,
+                token_count=token_count,
+            )
+        )
+    return CompactBookText(
+        word_fields=COMPACT_WORD_FIELDS, words=words, token_words=token_words, token_ws=token_ws, segments=segments
+    )
+
+
+def dump_token(token: WordToken) -> list[Any]:
+    return [
+        token.word_string,
+        token.word_lemma,
+        token.word_pos,
+        token.is_word,
+        token.next_is_ws,
+        token.word_pronunciation,
+    ]
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def load_token(data: list[Any]) -> WordToken:
+    """the strings are interned, the tokens of a chapter share one copy of each distinct string"""
+    word_string, word_lemma, word_pos, is_word, next_is_ws, word_pronunciation = data
+    return WordToken(
+        word_string=_intern(word_string),
+        word_lemma=_intern(word_lemma),
+        word_pos=_intern(word_pos),
+        is_word=is_word,
+        next_is_ws=next_is_ws,
+        word_pronunciation=_intern(word_pronunciation),
+    )
+
+
+_segment_types: dict[str, type[Segment]] = {
+    segment_type.segment_type: segment_type  # type: ignore[misc]
+    for segment_type in (
+        ImageSegment,
+        SoftLineBreakSegment,
+        HardLineBreakSegment,
+        BlockSegment,
+        TextRawParagraphSegment,
+    )
+}
+
+
+def dump_segments(segmentlist: list[Segment]) -> list[dict[str, Any]]:
+    """convert the segments of parse_markdown into json compatible data"""
+    return [dict(segment.__dict__) for segment in segmentlist]
+
+
+def load_segments(data: list[dict[str, Any]]) -> list[Segment]:
+    return [_segment_types[item["segment_type"]](**item) for item in data]
+
+
+_tokenized_segment_types: dict[str, type[TokenizedSegment]] = {
+    segment_type.segment_type: segment_type  # type: ignore[misc]
+    for segment_type in (ImageSegment, SoftLineBreakSegment, HardLineBreakSegment, BlockSegment)
+}
+
+
+def dump_sentence(sentence: list[WordToken], vocabulary: Vocabulary) -> list[int]:
+    """the tokens as a flat array of ``TOKEN_STRIDE`` ints each: the vocabulary ids of word_string, word_lemma,
+    word_pos and word_pronunciation, then the ``IS_WORD`` and ``NEXT_IS_WS`` flags"""
+    get_id = vocabulary.get_id
+    res: list[int] = []
+    for token in sentence:
+        res += (
+            get_id(token.word_string),
+            get_id(token.word_lemma),
+            get_id(token.word_pos),
+            get_id(token.word_pronunciation),
+            (IS_WORD if token.is_word else 0) | (NEXT_IS_WS if token.next_is_ws else 0),
+        )
+    return res
+
+
+def load_sentence(token_ids: Sequence[int], vocabulary: Vocabulary) -> list[WordToken]:
+    """the tokens of ``dump_sentence``, they share the strings of the vocabulary"""
+    get_token = vocabulary.get_token
+    return [
+        WordToken(
+            word_string=get_token(token_ids[i]),  # type: ignore[arg-type]
+            word_lemma=get_token(token_ids[i + 1]),  # type: ignore[arg-type]
+            word_pos=get_token(token_ids[i + 2]),  # type: ignore[arg-type]
+            is_word=bool(token_ids[i + 4] & IS_WORD),
+            next_is_ws=bool(token_ids[i + 4] & NEXT_IS_WS),
+            word_pronunciation=get_token(token_ids[i + 3]),  # type: ignore[arg-type]
+        )
+        for i in range(0, len(token_ids), TOKEN_STRIDE)
+    ]
+
+
+def dump_tokenized_segments(segmentlist: list[TokenizedSegment], vocabulary: Vocabulary) -> list[dict[str, Any]]:
+    """convert tokenized segments into json compatible data, the sentences are stored as arrays of vocabulary ids
+
+    ``vocabulary`` must hold the ``get_vocabulary_strings`` of the segments
+    """
+    res: list[dict[str, Any]] = []
+    for segment in segmentlist:
+        if isinstance(segment, TokenizedParagraphSegment):
+            res.append(
+                {
+                    "segment_type": segment.segment_type,
+                    "paragraph_order": segment.paragraph_order,
+                    "token_ids": [dump_sentence(sent, vocabulary) for sent in segment.segment_value],
+                }
+            )
+        else:
+            res.append(dict(segment.__dict__))
+    return res
+
+
+def get_stored_token_ids(data: list[dict[str, Any]]) -> set[int]:
+    """distinct vocabulary ids of the data of ``dump_tokenized_segments``, the ids ``load_tokenized_segments`` reads"""
+    token_ids = {
+        token_id
+        for item in data
+        if item["segment_type"] == TokenizedParagraphSegment.segment_type
+        for sent in item["token_ids"]
+        for i in range(0, len(sent), TOKEN_STRIDE)
+        for token_id in sent[i : i + TOKEN_STRIDE - 1]
+    }
+    token_ids.discard(UNKNOWN_ID)
+    return token_ids
+
+
+def load_tokenized_segments(data: list[dict[str, Any]], vocabulary: Vocabulary) -> list[TokenizedSegment]:
+    """``vocabulary`` must hold the ``get_stored_token_ids`` of the data"""
+    res: list[TokenizedSegment] = []
+    for item in data:
+        if item["segment_type"] == TokenizedParagraphSegment.segment_type:
+            sentences = [array(ID_TYPECODE, sent) for sent in item["token_ids"]]
+            res.append(
+                TokenizedParagraphSegment(
+                    segment_value=[load_sentence(sent, vocabulary) for sent in sentences],
+                    paragraph_order=item["paragraph_order"],
+                    token_ids=[sent[::TOKEN_STRIDE] for sent in sentences],
+                )
+            )
+        else:
+            res.append(_tokenized_segment_types[item["segment_type"]](**item))
+    return res
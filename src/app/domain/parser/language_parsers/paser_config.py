@@ -1,18 +1,55 @@
+"""Parser names and models, read without importing spacy or fugashi.
+
+``parser_registry`` maps every parser name to the ``module:ClassName`` of its implementation, the module
+is imported by ``LanguageParser.get_parser`` the first time the parser is used.
+"""
+
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from app.config.base import get_user_settings
-
 if TYPE_CHECKING:
     from app.domain.parser.language_parsers.language_parser import LanguageParser
 
 spacy_model_mapping = {
     "english": "en_core_web_sm",
 }
-fugashi_unidic = {
-    "written_japanese": get_user_settings().unidic_cwj_path,
-    "spoken_japanese": get_user_settings().unidic_csj_path,
+# the reader only needs text, pos_, lemma_, is_punct and sentence boundaries,
+# "lean" drops the dependency parser and ner and splits sentences with the senter component
+spacy_pipeline_profiles: dict[str, dict[str, list[str]]] = {
+    "lean": {"exclude": ["parser", "ner"], "enable": ["senter"]},
+    "full": {"exclude": [], "enable": []},
+}
+spacy_language_profile = {
+    "english": "lean",
+    "japanese": "lean",
+}
+fugashi_parser_names = ("written_japanese", "spoken_japanese")
+# "rules" splits the sentences with japanese_sentence_splitter, "spacy" keeps the sentences of the spacy pipeline
+# and "konoha" those of konoha's SentenceTokenizer, "rules" is opt-in as it also ends the sentences at the
+# exclamation and question marks
+japanese_sentence_splitters = {
+    "japanese": "spacy",
+    "written_japanese": "konoha",
+    "spoken_japanese": "konoha",
+}
+
+
+def get_fugashi_unidic() -> dict[str, str]:
+    """unidic dictionary of the fugashi parsers, the paths come from the user settings"""
+    from app.config.base import get_user_settings
+
+    return {
+        "written_japanese": get_user_settings().unidic_cwj_path,
+        "spoken_japanese": get_user_settings().unidic_csj_path,
+    }
+
+
+_package = "app.domain.parser.language_parsers"
+parser_registry: dict[str, str] = {
+    **{parser_name: f"{_package}.spacy_parser:SpacyParser" for parser_name in spacy_model_mapping},
+    "japanese": f"{_package}.japanese_parser:JapaneseParser",
+    **{parser_name: f"{_package}.fugashi_parser:SpokenJapaneseParser" for parser_name in fugashi_parser_names},
 }
 parser_mapping: dict[str, type[LanguageParser]] = {}
-parser_instances: dict[str, LanguageParser] = {}
+"""classes of the parsers imported so far, the instances are kept by ``model_manager``"""
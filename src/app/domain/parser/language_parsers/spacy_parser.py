@@ -1,64 +1,118 @@
-from functools import lru_cache
-
 import spacy
 from spacy.language import Language
+from spacy.tokens import Doc, Span
 
+from app.config.base import get_parser_settings
 from app.domain.parser.markdown_text_parser import WordToken
 
 # from app.lib.timer import sync_timed
 from .language_parser import LanguageParser
-from .parser_tool import register_parser
-from .paser_config import spacy_model_mapping
+from .paser_config import spacy_language_profile, spacy_model_mapping, spacy_pipeline_profiles
+
+__all__ = (
+    "SpacyParser",
+    "split_sentences_and_tokenize",
+    "split_sentences_and_tokenize_many",
+    "tokenize_sentences_many",
+    "get_pipeline_version",
+    "get_pipeline_profile",
+    "load_pipeline",
+)
+
+SENTENCE_COMPONENTS = {"parser", "senter", "sentencizer"}
+
 
-__all__ = ("SpacyParser", "split_sentences_and_tokenize")
+def _span_to_tokens(span: Doc | Span) -> list[WordToken]:
+    return [
+        WordToken(
+            word_string=token.text,
+            word_pos=token.pos_,
+            word_lemma=token.lemma_,
+            is_word=not token.is_punct,
+            next_is_ws=" " in token.text_with_ws,
+        )
+        for token in span
+    ]
+
+
+def _doc_to_sentences(doc: Doc) -> list[list[WordToken]]:
+    return [_span_to_tokens(sent) for sent in doc.sents]
 
 
-@lru_cache
 def split_sentences_and_tokenize(nlp: Language, text: str) -> list[list[WordToken]]:
-    res = []
-    for sent in nlp(text).sents:
-        sentence_tokens = [
-            WordToken(
-                word_string=token.text,
-                word_pos=token.pos_,
-                word_lemma=token.lemma_,
-                is_word=not token.is_punct,
-                next_is_ws=" " in token.text_with_ws,
-            )
-            for token in sent
-        ]
-        res.append(sentence_tokens)
-    return res
+    return _doc_to_sentences(nlp(text))
+
+
+def split_sentences_and_tokenize_many(
+    nlp: Language, texts: list[str], batch_size: int | None = None
+) -> list[list[list[WordToken]]]:
+    batch_size = batch_size or get_parser_settings().BATCH_SIZE
+    return [_doc_to_sentences(doc) for doc in nlp.pipe(texts, batch_size=batch_size)]
+
+
+def tokenize_sentences_many(
+    nlp: Language, paragraphs: list[list[str]], batch_size: int | None = None
+) -> list[list[list[WordToken]]]:
+    """tokenize the sentences of paragraphs split beforehand, every sentence is a doc of its own"""
+    batch_size = batch_size or get_parser_settings().BATCH_SIZE
+    docs = nlp.pipe([sentence for sentences in paragraphs for sentence in sentences], batch_size=batch_size)
+    sentence_tokens = (_span_to_tokens(doc) for doc in docs)
+    return [[next(sentence_tokens) for _ in sentences] for sentences in paragraphs]
+
 
+def get_pipeline_version(nlp: Language) -> str:
+    return (
+        f"spacy-{spacy.__version__}/{nlp.meta['lang']}_{nlp.meta['name']}-{nlp.meta['version']}"
+        f"[{','.join(nlp.pipe_names)}]"
+    )
 
-nlp_mapping: dict[str, Language] = {}
+
+def get_pipeline_profile(language_name: str) -> str:
+    return get_parser_settings().SPACY_PROFILE or spacy_language_profile.get(language_name, "lean")
+
+
+def load_pipeline(model_name: str, profile_name: str) -> Language:
+    """load a spacy model with only the components of the pipeline profile"""
+    if profile_name not in spacy_pipeline_profiles:
+        raise ValueError(f"Spacy pipeline profile '{profile_name}' is not exists")
+    profile = spacy_pipeline_profiles[profile_name]
+    nlp = spacy.load(model_name, exclude=profile["exclude"])
+    for component in profile["enable"]:
+        if component in nlp.disabled:
+            nlp.enable_pipe(component)
+    if not SENTENCE_COMPONENTS.intersection(nlp.pipe_names):
+        # the model ships without senter
+        nlp.add_pipe("sentencizer")
+    return nlp
 
 
 def _get_language_parser(language_name: str) -> Language:
     if language_name not in spacy_model_mapping:
         raise NotImplementedError(f"Language {language_name} is not supported")
-    if language_name not in nlp_mapping:
-        if spacy.util.is_package(spacy_model_mapping[language_name]):
-            nlp_mapping[language_name] = spacy.load(spacy_model_mapping[language_name])
-        else:
-            raise ValueError(
-                f"Spacy model {spacy_model_mapping[language_name]} for Language {language_name} is not exists"
-            )
-    return nlp_mapping[language_name]
+    if not spacy.util.is_package(spacy_model_mapping[language_name]):
+        raise ValueError(f"Spacy model {spacy_model_mapping[language_name]} for Language {language_name} is not exists")
+    return load_pipeline(spacy_model_mapping[language_name], get_pipeline_profile(language_name))
 
 
-@register_parser("spacy")
 class SpacyParser(LanguageParser):
     def __init__(self, language_name: str) -> None:
         super().__init__(language_name)
         self.nlp = _get_language_parser(language_name)
 
+    def get_parser_version(self) -> str:
+        return get_pipeline_version(self.nlp)
+
     def split_sentences(self, text: str):  # type: ignore
         pass
 
-    def split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
+    def _split_sentences_and_tokenize(self, text: str) -> list[list[WordToken]]:
         return split_sentences_and_tokenize(self.nlp, text)
 
+    def _split_sentences_and_tokenize_many(
+        self, texts: list[str], batch_size: int | None = None
+    ) -> list[list[list[WordToken]]]:
+        return split_sentences_and_tokenize_many(self.nlp, texts, batch_size)
+
     def tokenize(self, text: str) -> list[WordToken]:
         return [
             WordToken(
@@ -0,0 +1,70 @@
+"""Token trie over the ``Word.word_token_ids`` of a language.
+
+The trie is keyed by the vocabulary ids of the tokens, a sentence is matched on the ``token_ids`` of its
+tokenized paragraph. ``TermTrie.longest_match`` walks the trie from a sentence position and returns the
+longest term that matches, so a sentence is matched in a single left-to-right pass whatever the number of
+terms sharing the same first token.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping, Sequence
+
+    from app.domain.word.word_index import WordRecord
+
+__all__ = ("TermTrie",)
+
+
+class TermTrieNode:
+    __slots__ = ("children", "word")
+
+    def __init__(self) -> None:
+        self.children: dict[int, TermTrieNode] = {}
+        self.word: WordRecord | None = None
+
+
+class TermTrie:
+    def __init__(self, words: Iterable[WordRecord] = ()) -> None:
+        self.root = TermTrieNode()
+        for word in words:
+            self.insert(word)
+
+    @classmethod
+    def from_word_index(cls, word_index: Mapping[str, Iterable[WordRecord]]) -> TermTrie:
+        return cls(word for words in word_index.values() for word in words)
+
+    def insert(self, word: WordRecord) -> None:
+        """add a term, the first inserted word wins when several words have the same tokens"""
+        if not word.word_token_ids:
+            return
+        node = self.root
+        for token_id in word.word_token_ids:
+            child = node.children.get(token_id)
+            if child is None:
+                child = node.children[token_id] = TermTrieNode()
+            node = child
+        if node.word is None:
+            node.word = word
+
+    def replace_branches(self, first_token_ids: Iterable[int], words: Iterable[WordRecord]) -> None:
+        """rebuild the branches of all terms starting with ``first_token_ids`` from ``words``"""
+        for token_id in first_token_ids:
+            self.root.children.pop(token_id, None)
+        for word in words:
+            self.insert(word)
+
+    def longest_match(self, token_ids: Sequence[int], start_position: int) -> tuple[WordRecord, int] | None:
+        """return the longest term starting at ``start_position`` and the position of its last token"""
+        node = self.root
+        match = None
+        for position in range(start_position, len(token_ids)):
+            next_node = node.children.get(token_ids[position])
+            if next_node is None:
+                break
+            node = next_node
+            if node.word is not None:
+                match = (node.word, position)
+        return match
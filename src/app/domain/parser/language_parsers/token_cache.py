@@ -0,0 +1,156 @@
+"""Paragraph tokenization cache shared by every ``LanguageParser``.
+
+Entries are keyed by the parser name and a blake2b digest of the paragraph, so the cache never holds the
+source text. Values are stored as nested tuples of token tuples (see ``pack_sentences``), callers always
+get fresh ``WordToken`` objects back and can not corrupt the cached result. The cache evicts the least
+recently used entries once the estimated size of the stored values exceeds ``max_bytes``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config.base import get_parser_settings
+from app.domain.parser.markdown_text_parser import WordToken
+
+__all__ = (
+    "TokenCache",
+    "TokenCacheStats",
+    "get_token_cache",
+    "pack_sentences",
+    "unpack_sentences",
+)
+
+PackedToken = tuple[str, str, str, bool, bool, str]
+PackedSentences = tuple[tuple[PackedToken, ...], ...]
+CacheKey = tuple[str, bytes]
+
+
+def pack_sentences(sentences: list[list[WordToken]]) -> PackedSentences:
+    return tuple(
+        tuple(
+            (
+                token.word_string,
+                token.word_lemma,
+                token.word_pos,
+                token.is_word,
+                token.next_is_ws,
+                token.word_pronunciation,
+            )
+            for token in sent
+        )
+        for sent in sentences
+    )
+
+
+def unpack_sentences(packed: PackedSentences) -> list[list[WordToken]]:
+    return [
+        [
+            WordToken(
+                word_string=word_string,
+                word_lemma=word_lemma,
+                word_pos=word_pos,
+                is_word=is_word,
+                next_is_ws=next_is_ws,
+                word_pronunciation=word_pronunciation,
+            )
+            for word_string, word_lemma, word_pos, is_word, next_is_ws, word_pronunciation in sent
+        ]
+        for sent in packed
+    ]
+
+
+def _sizeof(packed: PackedSentences) -> int:
+    size = sys.getsizeof(packed)
+    for sent in packed:
+        size += sys.getsizeof(sent)
+        for token in sent:
+            # the bools are singletons, the strings are counted even when they are shared between tokens
+            size += sys.getsizeof(token) + sum(sys.getsizeof(value) for value in token[:3]) + sys.getsizeof(token[5])
+    return size
+
+
+@dataclass
+class TokenCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    current_bytes: int
+    max_bytes: int
+
+
+class TokenCache:
+    """Thread safe LRU cache bounded by the estimated memory size of the cached tokens."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[CacheKey, tuple[PackedSentences, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(parser_name: str, text: str) -> CacheKey:
+        return parser_name, hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def get(self, parser_name: str, text: str) -> list[list[WordToken]] | None:
+        key = self.make_key(parser_name, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return unpack_sentences(entry[0])
+
+    def put(self, parser_name: str, text: str, sentences: list[list[WordToken]]) -> None:
+        if self.max_bytes <= 0:
+            return
+        packed = pack_sentences(sentences)
+        size = _sizeof(packed)
+        if size > self.max_bytes:
+            return
+        key = self.make_key(parser_name, text)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (packed, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> TokenCacheStats:
+        with self._lock:
+            return TokenCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                current_bytes=self.current_bytes,
+                max_bytes=self.max_bytes,
+            )
+
+
+_token_cache: TokenCache | None = None
+
+
+def get_token_cache() -> TokenCache:
+    global _token_cache  # noqa: PLW0603
+    if _token_cache is None:
+        _token_cache = TokenCache(get_parser_settings().TOKEN_CACHE_MAX_BYTES)
+    return _token_cache
@@ -0,0 +1,79 @@
+"""Integer ids of the token strings of a language.
+
+The ``vocabulary_tokens`` table gives every normalized token string of a language an id. The parse caches store
+their sentences as arrays of these ids and the ``TermTrie`` matches a sentence on the ids of its word strings.
+A ``Vocabulary`` holds the part of the table needed by a text or a word, ``app.domain.word.vocabulary_manager``
+reads it from the database and adds the missing tokens.
+"""
+
+from __future__ import annotations
+
+import unicodedata
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+__all__ = ("ID_TYPECODE", "UNKNOWN_ID", "Vocabulary", "normalize_token")
+
+UNKNOWN_ID = 0
+"""id of ``None`` and of the strings missing from the vocabulary, no row of the table has it"""
+ID_TYPECODE = "I"
+"""``array`` typecode of the token ids"""
+
+
+def normalize_token(token: str) -> str:
+    """the NFC form of the token, the key of the vocabulary"""
+    return token if unicodedata.is_normalized("NFC", token) else unicodedata.normalize("NFC", token)
+
+
+class Vocabulary:
+    __slots__ = ("ids", "tokens")
+
+    def __init__(self, ids: Mapping[str, int] | None = None) -> None:
+        self.ids: dict[str, int] = {}
+        """ids by normalized token"""
+        self.tokens: dict[int, str] = {}
+        if ids is not None:
+            for token, token_id in ids.items():
+                self.add(token_id, token)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def add(self, token_id: int, token: str) -> None:
+        self.ids[token] = token_id
+        self.tokens[token_id] = token
+
+    def update(self, vocabulary: Vocabulary) -> None:
+        self.ids.update(vocabulary.ids)
+        self.tokens.update(vocabulary.tokens)
+
+    def find_id(self, token: str) -> int:
+        """the id of the token, ``UNKNOWN_ID`` when it is not in the vocabulary"""
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids.get(normalize_token(token), UNKNOWN_ID)
+        return token_id
+
+    def get_id(self, token: str | None) -> int:
+        """the id of the token, a ``KeyError`` is raised when it is not in the vocabulary"""
+        if token is None:
+            return UNKNOWN_ID
+        token_id = self.ids.get(token)
+        if token_id is None:
+            token_id = self.ids[normalize_token(token)]
+        return token_id
+
+    def get_token(self, token_id: int) -> str | None:
+        return None if token_id == UNKNOWN_ID else self.tokens[token_id]
+
+    def encode(self, tokens: Iterable[str]) -> array[int]:
+        """the ids of the tokens, ``UNKNOWN_ID`` for the ones which are not in the vocabulary"""
+        find_id = self.find_id
+        return array(ID_TYPECODE, [find_id(token) for token in tokens])
+
+    def decode(self, token_ids: Iterable[int]) -> list[str | None]:
+        get_token = self.get_token
+        return [get_token(token_id) for token_id in token_ids]
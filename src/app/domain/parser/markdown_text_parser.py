@@ -1,22 +1,40 @@
 import dataclasses
 from dataclasses import dataclass
-from typing import NotRequired, TypedDict
+from typing import TYPE_CHECKING, NotRequired, TypedDict
 
 import mistune
+import msgspec
 from mistune.markdown import Markdown
 
+if TYPE_CHECKING:
+    from array import array
+
+    from app.domain.word.word_index import WordRecord
+
 __all__ = (
+    "COMPACT_WORD_FIELDS",
+    "CompactBookText",
+    "CompactSegment",
+    "CompactWord",
     "MarkDownNode",
+    "MatchedWord",
+    "ParsedTextSegmentStruct",
+    "VWordStruct",
+    "WordTokenStruct",
     "ParagraphSegment",
     "SoftLineBreakSegment",
     "TextParagraphSegment",
     "SentenceSegment",
     "WordToken",
     "TextRawParagraphSegment",
+    "TokenizedParagraphSegment",
+    "TokenizedSegment",
     "parse_markdown",
     "ParsedTextSegment",
+    "ParsedWord",
     "Segment",
     "VWord",
+    "WordOverlay",
 )
 
 markdown: Markdown = mistune.create_markdown(renderer=None)
@@ -36,7 +54,8 @@ class MarkDownNode(TypedDict):
 
 # kw_only for dataclass inheritance
 # https://medium.com/@aniscampos/python-dataclass-inheritance-finally-686eaf60fbb5
-@dataclass(kw_only=True)
+# slots, a chapter holds tens of thousands of tokens and the per-instance __dict__ doubled their size
+@dataclass(kw_only=True, slots=True)
 class WordToken:
     """
     using for parsedToken
@@ -50,10 +69,10 @@ class WordToken:
     word_pronunciation: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class VWord(WordToken):
     """
-    using for frontend
+    using for frontend, built from a ParsedWord by parser_tool.to_vword at serialization time
     """
 
     word_tokens: list[str]
@@ -64,18 +83,46 @@ class VWord(WordToken):
     word_db_id: int = -1
 
 
+@dataclass(slots=True)
+class MatchedWord:
+    """
+    a Word of the vocabulary matched on the tokens of a sentence, next_is_ws is the one of its last token
+    """
+
+    word: "WordRecord"
+    next_is_ws: bool
+
+
+ParsedWord = WordToken | MatchedWord
+"""a word of a matched sentence, the unmatched tokens are kept as they are"""
+
+
 @dataclass
 class SentenceSegment:
-    segment_value: list[VWord]
+    segment_value: list[ParsedWord]
     segment_raw: str = ""
     segment_type: str = "sentence"
     paragraph_order: int = 0
     sentence_order: int = 0
 
 
+@dataclass
+class WordOverlay:
+    """
+    position of a matched Word in the token stream, using for the status overlay
+    """
+
+    paragraph_order: int
+    sentence_order: int
+    token_start: int
+    token_count: int
+    word_db_id: int
+    word_status: int
+
+
 @dataclass
 class ParsedTextSegment:
-    segment_words: list[VWord] = dataclasses.field(
+    segment_words: list[ParsedWord] = dataclasses.field(
         default_factory=list,
     )
     segment_value: str = ""
@@ -85,6 +132,91 @@ class ParsedTextSegment:
     sentence_order: int = 0
 
 
+class WordTokenStruct(msgspec.Struct, rename="camel", kw_only=True):
+    """
+    WordToken as a msgspec Struct, encoded with the keys of the camel case DTOs
+    """
+
+    word_string: str
+    word_lemma: str
+    word_pos: str
+    is_word: bool = False
+    next_is_ws: bool = False
+    word_pronunciation: str = ""
+
+
+class VWordStruct(WordTokenStruct, kw_only=True):
+    word_tokens: list[str]
+    word_status: int = 0
+    is_multiple_words: bool = False
+    word_explanation: str = ""
+    word_image_src: str | None = None
+    word_db_id: int = -1
+
+
+class ParsedTextSegmentStruct(msgspec.Struct, rename="camel"):
+    """
+    ParsedTextSegment as a msgspec Struct, parser_tool.to_parsed_segment_struct builds it from the dataclass
+    """
+
+    segment_words: list[VWordStruct] = msgspec.field(default_factory=list)
+    segment_value: str = ""
+    segment_raw: str = ""
+    segment_type: str = ""
+    paragraph_order: int = 0
+    sentence_order: int = 0
+
+
+class CompactWord(msgspec.Struct, array_like=True):
+    """
+    distinct VWord of a chapter without its next_is_ws, encoded as an array in the COMPACT_WORD_FIELDS order
+    """
+
+    word_string: str
+    word_lemma: str
+    word_pos: str
+    is_word: bool
+    word_pronunciation: str
+    word_tokens: list[str]
+    word_status: int
+    is_multiple_words: bool
+    word_explanation: str
+    word_image_src: str | None
+    word_db_id: int
+
+
+COMPACT_WORD_FIELDS = [
+    name.split("_")[0] + "".join(part.capitalize() for part in name.split("_")[1:])
+    for name in CompactWord.__struct_fields__
+]
+
+
+class CompactSegment(msgspec.Struct, rename="camel", omit_defaults=True):
+    """
+    ParsedTextSegment whose words are the tokens token_start to token_start + token_count of the chapter
+    """
+
+    segment_type: str
+    segment_value: str = ""
+    segment_raw: str = ""
+    paragraph_order: int = 0
+    sentence_order: int = 0
+    token_start: int = 0
+    token_count: int = 0
+
+
+class CompactBookText(msgspec.Struct, rename="camel"):
+    """
+    dictionary encoded ParsedBookTextStruct, every token is an index in words and a whitespace flag
+    """
+
+    word_fields: list[str]
+    words: list[CompactWord]
+    token_words: list[int]
+    token_ws: list[int]
+    segments: list[CompactSegment]
+
+
 @dataclass
 class BaseSegment:
     segment_value: str = ""
@@ -148,6 +280,23 @@ Segment = (
 )
 
 
+@dataclass
+class TokenizedParagraphSegment:
+    """
+    paragraph after sentence splitting and tokenization, before word matching
+    """
+
+    segment_value: list[list[WordToken]]
+    segment_raw: str = ""
+    segment_type: str = "tokenizedparagraph"
+    paragraph_order: int = 0
+    token_ids: list["array[int]"] = dataclasses.field(default_factory=list)
+    """vocabulary ids of the word strings of every sentence, the keys of the term trie, see parser_tool.set_token_ids"""
+
+
+TokenizedSegment = ImageSegment | SoftLineBreakSegment | HardLineBreakSegment | BlockSegment | TokenizedParagraphSegment
+
+
 @dataclass
 class NodeAttr:
     url: str | None
@@ -0,0 +1,61 @@
+"""Load the parsers of the languages in the database when the application starts.
+
+``spacy.load`` or a fugashi Tagger take seconds, the warm-up runs them in the parse executor before the
+first request of a language instead of during it. It runs in the background so the server answers the
+health check, which reports the parsers as not ready until the warm-up is over.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+
+import structlog
+from sqlalchemy import select
+
+from app.config.base import get_parser_settings
+from app.db.models.language import Language
+from app.domain.parser.executor import get_parse_executor
+
+__all__ = ("WarmUpState", "start_parser_warm_up", "stop_parser_warm_up", "warm_up_parsers", "warm_up_state")
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class WarmUpState:
+    ready: bool = True
+    """False from the application startup until the parsers are loaded, always True when warm-up is disabled"""
+    failed_parsers: list[str] = field(default_factory=list)
+    task: asyncio.Task[None] | None = None
+
+
+warm_up_state = WarmUpState()
+
+
+async def warm_up_parsers() -> None:
+    from app.config.app import alchemy
+
+    try:
+        async with alchemy.get_session() as session:
+            parser_names = list(await session.scalars(select(Language.parser_name).distinct()))
+        warm_up_state.failed_parsers = await get_parse_executor().warm_up(parser_names)
+        logger.info("Parsers warmed up", parser_names=parser_names, failed_parsers=warm_up_state.failed_parsers)
+    except Exception:
+        logger.exception("Parser warm-up failed")
+    finally:
+        warm_up_state.ready = True
+
+
+def start_parser_warm_up() -> None:
+    if not get_parser_settings().WARM_UP:
+        return
+    warm_up_state.ready = False
+    warm_up_state.task = asyncio.create_task(warm_up_parsers(), name="parser-warm-up")
+
+
+async def stop_parser_warm_up() -> None:
+    if warm_up_state.task is not None:
+        warm_up_state.task.cancel()
+        await asyncio.gather(warm_up_state.task, return_exceptions=True)
+        warm_up_state.task = None
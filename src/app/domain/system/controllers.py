@@ -7,6 +7,7 @@ from litestar import Controller, MediaType, get
 from litestar.response import Response
 from sqlalchemy import text
 
+from app.domain.parser.warmup import warm_up_state
 from app.domain.system.dtos import SystemHealth
 
 from .urls import SYSTEM_HEALTH
@@ -35,7 +36,8 @@ class SystemController(Controller):
         tags=["System"],
         summary="Health Check",
         description="Execute a health check against backend components.  "
-        "Returns system information including database and cache status.",
+        "Returns system information including database and cache status, "
+        "not ready (503) while the language parsers are loaded at startup.",
         signature_namespace={"SystemHealth": SystemHealth},
     )
     async def check_system_health(self, db_session: AsyncSession) -> Response[SystemHealth]:
@@ -47,20 +49,29 @@ class SystemController(Controller):
             db_ping = False
 
         db_status = "online" if db_ping else "offlinae"
+        parser_status = "ready" if warm_up_state.ready else "warming_up"
         healthy = bool(db_ping)
         if healthy:
             await logger.adebug(
                 "System Health",
                 database_status=db_status,
+                parser_status=parser_status,
             )
         else:
             await logger.awarn(
                 "System Health Check",
                 database_status=db_status,
+                parser_status=parser_status,
             )
 
+        if not db_ping:
+            status_code = 500
+        elif not warm_up_state.ready:
+            status_code = 503
+        else:
+            status_code = 200
         return Response(
-            content=SystemHealth(database_status=db_status),  # type: ignore
-            status_code=200 if db_ping else 500,
+            content=SystemHealth(database_status=db_status, parser_status=parser_status),  # type: ignore
+            status_code=status_code,
             media_type=MediaType.JSON,
         )
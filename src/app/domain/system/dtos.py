@@ -11,6 +11,7 @@ __all__ = ["SystemHealth", "SystemHealthDTO"]
 @dataclass
 class SystemHealth:
     database_status: Literal["online", "offline"]
+    parser_status: Literal["ready", "warming_up"] = "ready"
     app: str = settings.app.NAME
     version: str = settings.app.BUILD_NUMBER
 
@@ -37,20 +37,16 @@ class WordController(Controller):
     @post(path="/create_or_update", dto=WordPatchDTO)
     async def create_or_update(self, word_service: WordService, data: DTOData[WordUpdate]) -> Word:
         db_obj = await word_service.create_or_update(data.create_instance().__dict__)
-        await word_service.update_word_index(db_obj.language_id, db_obj.first_word)
         return word_service.to_dto(db_obj)
 
     @post("/create", dto=WordCreateDTO)
     async def create_word(self, word_service: WordService, data: DTOData[WordCreate]) -> Word:
         db_obj = await word_service.create(data.as_builtins())
-        await word_service.update_word_index(db_obj.language_id, db_obj.first_word)
         return word_service.to_dto(db_obj)
 
     @delete("/delete/{word_id:int}")
     async def delete_word(self, word_service: WordService, word_id: int, request: Request) -> None:
-        db_obj = await word_service.delete(item_id=word_id, auto_commit=True)
-        await word_service.update_word_index(db_obj.language_id, db_obj.first_word)
-        # return word_service.to_dto(db_obj)
+        await word_service.delete(item_id=word_id, auto_commit=True)
 
     @post("/update/{word_string:str}")
     async def update_word(self, word_service: WordService, data: WordUpdate) -> Word:
@@ -76,10 +72,12 @@ class WordController(Controller):
             with (get_user_settings().WORD_IMAGE_PATH / image_name).open("wb") as f:
                 f.write(content)
             if word_id is not None:
-                db_obj = await word_image_service.create(
-                    {"word_id": word_id, "word_image_name": image_name.split(".")[0], "word_image_path": image_name}
+                await word_image_service.create(
+                    {"word_id": word_id, "word_image_name": image_name.split(".")[0], "word_image_path": image_name},
+                    auto_commit=False,
                 )
-                await word_service.update_word_index(db_obj.word.language_id, db_obj.word.first_word)
+                word = await word_service.get(word_id)
+                await word_service.bump_word_index(word.language_id, word_id)
 
         filename = data.filename
         return f"{filename}"
@@ -18,7 +18,9 @@ __all__ = (
 
 
 class WordDTO(SQLAlchemyDTO[Word]):
-    config = dto.config(exclude={"word_image", "first_word"}, max_nested_depth=1, rename_fields={"id": "wordDbId"})
+    config = dto.config(
+        exclude={"word_image", "first_word", "word_token_ids"}, max_nested_depth=1, rename_fields={"id": "wordDbId"}
+    )
 
 
 # input
@@ -3,17 +3,23 @@ from __future__ import annotations
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any
 
-from litestar.repository.filters import CollectionFilter, OrderBy
+from sqlalchemy import func, update
 
+from app.config.base import get_word_index_settings
 from app.db.models.word import Word, WordImage
+from app.domain.word.vocabulary_manager import vocabulary_manager
+from app.domain.word.word_index import word_index_manager
 from app.lib.repository import SQLAlchemyAsyncRepository
 from app.lib.service import SQLAlchemyAsyncRepositoryService
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Sequence
 
     from sqlalchemy.orm import InstrumentedAttribute
 
+    from app.domain.parser.language_parsers.term_trie import TermTrie
+    from app.domain.word.word_index import WordRecord
+
 __all__ = ["WordService", "WordImageService"]
 
 
@@ -27,7 +33,6 @@ class WordService(SQLAlchemyAsyncRepositoryService[Word]):
     """Handles database operations for users."""
 
     repository_type = WordRepository
-    word_index: dict[int, dict[str, list[Word]]] = {}
 
     def __init__(self, **repo_kwargs: Any) -> None:
         self.repository: WordRepository = self.repository_type(**repo_kwargs)
@@ -44,13 +49,19 @@ class WordService(SQLAlchemyAsyncRepositoryService[Word]):
         if isinstance(data, dict):
             data["first_word"] = data["word_tokens"][0]
         db_obj = await self.to_model(data, "create")
-        return await super().create(data=db_obj, auto_commit=auto_commit)
+        await self.set_word_token_ids(db_obj)
+        db_obj = await super().create(data=db_obj, auto_commit=False)
+        await self.bump_word_index(db_obj.language_id, auto_commit=auto_commit)
+        return db_obj
 
     async def create_or_update(self, data: dict[str, Any]) -> Word:
         db_obj: Word | None = await self.get_one_or_none(word_string=data["word_string"])
         if db_obj is None:
             return await self.create(data)
-        return await super().update(item_id=db_obj.id, data=data, auto_commit=True)
+        db_obj = await super().update(item_id=db_obj.id, data=data, auto_commit=False)
+        await self.set_word_token_ids(db_obj)
+        await self.bump_word_index(db_obj.language_id)
+        return db_obj
 
     async def update(
         self,
@@ -64,32 +75,72 @@ class WordService(SQLAlchemyAsyncRepositoryService[Word]):
         id_attribute: str | InstrumentedAttribute | None = None,
     ) -> Word:
         db_obj: Word = await self.to_model(data, "update")
-        return await super().update(item_id=item_id, data=db_obj, auto_commit=True)
+        db_obj = await super().update(item_id=item_id, data=db_obj, auto_commit=False)
+        await self.set_word_token_ids(db_obj)
+        await self.bump_word_index(db_obj.language_id)
+        return db_obj
+
+    async def delete(
+        self,
+        item_id: Any,
+        auto_commit: bool | None = None,
+        auto_expunge: bool | None = None,
+        id_attribute: str | InstrumentedAttribute | None = None,
+    ) -> Word:
+        db_obj = await super().delete(item_id=item_id, auto_commit=False)
+        await self.bump_word_index(db_obj.language_id, deleted_word_ids=[db_obj.id])
+        return db_obj
 
-    async def get_word_index(self, language_id: int) -> dict[str, list[Word]]:
-        if language_id not in self.word_index:
-            self.word_index[language_id] = defaultdict(list)
-        word_list = await self.list(CollectionFilter("language_id", [language_id]), OrderBy("word_counts", "desc"))
-        for word in word_list:
-            self.word_index[language_id][word.first_word].append(word)
-        return self.word_index[language_id]
-
-    async def load_word_index(self, language_id: int) -> dict[str, list[Word]]:
-        if language_id not in self.word_index:
-            return await self.get_word_index(language_id)
-        return self.word_index[language_id]
-
-    async def update_word_index(self, language_id: int, word_string: str) -> None:
-        word_list = await self.list(
-            CollectionFilter("language_id", [language_id]),
-            CollectionFilter("first_word", [word_string]),
-            OrderBy("word_counts", "desc"),
-        )
-        if not word_list:
-            del self.word_index[language_id][word_string]
-            return
-
-        self.word_index[language_id][word_string] = list(word_list)
+    async def create_many(
+        self,
+        data: list[Word | dict[str, Any]],
+        auto_commit: bool | None = None,
+        auto_expunge: bool | None = None,
+    ) -> Sequence[Word]:
+        db_objs = [await self.to_model(item, "create") for item in data]
+        await self.set_word_token_ids(*db_objs)
+        return await super().create_many(data=db_objs, auto_commit=auto_commit, auto_expunge=auto_expunge)
+
+    async def set_word_token_ids(self, *db_objs: Word) -> None:
+        """store the vocabulary ids of the tokens of the words, the new tokens are added in their transaction"""
+        languages: dict[int, list[Word]] = defaultdict(list)
+        for db_obj in db_objs:
+            languages[db_obj.language_id].append(db_obj)
+        for language_id, words in languages.items():
+            vocabulary = await vocabulary_manager.get_token_ids(
+                self.repository.session, language_id, (token for word in words for token in word.word_tokens)
+            )
+            for word in words:
+                word.word_token_ids = [vocabulary.get_id(token) for token in word.word_tokens]
+
+    async def load_word_index(self, language_id: int) -> dict[str, list[WordRecord]]:
+        return (await word_index_manager.get(self.repository.session, language_id)).word_index
+
+    async def load_term_trie(self, language_id: int, first_words: Iterable[str] | None = None) -> TermTrie:
+        """the word index of the language compiled into a token trie for the sentence matching
+
+        in the ``lazy`` word index mode, ``first_words`` restricts the trie to the tokens of the text
+        """
+        if first_words is not None and get_word_index_settings().MODE == "lazy":
+            return await word_index_manager.get_text_term_trie(self.repository.session, language_id, set(first_words))
+        return (await word_index_manager.get(self.repository.session, language_id)).term_trie
+
+    async def bump_word_index(
+        self,
+        language_id: int,
+        word_id: int | None = None,
+        deleted_word_ids: Iterable[int] = (),
+        auto_commit: bool | None = True,
+    ) -> None:
+        """mark the word index of the language as changed for every worker and commit the Word write with it
+
+        ``word_id`` touches the word for changes outside of the words table, like its image
+        """
+        if word_id is not None:
+            await self.repository.session.execute(update(Word).where(Word.id == word_id).values(updated_at=func.now()))
+        await word_index_manager.bump_generation(self.repository.session, language_id, deleted_word_ids)
+        if auto_commit:
+            await self.repository.session.commit()
 
     async def to_model(self, data: Word | dict[str, Any], operation: str | None = None) -> Word:
         return await super().to_model(data, operation)
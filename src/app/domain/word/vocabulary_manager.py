@@ -0,0 +1,158 @@
+"""Vocabulary ids of the token strings of a language, shared by the requests of a worker.
+
+The ids are assigned by the ``vocabulary_tokens`` table and never change, a worker keeps the tokens it has read
+without checking them again. A missing token is inserted in the transaction of the caller, a concurrent insert of
+the same token by another transaction is caught on the unique constraint and its id is read instead. The ids
+inserted by a transaction are only kept once it is committed, so the worker never uses the id of a rolled back
+row. Tokens must not be added inside a savepoint the caller may roll back.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from app.config.base import get_word_index_settings
+from app.db.models.word import VocabularyToken
+from app.domain.parser import parser_tool
+from app.domain.parser.language_parsers.vocabulary import UNKNOWN_ID, Vocabulary, normalize_token
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from app.domain.parser.markdown_text_parser import TokenizedSegment
+
+__all__ = ("VocabularyManager", "vocabulary_manager")
+
+PENDING_TOKENS = "vocabulary_pending_tokens"
+"""``Session.info`` key of the tokens inserted by the transaction, by the vocabulary they are added to on commit"""
+
+
+@event.listens_for(Session, "after_commit")
+def _keep_committed_tokens(session: Session) -> None:
+    if session.get_nested_transaction() is None:
+        for vocabulary, tokens in session.info.pop(PENDING_TOKENS, {}).items():
+            vocabulary.update(tokens)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_rolled_back_tokens(session: Session, transaction: SessionTransaction) -> None:
+    """the tokens of a rolled back or closed transaction, the committed ones are already kept"""
+    if transaction.parent is None:
+        session.info.pop(PENDING_TOKENS, None)
+
+
+class VocabularyManager:
+    def __init__(self) -> None:
+        self.languages: dict[int, Vocabulary] = {}
+        """committed tokens read by the worker"""
+
+    def clear(self) -> None:
+        self.languages.clear()
+
+    @staticmethod
+    def _get_pending(session: AsyncSession, vocabulary: Vocabulary) -> Vocabulary | None:
+        return session.info.get(PENDING_TOKENS, {}).get(vocabulary)
+
+    async def get_token_ids(self, session: AsyncSession, language_id: int, tokens: Iterable[str]) -> Vocabulary:
+        """the vocabulary of ``tokens``, the missing ones are added to the table in the transaction of ``session``"""
+        vocabulary = self.languages.setdefault(language_id, Vocabulary())
+        pending = self._get_pending(session, vocabulary)
+        res = Vocabulary()
+        missing: set[str] = set()
+        for token in map(normalize_token, tokens):
+            token_id = vocabulary.ids.get(token)
+            if token_id is not None:
+                res.add(token_id, vocabulary.tokens[token_id])
+            elif pending is not None and (token_id := pending.ids.get(token)) is not None:
+                res.add(token_id, pending.tokens[token_id])
+            else:
+                missing.add(token)
+
+        conflict: IntegrityError | None = None
+        while missing:
+            found = await self._select(session, VocabularyToken.token, language_id, missing)
+            if conflict is not None and not found:
+                raise conflict
+            for token_id, token in found:
+                vocabulary.add(token_id, token)
+                res.add(token_id, token)
+                missing.discard(token)
+            if not missing:
+                break
+            try:
+                async with session.begin_nested():
+                    await session.execute(
+                        insert(VocabularyToken),
+                        [{"language_id": language_id, "token": token} for token in sorted(missing)],
+                    )
+            except IntegrityError as exc:
+                # a concurrent transaction added some of the tokens first, their ids are read again
+                conflict = exc
+                continue
+            pending = session.info.setdefault(PENDING_TOKENS, {}).setdefault(vocabulary, Vocabulary())
+            for token_id, token in await self._select(session, VocabularyToken.token, language_id, missing):
+                pending.add(token_id, token)
+                res.add(token_id, token)
+            break
+        return res
+
+    async def get_tokens(self, session: AsyncSession, language_id: int, token_ids: Iterable[int]) -> Vocabulary:
+        """the vocabulary of ``token_ids``"""
+        vocabulary = self.languages.setdefault(language_id, Vocabulary())
+        pending = self._get_pending(session, vocabulary)
+        res = Vocabulary()
+        missing: set[int] = set()
+        for token_id in token_ids:
+            token = vocabulary.tokens.get(token_id)
+            if token is None and pending is not None:
+                token = pending.tokens.get(token_id)
+            if token is not None:
+                res.add(token_id, token)
+            elif token_id != UNKNOWN_ID:
+                missing.add(token_id)
+        if missing:
+            for token_id, token in await self._select(session, VocabularyToken.id, language_id, missing):
+                vocabulary.add(token_id, token)
+                res.add(token_id, token)
+        return res
+
+    @staticmethod
+    async def _select(
+        session: AsyncSession, column: Any, language_id: int, values: set[str] | set[int]
+    ) -> list[tuple[int, str]]:
+        """the ids and tokens of the rows of the language whose ``column`` is in ``values``"""
+        chunk_size = get_word_index_settings().LOOKUP_CHUNK_SIZE
+        value_list = sorted(values)  # type: ignore[type-var]
+        res: list[tuple[int, str]] = []
+        for i in range(0, len(value_list), chunk_size):
+            result = await session.execute(
+                select(VocabularyToken.id, VocabularyToken.token).where(
+                    VocabularyToken.language_id == language_id, column.in_(value_list[i : i + chunk_size])
+                )
+            )
+            res.extend(result.tuples())
+        return res
+
+    async def dump_tokenized_segments(
+        self, session: AsyncSession, language_id: int, segmentlist: list[TokenizedSegment]
+    ) -> list[dict[str, Any]]:
+        """``parser_tool.dump_tokenized_segments`` with the ids of the language, the ``token_ids`` of the segments
+        are set as well"""
+        vocabulary = await self.get_token_ids(session, language_id, parser_tool.get_vocabulary_strings(segmentlist))
+        parser_tool.set_token_ids(segmentlist, vocabulary)
+        return parser_tool.dump_tokenized_segments(segmentlist, vocabulary)
+
+    async def load_tokenized_segments(
+        self, session: AsyncSession, language_id: int, data: list[dict[str, Any]]
+    ) -> list[TokenizedSegment]:
+        vocabulary = await self.get_tokens(session, language_id, parser_tool.get_stored_token_ids(data))
+        return parser_tool.load_tokenized_segments(data, vocabulary)
+
+
+vocabulary_manager = VocabularyManager()
@@ -0,0 +1,347 @@
+"""Word index shared by the requests of a worker and kept coherent between workers.
+
+Every Word write bumps the ``word_index_generations`` row of its language in the transaction of the write, a
+delete also logs the word id in ``word_index_deletions``. Before serving an index, the worker compares its
+generation with the database and when it is behind, reloads only the words updated since its last sync and
+drops the ones deleted since its generation, instead of reloading the whole vocabulary.
+
+The index keeps ``WordRecord`` built from a column query rather than Word instances with their joined
+Language and WordImage. In the ``lazy`` mode of ``WORD_INDEX_MODE`` only the words starting with the tokens
+of the requested text are fetched and kept in a bounded LRU of first_word buckets, a generation change only
+drops the buckets of the words updated or deleted since.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import delete, func, insert, select, update
+
+from app.config.base import get_word_index_settings
+from app.db.models.word import Word, WordImage, WordIndexDeletion, WordIndexGeneration
+from app.domain.parser.language_parsers.term_trie import TermTrie
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Row, Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+__all__ = (
+    "LanguageWordIndex",
+    "LazyWordIndex",
+    "WordIndexManager",
+    "WordRecord",
+    "word_index_manager",
+    "word_record_statement",
+)
+
+SYNC_OVERLAP = timedelta(seconds=5)
+"""Rows are reloaded from a bit before the last sync, for the second resolution timestamps of sqlite and
+the transactions committed after a later one."""
+DELETION_LOG_GENERATIONS = 10_000
+"""Generations the deleted word ids are kept for, a worker further behind reloads its whole index."""
+
+
+@dataclass(frozen=True, slots=True)
+class WordRecord:
+    """Read-only copy of the Word columns used by the sentence matching."""
+
+    id: int
+    word_string: str
+    word_tokens: tuple[str, ...]
+    word_token_ids: tuple[int, ...]
+    """vocabulary ids of ``word_tokens``, the keys of the term trie"""
+    first_word: str
+    word_lemma: str | None
+    word_pos: str | None
+    is_multiple_words: bool
+    word_status: int
+    word_explanation: str | None
+    word_pronunciation: str | None
+    word_counts: int | None
+    word_image_path: str | None
+    updated_at: datetime | None
+
+
+def word_record_statement(language_id: int) -> Select[Any]:
+    """the columns of ``WordRecord`` without loading the Word instances and their relationships
+
+    a word with several images gets the path of the last uploaded one, so it stays one record
+    """
+    word_image_path = (
+        select(WordImage.word_image_path)
+        .where(WordImage.word_id == Word.id)
+        .order_by(WordImage.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+    return select(
+        Word.id,
+        Word.word_string,
+        Word.word_tokens,
+        Word.word_token_ids,
+        Word.first_word,
+        Word.word_lemma,
+        Word.word_pos,
+        Word.is_multiple_words,
+        Word.word_status,
+        Word.word_explanation,
+        Word.word_pronunciation,
+        Word.word_counts,
+        word_image_path,
+        Word.updated_at,
+    ).where(Word.language_id == language_id)
+
+
+def to_word_record(row: Row[Any]) -> WordRecord:
+    """build the record from a row of ``word_record_statement``"""
+    word_id, word_string, word_tokens, word_token_ids, *columns = row
+    return WordRecord(word_id, word_string, tuple(word_tokens), tuple(word_token_ids or ()), *columns)
+
+
+@dataclass
+class LanguageWordIndex:
+    generation: int
+    synced_at: datetime | None = None
+    words: dict[int, WordRecord] = field(default_factory=dict)
+    word_index: dict[str, list[WordRecord]] = field(default_factory=lambda: defaultdict(list))
+    term_trie: TermTrie = field(default_factory=TermTrie)
+
+    def rebuild_first_words(self, first_words: Iterable[str]) -> None:
+        """rebuild the index buckets of ``first_words`` and the trie branches of their words from ``words``"""
+        buckets: dict[str, list[WordRecord]] = {first_word: [] for first_word in first_words}
+        first_token_ids = {
+            word.word_token_ids[0]
+            for first_word in buckets
+            for word in self.word_index.get(first_word, ())
+            if word.word_token_ids
+        }
+        for word in self.words.values():
+            if word.first_word in buckets:
+                buckets[word.first_word].append(word)
+                if word.word_token_ids:
+                    first_token_ids.add(word.word_token_ids[0])
+        for first_word, words in buckets.items():
+            words.sort(key=lambda word: word.word_counts or 0, reverse=True)
+            if words:
+                self.word_index[first_word] = words
+            else:
+                self.word_index.pop(first_word, None)
+        # the words of other first_words with the same normalized first token share the branches
+        branch_words = [
+            word for word in self.words.values() if word.word_token_ids and word.word_token_ids[0] in first_token_ids
+        ]
+        branch_words.sort(key=lambda word: word.word_counts or 0, reverse=True)
+        self.term_trie.replace_branches(first_token_ids, branch_words)
+
+    def update_synced_at(self, words: Iterable[WordRecord]) -> None:
+        for word in words:
+            if word.updated_at is not None and (self.synced_at is None or word.updated_at > self.synced_at):
+                self.synced_at = word.updated_at
+
+
+@dataclass
+class LazyWordIndex:
+    """LRU of the first_word buckets fetched for the texts read so far, empty buckets included."""
+
+    generation: int
+    max_buckets: int
+    synced_at: datetime | None = None
+    """latest ``Word.updated_at`` of the language when the buckets were last checked"""
+    buckets: OrderedDict[str, list[WordRecord]] = field(default_factory=OrderedDict)
+    first_words: dict[int, str] = field(default_factory=dict)
+    """first_word of the cached words by id, to find the bucket of a changed or deleted word"""
+
+    def get_buckets(self, first_words: Iterable[str]) -> tuple[dict[str, list[WordRecord]], set[str]]:
+        """return the cached buckets of ``first_words`` and the missing first words"""
+        found: dict[str, list[WordRecord]] = {}
+        missing: set[str] = set()
+        for first_word in first_words:
+            if first_word in self.buckets:
+                self.buckets.move_to_end(first_word)
+                found[first_word] = self.buckets[first_word]
+            else:
+                missing.add(first_word)
+        return found, missing
+
+    def put_buckets(self, buckets: dict[str, list[WordRecord]]) -> None:
+        for first_word, words in buckets.items():
+            self.drop_buckets([first_word])
+            self.buckets[first_word] = words
+            for word in words:
+                self.first_words[word.id] = first_word
+        while len(self.buckets) > self.max_buckets:
+            self.drop_buckets([next(iter(self.buckets))])
+
+    def drop_buckets(self, first_words: Iterable[str]) -> None:
+        for first_word in first_words:
+            for word in self.buckets.pop(first_word, ()):
+                self.first_words.pop(word.id, None)
+
+    def drop_words(self, word_ids: Iterable[int], first_words: Iterable[str] = ()) -> None:
+        """drop the buckets holding ``word_ids`` and the buckets of ``first_words``, they are fetched again"""
+        stale = {self.first_words[word_id] for word_id in word_ids if word_id in self.first_words}
+        self.drop_buckets(stale.union(first_words))
+
+
+class WordIndexManager:
+    def __init__(self) -> None:
+        self.languages: dict[int, LanguageWordIndex] = {}
+        self.lazy_languages: dict[int, LazyWordIndex] = {}
+        self._locks: dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    @staticmethod
+    async def get_generation(session: AsyncSession, language_id: int) -> int:
+        generation = await session.scalar(
+            select(WordIndexGeneration.generation).where(WordIndexGeneration.language_id == language_id)
+        )
+        return generation or 0
+
+    @classmethod
+    async def bump_generation(
+        cls, session: AsyncSession, language_id: int, deleted_word_ids: Iterable[int] = ()
+    ) -> None:
+        """increase the generation of the language, call it in the transaction of the Word write
+
+        ``deleted_word_ids`` are logged with the new generation for the workers to drop them
+        """
+        result = await session.execute(
+            update(WordIndexGeneration)
+            .where(WordIndexGeneration.language_id == language_id)
+            .values(generation=WordIndexGeneration.generation + 1)
+        )
+        if result.rowcount == 0:  # type: ignore[attr-defined]
+            await session.execute(insert(WordIndexGeneration).values(language_id=language_id, generation=1))
+        if deleted_word_ids := list(deleted_word_ids):
+            generation = await cls.get_generation(session, language_id)
+            await session.execute(
+                insert(WordIndexDeletion),
+                [
+                    {"language_id": language_id, "word_id": word_id, "generation": generation}
+                    for word_id in deleted_word_ids
+                ],
+            )
+            await session.execute(
+                delete(WordIndexDeletion).where(
+                    WordIndexDeletion.language_id == language_id,
+                    WordIndexDeletion.generation <= generation - DELETION_LOG_GENERATIONS,
+                )
+            )
+
+    async def get(self, session: AsyncSession, language_id: int) -> LanguageWordIndex:
+        async with self._locks[language_id]:
+            generation = await self.get_generation(session, language_id)
+            index = self.languages.get(language_id)
+            if index is None or generation - index.generation >= DELETION_LOG_GENERATIONS:
+                index = await self._load(session, language_id, generation)
+                self.languages[language_id] = index
+            elif index.generation != generation:
+                await self._refresh(session, index, language_id, generation)
+            return index
+
+    async def get_text_term_trie(self, session: AsyncSession, language_id: int, first_words: set[str]) -> TermTrie:
+        """token trie of the words starting with ``first_words``, fetched with ``first_word IN`` queries
+
+        when the generation changes, only the buckets of the words updated or deleted since are dropped
+        """
+        settings = get_word_index_settings()
+        async with self._locks[language_id]:
+            generation = await self.get_generation(session, language_id)
+            index = self.lazy_languages.get(language_id)
+            if index is None or generation - index.generation >= DELETION_LOG_GENERATIONS:
+                index = LazyWordIndex(
+                    generation=generation,
+                    max_buckets=settings.LAZY_MAX_BUCKETS,
+                    synced_at=await self.get_synced_at(session, language_id),
+                )
+                self.lazy_languages[language_id] = index
+            elif index.generation != generation:
+                await self._refresh_lazy(session, index, language_id, generation)
+            buckets, missing = index.get_buckets(first_words)
+            if missing:
+                missing_list = sorted(missing)
+                fetched: dict[str, list[WordRecord]] = {first_word: [] for first_word in missing_list}
+                for i in range(0, len(missing_list), settings.LOOKUP_CHUNK_SIZE):
+                    statement = word_record_statement(language_id).where(
+                        Word.first_word.in_(missing_list[i : i + settings.LOOKUP_CHUNK_SIZE])
+                    )
+                    for row in await session.execute(statement.order_by(Word.word_counts.desc())):
+                        word = to_word_record(row)
+                        fetched[word.first_word].append(word)
+                index.put_buckets(fetched)
+                buckets.update(fetched)
+        return TermTrie.from_word_index(buckets)
+
+    @staticmethod
+    async def get_synced_at(session: AsyncSession, language_id: int) -> datetime | None:
+        return await session.scalar(select(func.max(Word.updated_at)).where(Word.language_id == language_id))
+
+    @staticmethod
+    async def deleted_word_ids(session: AsyncSession, language_id: int, generation: int) -> list[int]:
+        """ids of the words deleted after ``generation``"""
+        return list(
+            await session.scalars(
+                select(WordIndexDeletion.word_id).where(
+                    WordIndexDeletion.language_id == language_id, WordIndexDeletion.generation > generation
+                )
+            )
+        )
+
+    @classmethod
+    async def _refresh_lazy(
+        cls, session: AsyncSession, index: LazyWordIndex, language_id: int, generation: int
+    ) -> None:
+        statement = select(Word.id, Word.first_word, Word.updated_at).where(Word.language_id == language_id)
+        if index.synced_at is not None:
+            statement = statement.where(Word.updated_at >= index.synced_at - SYNC_OVERLAP)
+        changed = (await session.execute(statement)).all()
+        changed_ids = [word_id for word_id, _, _ in changed]
+        index.drop_words(
+            [*changed_ids, *await cls.deleted_word_ids(session, language_id, index.generation)],
+            [first_word for _, first_word, _ in changed],
+        )
+        for _, _, updated_at in changed:
+            if updated_at is not None and (index.synced_at is None or updated_at > index.synced_at):
+                index.synced_at = updated_at
+        index.generation = generation
+
+    @staticmethod
+    async def _load(session: AsyncSession, language_id: int, generation: int) -> LanguageWordIndex:
+        index = LanguageWordIndex(generation=generation)
+        result = await session.execute(word_record_statement(language_id).order_by(Word.word_counts.desc()))
+        word_list = [to_word_record(row) for row in result]
+        for word in word_list:
+            index.words[word.id] = word
+            index.word_index[word.first_word].append(word)
+        index.term_trie = TermTrie.from_word_index(index.word_index)
+        index.update_synced_at(word_list)
+        return index
+
+    @classmethod
+    async def _refresh(cls, session: AsyncSession, index: LanguageWordIndex, language_id: int, generation: int) -> None:
+        statement = word_record_statement(language_id)
+        if index.synced_at is not None:
+            statement = statement.where(Word.updated_at >= index.synced_at - SYNC_OVERLAP)
+        changed_words = [to_word_record(row) for row in await session.execute(statement)]
+        deleted_word_ids = await cls.deleted_word_ids(session, language_id, index.generation)
+
+        first_words: set[str] = set()
+        for word_id in deleted_word_ids:
+            if (word := index.words.pop(word_id, None)) is not None:
+                first_words.add(word.first_word)
+        for word in changed_words:
+            if word.id in index.words:
+                first_words.add(index.words[word.id].first_word)
+            index.words[word.id] = word
+            first_words.add(word.first_word)
+        index.rebuild_first_words(first_words)
+        index.update_synced_at(changed_words)
+        index.generation = generation
+
+
+word_index_manager = WordIndexManager()
@@ -16,6 +16,7 @@ from litestar.exceptions import (
     InternalServerException,
     NotFoundException,
     PermissionDeniedException,
+    ServiceUnavailableException,
     ValidationException,
 )
 from litestar.middleware.exceptions._debug_response import create_debug_response
@@ -37,6 +38,7 @@ __all__ = (
     "HealthCheckConfigurationError",
     "ApplicationError",
     "LanguageParserError",
+    "ParserBusyError",
     "after_exception_hook_handler",
 )
 
@@ -100,6 +102,10 @@ class LanguageParserError(ApplicationError):
     """load Language Parser error"""
 
 
+class ParserBusyError(ApplicationError):
+    """The parsing queue is full"""
+
+
 async def after_exception_hook_handler(exc: Exception, _scope: Scope) -> None:
     """Binds `exc_info` key with exception instance as value to structlog
     context vars.
@@ -139,6 +145,8 @@ def exception_to_http_response(
         http_exc = PermissionDeniedException
     elif isinstance(exc, LanguageParserError):
         http_exc = ValidationException
+    elif isinstance(exc, ParserBusyError):
+        http_exc = ServiceUnavailableException
     else:
         http_exc = InternalServerException
     if request.app.debug and not isinstance(
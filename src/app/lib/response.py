@@ -0,0 +1,49 @@
+"""MessagePack content negotiation of the high volume endpoints.
+
+A client sending ``Accept: application/msgpack`` (or ``application/x-msgpack``) gets the response body as
+MessagePack instead of JSON, a route opts in with ``response_class=MsgPackNegotiatedResponse``.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, TypeVar
+
+import msgspec
+from litestar import MediaType, Response
+from litestar.serialization import default_serializer
+
+if TYPE_CHECKING:
+    from litestar import Litestar, Request
+    from litestar.response.base import ASGIResponse
+    from litestar.types import Serializer
+
+__all__ = ("MSGPACK_MEDIA_TYPES", "MsgPackNegotiatedResponse", "encode_msgpack", "negotiate_media_type")
+
+T = TypeVar("T")
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", MediaType.MESSAGEPACK.value)
+
+_msgpack_encoder = msgspec.msgpack.Encoder(enc_hook=default_serializer)
+
+
+def encode_msgpack(value: Any, enc_hook: Serializer = default_serializer) -> bytes:
+    if enc_hook is default_serializer:
+        return _msgpack_encoder.encode(value)
+    return msgspec.msgpack.encode(value, enc_hook=enc_hook)
+
+
+def negotiate_media_type(request: Request, media_types: list[str]) -> str:
+    """the media type the client prefers among ``media_types``, the first one when it accepts any"""
+    return request.accept.best_match(media_types, default=media_types[0])  # type: ignore[return-value]
+
+
+class MsgPackNegotiatedResponse(Response[T]):
+    def to_asgi_response(self, app: Litestar | None, request: Request, **kwargs: Any) -> ASGIResponse:
+        self.media_type = negotiate_media_type(request, [MediaType.JSON, *MSGPACK_MEDIA_TYPES])
+        self.headers.setdefault("Vary", "Accept")
+        return super().to_asgi_response(app, request, **kwargs)
+
+    def render(self, content: Any, media_type: str, enc_hook: Serializer = default_serializer) -> bytes:
+        if media_type in MSGPACK_MEDIA_TYPES and not isinstance(content, bytes):
+            return encode_msgpack(content, enc_hook)
+        return super().render(content, media_type, enc_hook)
@@ -56,6 +56,9 @@ class ApplicationConfigurator(InitPluginProtocol, CLIPluginProtocol):
 
         # from litestar.security.jwt import Token
         from app.config import constants, get_settings
+        from app.domain.book.parse_queue import start_parse_queue, stop_parse_queue
+        from app.domain.parser.executor import shutdown_parse_executor
+        from app.domain.parser.warmup import start_parser_warm_up, stop_parser_warm_up
         from app.lib.exceptions import ApplicationError, exception_to_http_response
 
         settings = get_settings()
@@ -67,6 +70,8 @@ class ApplicationConfigurator(InitPluginProtocol, CLIPluginProtocol):
         )
         # app_config.stores = StoreRegistry(default_factory=self.redis_store_factory)
         # app_config.on_shutdown.append(self.redis.aclose)  # type: ignore[attr-defined]
+        app_config.on_startup.extend([start_parser_warm_up, start_parse_queue])
+        app_config.on_shutdown.extend([stop_parser_warm_up, stop_parse_queue, shutdown_parse_executor])
         # app_config.signature_types = [
         #     Token,
         #     DTOData,
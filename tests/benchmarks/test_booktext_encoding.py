@@ -0,0 +1,129 @@
+"""Encode time and size of a parsed chapter, the JSON of a litestar DTO versus the msgspec Structs JSON and
+MessagePack and the compact format.
+
+Run with ``pytest tests/benchmarks/test_booktext_encoding.py --benchmark-group-by=group``.
+"""
+
+import asyncio
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import pytest
+from litestar import Litestar, MediaType, Response, get
+from litestar.datastructures import State
+from litestar.dto import DataclassDTO
+from litestar.serialization import encode_json
+from litestar.testing import TestClient
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.book.dtos import COMPACT_JSON_MEDIA_TYPE, encode_parsed_booktext
+from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
+from app.domain.parser.markdown_text_parser import ParsedTextSegment, VWord, parse_markdown
+from app.domain.word.word_index import WordRecord
+from app.lib import dto
+
+TEXT = "\n\n".join(
+    [
+        "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+        "foolishness. There were a king with a large jaw and a queen with a plain face, on the throne of England.",
+        "Mr. Jarvis Lorry had to go home. He said he would be back in the morning, and that the coach was late.",
+    ]
+    * 100
+)
+TERMS = {"the": "definite article", "was": "past of be", "of": "belonging to", "have to": "must do something"}
+
+
+@pytest.fixture(scope="module")
+def segments(make_word_record: Callable[..., WordRecord], vocabulary: Vocabulary) -> list[ParsedTextSegment]:
+    term_trie = TermTrie(
+        make_word_record(word_string, id=i, word_lemma=word_string, word_explanation=word_explanation, word_counts=0)
+        for i, (word_string, word_explanation) in enumerate(TERMS.items(), 1)
+    )
+    return asyncio.run(
+        parser_tool.get_parsed_text_segments(
+            parse_markdown(TEXT), LanguageParser.get_parser("english"), term_trie, vocabulary
+        )
+    )
+
+
+@dataclass
+class VWordSegment:
+    """ParsedTextSegment with its VWords built, as the former response DTO of get_booktext transferred it"""
+
+    segment_words: list[VWord]
+    segment_value: str = ""
+    segment_raw: str = ""
+    segment_type: str = ""
+    paragraph_order: int = 0
+    sentence_order: int = 0
+
+
+@dataclass
+class ParsedBookText:
+    data: list[VWordSegment]
+
+
+class ParsedBookTextDTO(DataclassDTO[ParsedBookText]):
+    """the baseline of the msgspec encoding"""
+
+    config = dto.config(max_nested_depth=4)
+
+
+@get("/dto", return_dto=ParsedBookTextDTO)
+async def get_dto(state: State) -> ParsedBookText:
+    return ParsedBookText(
+        data=[
+            VWordSegment(
+                segment_words=[parser_tool.to_vword(word) for word in segment.segment_words],
+                segment_value=segment.segment_value,
+                segment_raw=segment.segment_raw,
+                segment_type=segment.segment_type,
+                paragraph_order=segment.paragraph_order,
+                sentence_order=segment.sentence_order,
+            )
+            for segment in state.segments
+        ]
+    )
+
+
+@get("/msgspec")
+async def get_msgspec(state: State) -> Response[bytes]:
+    return Response(encode_parsed_booktext(state.segments), media_type=MediaType.JSON)
+
+
+@get("/msgpack", media_type=MediaType.MESSAGEPACK)
+async def get_msgpack(state: State) -> Response[bytes]:
+    return Response(encode_parsed_booktext(state.segments, MediaType.MESSAGEPACK), media_type=MediaType.MESSAGEPACK)
+
+
+@get("/compact", media_type=COMPACT_JSON_MEDIA_TYPE)
+async def get_compact(state: State) -> Response[bytes]:
+    return Response(
+        encode_json(parser_tool.compact_parsed_segments(state.segments)), media_type=COMPACT_JSON_MEDIA_TYPE
+    )
+
+
+@pytest.fixture(scope="module")
+def client(segments: list[ParsedTextSegment]) -> TestClient:
+    app = Litestar([get_dto, get_msgspec, get_msgpack, get_compact], state=State({"segments": segments}))
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.mark.benchmark(group="booktext-format")
+@pytest.mark.parametrize("path", ["/dto", "/msgspec", "/msgpack", "/compact"])
+def test_booktext_format(benchmark: BenchmarkFixture, client: TestClient, path: str) -> None:
+    response = benchmark(client.get, path)
+    assert response.status_code == 200
+    benchmark.extra_info["bytes"] = len(response.content)
+
+
+def test_compact_is_an_order_of_magnitude_smaller(client: TestClient) -> None:
+    assert len(client.get("/compact").content) * 10 < len(client.get("/dto").content)
+
+
+def test_msgspec_encodes_the_dto_json(client: TestClient) -> None:
+    assert json.loads(client.get("/msgspec").content) == json.loads(client.get("/dto").content)
@@ -0,0 +1,38 @@
+"""Throughput of the Japanese sentence splitters on a chapter.
+
+Run with ``pytest tests/benchmarks/test_japanese_sentence_splitter_benchmark.py --benchmark-group-by=group``.
+"""
+
+from collections.abc import Callable
+
+import pytest
+from konoha import SentenceTokenizer
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.parser.language_parsers import paser_config
+from app.domain.parser.language_parsers.japanese_parser import JapaneseParser
+from app.domain.parser.language_parsers.japanese_sentence_splitter import split_japanese_sentences
+
+PARAGRAPHS = [
+    "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+    "何でも薄暗いじめじめした所でニャーニャー泣いていた事だけは記憶している。",
+    "彼は「もう帰る。明日また来る。」と言った。本当？　私は一日中家で本を読んでいました（雨だった。）。",
+] * 200
+
+
+def _spacy_splitter() -> Callable[[str], list[str]]:
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setitem(paser_config.japanese_sentence_splitters, "japanese", "spacy")
+        return JapaneseParser("japanese").split_sentences
+
+
+@pytest.mark.benchmark(group="japanese-sentence-splitter")
+@pytest.mark.parametrize("splitter_name", ["rules", "konoha", "spacy"])
+def test_sentence_splitter_throughput(benchmark: BenchmarkFixture, splitter_name: str) -> None:
+    split_sentences = {
+        "rules": lambda: split_japanese_sentences,
+        "konoha": lambda: SentenceTokenizer().tokenize,
+        "spacy": _spacy_splitter,
+    }[splitter_name]()
+    sentences = benchmark(lambda: [split_sentences(paragraph) for paragraph in PARAGRAPHS])
+    assert len(sentences) == len(PARAGRAPHS)
@@ -0,0 +1,31 @@
+"""Load time and throughput of the spacy pipeline profiles.
+
+Run with ``pytest tests/benchmarks/test_spacy_pipeline_profiles.py --benchmark-group-by=group``.
+"""
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.parser.language_parsers.paser_config import spacy_model_mapping
+from app.domain.parser.language_parsers.spacy_parser import load_pipeline, split_sentences_and_tokenize_many
+
+PARAGRAPHS = [
+    "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of foolishness. "
+    "There were a king with a large jaw and a queen with a plain face, on the throne of England.",
+    "Mr. Jarvis Lorry had to go home. He said he would be back in the morning, and that the coach was late.",
+] * 100
+
+
+@pytest.mark.benchmark(group="spacy-profile-load")
+@pytest.mark.parametrize("profile_name", ["lean", "full"])
+def test_pipeline_load_time(benchmark: BenchmarkFixture, profile_name: str) -> None:
+    nlp = benchmark.pedantic(load_pipeline, args=(spacy_model_mapping["english"], profile_name), rounds=3)
+    assert nlp.pipe_names
+
+
+@pytest.mark.benchmark(group="spacy-profile-throughput")
+@pytest.mark.parametrize("profile_name", ["lean", "full"])
+def test_pipeline_throughput(benchmark: BenchmarkFixture, profile_name: str) -> None:
+    nlp = load_pipeline(spacy_model_mapping["english"], profile_name)
+    paragraphs = benchmark(split_sentences_and_tokenize_many, nlp, PARAGRAPHS)
+    assert len(paragraphs) == len(PARAGRAPHS)
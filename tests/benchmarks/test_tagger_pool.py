@@ -0,0 +1,44 @@
+"""Throughput of concurrent callers tokenizing a Japanese chapter with one parser and its fugashi tagger pool.
+
+Run with ``pytest tests/benchmarks/test_tagger_pool.py --benchmark-group-by=group``. Every caller checks out a
+tagger of its own, the pool only makes the parser safe to share between the threads of the ``thread`` executor
+mode, the throughput depends on the GIL being released while MeCab parses.
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.config.base import get_parser_settings
+from app.domain.parser.language_parsers.fugashi_parser import SpokenJapaneseParser
+from app.domain.parser.language_parsers.paser_config import get_fugashi_unidic
+
+PARAGRAPHS = [
+    "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。"
+    "何でも薄暗いじめじめした所でニャーニャー泣いていた事だけは記憶している。",
+    "今日は朝から雨が降っていたので、私は一日中家で本を読んでいました。夕方になってやっと晴れた。",
+] * 50
+CALLERS = 4
+
+
+@pytest.fixture(scope="module")
+def executor() -> Iterator[ThreadPoolExecutor]:
+    with ThreadPoolExecutor(max_workers=CALLERS, thread_name_prefix="caller") as executor:
+        yield executor
+
+
+@pytest.mark.benchmark(group="tagger-pool")
+@pytest.mark.parametrize("pool_size", [1, 2, 4])
+def test_tagger_pool_throughput(
+    benchmark: BenchmarkFixture, monkeypatch: pytest.MonkeyPatch, executor: ThreadPoolExecutor, pool_size: int
+) -> None:
+    monkeypatch.setattr(get_parser_settings(), "TAGGER_POOL_SIZE", pool_size)
+    parser = SpokenJapaneseParser("spoken_japanese", undic_path=get_fugashi_unidic()["spoken_japanese"])
+
+    def tokenize_concurrently() -> list[list[list[list[str]]]]:
+        return list(executor.map(lambda _: parser._split_sentences_and_tokenize_many(PARAGRAPHS), range(CALLERS)))
+
+    results = benchmark(tokenize_concurrently)
+    assert all(len(paragraphs) == len(PARAGRAPHS) for paragraphs in results)
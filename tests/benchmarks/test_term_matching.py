@@ -0,0 +1,108 @@
+"""Sentence matching against a 50k term vocabulary, the token trie versus the former first_word scan.
+
+The trie is matched on the vocabulary ids of the sentence, the first_word scan compares the token strings.
+
+Run with ``pytest tests/benchmarks/test_term_matching.py --benchmark-group-by=group``.
+"""
+
+import random
+from array import array
+from collections import defaultdict
+from collections.abc import Callable, Iterable
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
+from app.domain.parser.markdown_text_parser import WordToken
+from app.domain.word.word_index import WordRecord
+
+VOCABULARY_SIZE = 50_000
+FIRST_TOKENS = ["the", "to", "に", "a", "of"]
+TOKENS = [f"w{i}" for i in range(2_000)]
+
+TEXT = (
+    "the w1 w2 went to w3 the w4 w5 w6 of a w7 and to w8 w9 に w10 w11 the w12 to w13 w14 a w15 of the w16 w17 . "
+) * 20
+
+
+def first_word_scan(sentence: list[WordToken], word_index: dict[str, list[WordRecord]]) -> list[str]:
+    """the matching loop of parser_tool.match_word_in_sentence before the token trie"""
+    res = []
+    start_position = 0
+    while start_position < len(sentence):
+        matched = sentence[start_position].word_string
+        for db_word in word_index.get(sentence[start_position].word_string, []):
+            end_position = start_position
+            for word_token in db_word.word_tokens:
+                if end_position >= len(sentence) or word_token != sentence[end_position].word_string:
+                    break
+                end_position += 1
+            else:
+                matched = db_word.word_string
+                start_position = end_position - 1
+                break
+        res.append(matched)
+        start_position += 1
+    return res
+
+
+def term_trie_scan(sentence: list[WordToken], token_ids: "array[int]", term_trie: TermTrie) -> list[str]:
+    res = []
+    start_position = 0
+    while start_position < len(sentence):
+        match = term_trie.longest_match(token_ids, start_position)
+        if match is None:
+            res.append(sentence[start_position].word_string)
+        else:
+            res.append(match[0].word_string)
+            start_position = match[1]
+        start_position += 1
+    return res
+
+
+@pytest.fixture(scope="module")
+def words(make_word_record: Callable[..., WordRecord]) -> list[WordRecord]:
+    rnd = random.Random(42)
+    words: dict[str, WordRecord] = {}
+    while len(words) < VOCABULARY_SIZE:
+        first_token = rnd.choice(FIRST_TOKENS) if rnd.random() < 0.6 else rnd.choice(TOKENS)
+        word_string = " ".join([first_token, *rnd.choices(TOKENS[:50], k=rnd.randint(0, 3))])
+        words[word_string] = make_word_record(word_string, id=len(words), word_counts=rnd.randint(0, 100))
+    return sorted(words.values(), key=lambda word: word.word_counts or 0, reverse=True)
+
+
+@pytest.fixture(scope="module")
+def sentence() -> list[WordToken]:
+    return [WordToken(word_string=token, word_lemma=token, word_pos="X") for token in TEXT.split()]
+
+
+@pytest.fixture(scope="module")
+def token_ids(sentence: list[WordToken], add_tokens: Callable[[Iterable[str]], Vocabulary]) -> "array[int]":
+    word_strings = [token.word_string for token in sentence]
+    return add_tokens(word_strings).encode(word_strings)
+
+
+@pytest.mark.benchmark(group="term-matching")
+def test_first_word_scan(benchmark: BenchmarkFixture, words: list[WordRecord], sentence: list[WordToken]) -> None:
+    word_index: dict[str, list[WordRecord]] = defaultdict(list)
+    for word in words:
+        word_index[word.first_word].append(word)
+    res = benchmark(first_word_scan, sentence, word_index)
+    assert len(res) <= len(sentence)
+
+
+@pytest.mark.benchmark(group="term-matching")
+def test_term_trie_scan(
+    benchmark: BenchmarkFixture, words: list[WordRecord], sentence: list[WordToken], token_ids: "array[int]"
+) -> None:
+    term_trie = TermTrie(words)
+    res = benchmark(term_trie_scan, sentence, token_ids, term_trie)
+    assert len(res) <= len(sentence)
+
+
+@pytest.mark.benchmark(group="term-trie-build")
+def test_term_trie_build(benchmark: BenchmarkFixture, words: list[WordRecord]) -> None:
+    term_trie = benchmark(TermTrie, words)
+    assert term_trie.root.children
@@ -0,0 +1,72 @@
+"""Allocations and time of loading and matching a 10k token chapter from its parse cache.
+
+The cache stores the sentences as vocabulary ids, loading them shares the token strings of the vocabulary.
+
+Run with ``pytest tests/benchmarks/test_token_memory.py --benchmark-group-by=group --benchmark-json=out.json``,
+the peak memory and the number of live blocks measured with tracemalloc are stored in the ``extra_info`` of the
+benchmark.
+"""
+
+import asyncio
+import json
+import tracemalloc
+from collections.abc import Callable, Iterable
+from typing import Any
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
+from app.domain.parser.markdown_text_parser import ParsedTextSegment, parse_markdown
+from app.domain.word.word_index import WordRecord
+
+TEXT = "\n\n".join(
+    [
+        "It was the best of times, it was the worst of times, it was the age of wisdom, it was the age of "
+        "foolishness. There were a king with a large jaw and a queen with a plain face, on the throne of England.",
+        "Mr. Jarvis Lorry had to go home. He said he would be back in the morning, and that the coach was late.",
+    ]
+    * 150
+)
+
+
+def cached_tokenized_text(add_tokens: Callable[[Iterable[str]], Vocabulary]) -> str:
+    """the tokenized chapter as it is stored in the BookTextParseCache"""
+    tokenized_segments = parser_tool.tokenize_segments(parse_markdown(TEXT), LanguageParser.get_parser("english"))
+    vocabulary = add_tokens(parser_tool.get_vocabulary_strings(tokenized_segments))
+    return json.dumps(parser_tool.dump_tokenized_segments(tokenized_segments, vocabulary))
+
+
+def load_and_match(tokenized_text: str, term_trie: TermTrie, vocabulary: Vocabulary) -> list[ParsedTextSegment]:
+    tokenized_segments = parser_tool.load_tokenized_segments(json.loads(tokenized_text), vocabulary)
+    return asyncio.run(parser_tool.match_tokenized_segments(tokenized_segments, term_trie))
+
+
+@pytest.fixture(scope="module")
+def term_trie(make_word_record: Callable[..., WordRecord]) -> TermTrie:
+    return TermTrie(
+        make_word_record(word_string, id=i, word_lemma=word_string, word_counts=0)
+        for i, word_string in enumerate(["the", "was", "of", "had to", "the coach"], 1)
+    )
+
+
+def test_load_and_match_chapter(
+    benchmark: BenchmarkFixture,
+    term_trie: TermTrie,
+    add_tokens: Callable[[Iterable[str]], Vocabulary],
+    vocabulary: Vocabulary,
+) -> None:
+    tokenized_text = cached_tokenized_text(add_tokens)
+
+    tracemalloc.start()
+    segments: Any = load_and_match(tokenized_text, term_trie, vocabulary)
+    retained_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    tokens = sum(len(segment.segment_words) for segment in segments)
+    benchmark.extra_info.update(tokens=tokens, peak_mib=round(peak / 2**20, 1), retained_blocks=retained_blocks)
+    del segments
+
+    benchmark.pedantic(load_and_match, args=(tokenized_text, term_trie, vocabulary), rounds=5)
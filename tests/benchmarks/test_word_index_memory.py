@@ -0,0 +1,94 @@
+"""Memory and load time of a 100k term word index, Word instances versus ``WordRecord``.
+
+Run with ``pytest tests/benchmarks/test_word_index_memory.py --benchmark-group-by=group --benchmark-json=out.json``,
+the retained memory measured with tracemalloc is stored in the ``extra_info`` of the benchmark.
+"""
+
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from advanced_alchemy.base import BigIntBase
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy import Engine, create_engine, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from app.db.models import Language, Word
+from app.db.models.word import WordImage
+from app.domain.word.word_index import to_word_record, word_record_statement
+
+VOCABULARY_SIZE = 100_000
+
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory: pytest.TempPathFactory) -> Engine:
+    db_path: Path = tmp_path_factory.mktemp("word_index") / "words.sqlite"
+    engine = create_engine(f"sqlite:///{db_path}")
+    BigIntBase.registry.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Language).values(id=1, language_name="English", parser_name="english", RTL=False))
+        conn.execute(
+            insert(Word),
+            [
+                {
+                    "id": i,
+                    "language_id": 1,
+                    "word_string": f"word{i} to{i % 7}",
+                    "word_lemma": f"word{i}",
+                    "word_pos": "NOUN",
+                    "is_multiple_words": True,
+                    "word_status": i % 5,
+                    "word_pronunciation": None,
+                    "word_explanation": f"explanation of word {i}",
+                    "word_counts": i % 100,
+                    "word_tokens": [f"word{i}", f"to{i % 7}"],
+                    "word_token_ids": [i, VOCABULARY_SIZE + 1 + i % 7],
+                    "first_word": f"word{i}",
+                }
+                for i in range(1, VOCABULARY_SIZE + 1)
+            ],
+        )
+        conn.execute(
+            insert(WordImage),
+            [
+                {"word_id": i, "word_image_name": f"word{i}", "word_image_path": f"word{i}.png"}
+                for i in range(1, VOCABULARY_SIZE + 1, 10)
+            ],
+        )
+    return engine
+
+
+def load_words(session: Session) -> list[Any]:
+    statement = select(Word).options(joinedload(Word.language), joinedload(Word.word_image))
+    return list(session.scalars(statement).unique())
+
+
+def load_word_records(session: Session) -> list[Any]:
+    return [to_word_record(row) for row in session.execute(word_record_statement(1))]
+
+
+LOADERS: dict[str, Callable[[Session], list[Any]]] = {"word": load_words, "word_record": load_word_records}
+
+
+@pytest.mark.benchmark(group="word-index-load")
+@pytest.mark.parametrize("loader_name", LOADERS)
+def test_word_index_load(benchmark: BenchmarkFixture, engine: Engine, loader_name: str) -> None:
+    loader = LOADERS[loader_name]
+
+    with Session(engine) as session:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        words = loader(session)
+        retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, "filename"))
+        tracemalloc.stop()
+        assert len(words) == VOCABULARY_SIZE
+        del words
+    benchmark.extra_info["retained_mib"] = round(retained / 2**20, 1)
+
+    def load() -> list[Any]:
+        with Session(engine) as session:
+            return loader(session)
+
+    benchmark.pedantic(load, rounds=3)
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 import re
 from datetime import date
+from itertools import count
 from typing import TYPE_CHECKING, Any
 
 import pytest
 
 from app.config import base
 from app.db.models import Book, Language, Word
+from app.domain.parser.language_parsers.vocabulary import Vocabulary, normalize_token
+from app.domain.word.word_index import WordRecord
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
     from litestar import Litestar
     from pytest import FixtureRequest, MonkeyPatch
 
@@ -131,6 +136,57 @@ def fx_raw_words() -> list[Word | dict[str, Any]]:
     ]
 
 
+@pytest.fixture(name="vocabulary", scope="session")
+def fx_vocabulary() -> Vocabulary:
+    """In-memory vocabulary of the tests without database, filled by ``add_tokens``."""
+    return Vocabulary()
+
+
+@pytest.fixture(name="add_tokens", scope="session")
+def fx_add_tokens(vocabulary: Vocabulary) -> Callable[[Iterable[str]], Vocabulary]:
+    """Give the missing tokens the next ids, like the ``vocabulary_tokens`` table, and return the vocabulary."""
+
+    def add_tokens(tokens: Iterable[str]) -> Vocabulary:
+        for token in map(normalize_token, tokens):
+            if token not in vocabulary.ids:
+                vocabulary.add(len(vocabulary) + 1, token)
+        return vocabulary
+
+    return add_tokens
+
+
+@pytest.fixture(name="make_word_record", scope="session")
+def fx_make_word_record(add_tokens: Callable[[Iterable[str]], Vocabulary]) -> Callable[..., WordRecord]:
+    """Factory of the WordRecords of a term trie, the tokens are the space separated words of ``word_string``.
+
+    The ids are sequential, the token ids are the ones of the ``vocabulary`` fixture, the other columns are
+    empty unless given as keyword arguments.
+    """
+    word_ids = count(1)
+
+    def make_word_record(word_string: str, **fields: Any) -> WordRecord:
+        word_tokens = tuple(word_string.split())
+        columns: dict[str, Any] = {
+            "id": next(word_ids),
+            "word_string": word_string,
+            "word_tokens": word_tokens,
+            "word_token_ids": tuple(add_tokens(word_tokens).encode(word_tokens)),
+            "first_word": word_tokens[0],
+            "word_lemma": None,
+            "word_pos": None,
+            "is_multiple_words": len(word_tokens) > 1,
+            "word_status": 1,
+            "word_explanation": None,
+            "word_pronunciation": None,
+            "word_counts": None,
+            "word_image_path": None,
+            "updated_at": None,
+        }
+        return WordRecord(**{**columns, **fields})
+
+    return make_word_record
+
+
 # @pytest.fixture()
 # def _patch_worker(
 #     is_unit_test: bool,
@@ -5,11 +5,14 @@ from typing import Any
 import pytest
 from httpx import AsyncClient
 from litestar import Litestar
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
+from app.config.base import get_parser_settings
 from app.db.models import Language
 from app.db.models.book import Book
 from app.db.models.word import Word
+from app.domain.parser import executor
 from app.server.plugins import alchemy
 
 here = Path(__file__).parent
@@ -27,11 +30,22 @@ async def fx_engine() -> AsyncEngine:
     Returns:
         Async SQLAlchemy engine instance.
     """
-    return create_async_engine(
+    engine = create_async_engine(
         url="sqlite+aiosqlite:///test1.sqlite",
         echo=False,
     )
 
+    # emit BEGIN like the app engine, pysqlite otherwise commits a savepoint on RELEASE outside of a transaction
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqla_on_connect(dbapi_connection: Any, _: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _sqla_on_begin(connection: Any) -> None:
+        connection.exec_driver_sql("BEGIN")
+
+    return engine
+
 
 @pytest.fixture(name="sessionmaker")
 def fx_session_maker_factory(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
@@ -67,11 +81,14 @@ async def _seed_db(
     from app.domain.book.services import BookService
     from app.domain.language.services import LanguageService
     from app.domain.word.services import WordService
+    from app.domain.word.vocabulary_manager import vocabulary_manager
 
     metadata = BigIntBase.registry.metadata
     async with engine.begin() as conn:
         await conn.run_sync(metadata.drop_all)
         await conn.run_sync(metadata.create_all)
+    # the ids of the dropped vocabulary table
+    vocabulary_manager.clear()
     async with LanguageService.new(sessionmaker()) as language_service:
         await language_service.create_many(raw_languages, auto_commit=True)
     async with BookService.new(sessionmaker()) as book_service:
@@ -121,3 +138,12 @@ async def fx_client(app: Litestar) -> AsyncIterator[AsyncClient]:
     """
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         yield client
+
+
+@pytest.fixture()
+def _thread_parse_executor(monkeypatch: pytest.MonkeyPatch) -> AsyncIterator[None]:
+    """tokenize in a thread pool instead of spawning parser processes"""
+    monkeypatch.setattr(get_parser_settings(), "EXECUTOR", "thread")
+    monkeypatch.setattr(executor, "_parse_executor", None)
+    yield
+    executor.shutdown_parse_executor()
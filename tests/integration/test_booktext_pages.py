@@ -0,0 +1,130 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from litestar import Litestar
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.base import get_parser_settings
+from app.db.models.book import BookTextSegmentChunk
+from app.domain.book.services import BookTextService
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("_thread_parse_executor")]
+
+TEXT = """I have to go home.
+
+![cover](cover.png)
+
+See you tomorrow.
+
+The coach was late.
+"""
+
+
+async def test_booktext_pages(client: AsyncClient, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": TEXT})
+
+    response = await client.get(f"/book/booktext/{booktext.id}/page", params={"offset": 0, "limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert (page["totalParagraphs"], page["nextOffset"]) == (3, 2)
+    paragraphs = [segment for segment in page["data"] if segment["segmentType"] == "sentence"]
+    assert [segment["paragraphOrder"] for segment in paragraphs] == [1, 2]
+    assert [word["wordString"] for word in paragraphs[0]["segmentWords"]][:3] == ["I", "have to", "go"]
+    assert "image" in [segment["segmentType"] for segment in page["data"]]
+
+    response = await client.get(f"/book/booktext/{booktext.id}/page", params={"offset": 2, "limit": 2})
+    page = response.json()
+    assert (page["totalParagraphs"], page["nextOffset"]) == (3, None)
+    assert [segment["paragraphOrder"] for segment in page["data"]] == [3]
+
+
+def test_booktext_schema_hides_the_segment_index(app: Litestar) -> None:
+    schemas = app.openapi_schema.to_schema()["components"]["schemas"]
+    properties = {name for schema in schemas.values() for name in schema.get("properties", {})}
+    assert not {"segmentIndex", "chunkSize"} & properties
+
+
+async def test_booktext_page_reads_its_chunks(
+    client: AsyncClient, sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_parser_settings(), "PAGE_CHUNK_SIZE", 2)
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": TEXT})
+
+    response = await client.get(f"/book/booktext/{booktext.id}/page", params={"offset": 2, "limit": 1})
+    page = response.json()
+    assert (page["totalParagraphs"], page["nextOffset"]) == (3, None)
+    assert [segment["paragraphOrder"] for segment in page["data"]] == [3]
+    async with sessionmaker() as session:
+        chunks = (
+            await session.scalars(
+                select(BookTextSegmentChunk)
+                .where(BookTextSegmentChunk.booktext_id == booktext.id)
+                .order_by(BookTextSegmentChunk.chunk_order)
+            )
+        ).all()
+    assert [chunk.chunk_order for chunk in chunks] == [0, 1]
+    # only the chunk of the page was tokenized
+    assert [chunk.tokenized_text is not None for chunk in chunks] == [False, True]
+    assert "image" in [segment["segment_type"] for segment in chunks[0].segments]
+
+    response = await client.get(f"/book/booktext/{booktext.id}/page", params={"offset": 1, "limit": 2})
+    page = response.json()
+    assert (page["totalParagraphs"], page["nextOffset"]) == (3, None)
+    assert [segment["paragraphOrder"] for segment in page["data"] if segment["segmentType"] == "sentence"] == [2, 3]
+
+
+async def test_booktext_stream(
+    client: AsyncClient, sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_parser_settings(), "STREAM_BATCH_SIZE", 2)
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": TEXT})
+
+    async with client.stream("GET", f"/book/booktext/{booktext.id}/stream") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        segments = [json.loads(line) async for line in response.aiter_lines() if line]
+
+    segment_types = [segment["segmentType"] for segment in segments]
+    assert [segment_type for segment_type in segment_types if segment_type != "hardlinebreak"] == [
+        "sentence",
+        "image",
+        "sentence",
+        "sentence",
+    ]
+    assert [segment["paragraphOrder"] for segment in segments if segment["segmentType"] == "sentence"] == [1, 2, 3]
+    assert [word["wordString"] for word in segments[0]["segmentWords"]][:3] == ["I", "have to", "go"]
+
+
+async def test_booktext_compact_format(client: AsyncClient, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": TEXT})
+
+    response = await client.get(f"/book/booktext/{booktext.id}")
+    assert response.headers["content-type"].startswith("application/json")
+    expected = response.json()["data"]
+
+    response = await client.get(
+        f"/book/booktext/{booktext.id}", headers={"Accept": "application/vnd.lute.compact+json"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/vnd.lute.compact+json")
+    compact = response.json()
+    words = [dict(zip(compact["wordFields"], word, strict=True)) for word in compact["words"]]
+    assert len(words) < len(compact["tokenWords"])
+
+    segments = []
+    for segment in compact["segments"]:
+        start, count = segment.pop("tokenStart", 0), segment.pop("tokenCount", 0)
+        segment["segmentWords"] = [
+            {**words[word], "nextIsWs": bool(ws)}
+            for word, ws in zip(
+                compact["tokenWords"][start : start + count], compact["tokenWs"][start : start + count], strict=True
+            )
+        ]
+        segments.append({"segmentValue": "", "segmentRaw": "", "paragraphOrder": 0, "sentenceOrder": 0, **segment})
+    assert segments == expected
@@ -0,0 +1,67 @@
+from dataclasses import replace
+from typing import Any
+
+import pytest
+from litestar import Litestar
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.book.services import BookTextParseCacheService, BookTextService
+from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.executor import get_parse_executor
+from app.domain.parser.markdown_text_parser import TokenizedParagraphSegment, TokenizedSegment, parse_markdown
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("_thread_parse_executor")]
+
+TEXT = """I have to go home. It is late.
+
+See you tomorrow.
+
+The coach was late.
+"""
+
+
+def without_token_ids(segments: list[TokenizedSegment]) -> list[TokenizedSegment]:
+    return [
+        replace(segment, token_ids=[]) if isinstance(segment, TokenizedParagraphSegment) else segment
+        for segment in segments
+    ]
+
+
+async def test_edit_only_tokenizes_changed_paragraphs(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    parse_executor = get_parse_executor()
+    tokenized_texts: list[list[str]] = []
+    split_sentences_and_tokenize_many = parse_executor.split_sentences_and_tokenize_many
+
+    async def spy(parser_name: str, texts: list[str], batch_size: int | None = None) -> Any:
+        tokenized_texts.append(texts)
+        return await split_sentences_and_tokenize_many(parser_name, texts, batch_size)
+
+    monkeypatch.setattr(parse_executor, "split_sentences_and_tokenize_many", spy)
+    new_text = TEXT.replace("See you tomorrow.", "See you on Monday.")
+    try:
+        async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+            booktext = await booktext_service.create({"ref_book_id": 1, "book_text": TEXT})
+            async with BookTextParseCacheService.new(session) as parse_cache_service:
+                await parse_cache_service.get_tokenized_segments(booktext, "english")
+                booktext = await booktext_service.update({"book_text": new_text}, item_id=booktext.id)
+                segments = await parse_cache_service.get_tokenized_segments(booktext, "english")
+                cached_segments = await parse_cache_service.get_tokenized_segments(booktext, "english")
+    finally:
+        parse_executor.shutdown()
+
+    assert tokenized_texts == [
+        ["I have to go home. It is late.", "See you tomorrow.", "The coach was late."],
+        ["See you on Monday."],
+    ]
+    expected = parser_tool.tokenize_segments(parse_markdown(new_text), LanguageParser.get_parser("english"))
+    assert without_token_ids(segments) == expected
+    assert cached_segments == segments
+
+
+def test_booktext_schema_hides_the_parse_caches(app: Litestar) -> None:
+    schemas = app.openapi_schema.to_schema()["components"]["schemas"]
+    properties = {name for schema in schemas.values() for name in schema.get("properties", {})}
+    assert "bookText" in properties
+    assert not {"parseCaches", "tokenizedText", "paragraphHashes"} & properties
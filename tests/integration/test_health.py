@@ -1,6 +1,8 @@
 import pytest
 from httpx import AsyncClient
 
+from app.domain.parser.warmup import warm_up_state
+
 pytestmark = pytest.mark.anyio
 
 
@@ -10,8 +12,16 @@ async def test_health(client: AsyncClient) -> None:
 
     expected = {
         "database_status": "online",
+        "parser_status": "ready",
         "app": "app",
         "version": "",
     }
 
     assert response.json() == expected
+
+
+async def test_health_not_ready_during_warm_up(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(warm_up_state, "ready", False)
+    response = await client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["parser_status"] == "warming_up"
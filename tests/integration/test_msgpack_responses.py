@@ -0,0 +1,32 @@
+import msgspec
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.domain.book.services import BookTextService
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("_thread_parse_executor")]
+
+
+@pytest.mark.parametrize("path", ["/book/list_words", "/language/languages"])
+async def test_msgpack_negotiation(client: AsyncClient, path: str) -> None:
+    response = await client.get(path)
+    assert response.headers["content-type"].startswith("application/json")
+    expected = response.json()
+
+    for media_type in ("application/msgpack", "application/x-msgpack"):
+        response = await client.get(path, headers={"Accept": f"{media_type}, application/json;q=0.5"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith(media_type)
+        assert response.headers["vary"] == "Accept"
+        assert msgspec.msgpack.decode(response.content) == expected
+
+
+async def test_booktext_msgpack(client: AsyncClient, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+
+    expected = (await client.get(f"/book/booktext/{booktext.id}")).json()
+    response = await client.get(f"/book/booktext/{booktext.id}", headers={"Accept": "application/msgpack"})
+    assert response.headers["content-type"].startswith("application/msgpack")
+    assert msgspec.msgpack.decode(response.content) == expected
@@ -0,0 +1,131 @@
+from typing import Any
+
+import pytest
+from litestar import Litestar
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models.book import BookText, BookTextParseCache, BookTextParseJob, BookTextSegmentChunk, ParseStatus
+from app.domain.book.parse_queue import ParseQueue, get_parse_queue
+from app.domain.book.services import BookTextParseCacheService, BookTextSegmentIndexService, BookTextService
+from app.domain.parser.executor import get_parse_executor
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("_thread_parse_executor")]
+
+
+async def test_new_booktext_is_parsed_in_background(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+        assert booktext.parse_status == ParseStatus.QUEUED
+
+    queue = ParseQueue()
+    assert await queue.run_next()
+    assert not await queue.run_next()
+
+    async with sessionmaker() as session:
+        assert await session.scalar(select(BookText.parse_status).where(BookText.id == booktext.id)) == "parsed"
+        job = await session.scalar(select(BookTextParseJob).where(BookTextParseJob.booktext_id == booktext.id))
+        assert (job.status, job.attempts) == ("parsed", 1)
+        assert await session.scalar(select(BookTextParseCache.id).where(BookTextParseCache.booktext_id == booktext.id))
+
+
+async def test_failed_job_is_retried(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def broken(*args: Any, **kwargs: Any) -> Any:
+        raise RuntimeError("parser crashed")
+
+    monkeypatch.setattr(get_parse_executor(), "split_sentences_and_tokenize_many", broken)
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+
+    queue = ParseQueue(max_attempts=2, retry_delay=0)
+    assert await queue.run_next()
+    async with sessionmaker() as session:
+        job = await session.scalar(select(BookTextParseJob).where(BookTextParseJob.booktext_id == booktext.id))
+        assert (job.status, job.attempts) == ("queued", 1)
+        assert "parser crashed" in job.last_error
+
+    assert await queue.run_next()
+    assert not await queue.run_next()
+    async with sessionmaker() as session:
+        job = await session.scalar(select(BookTextParseJob).where(BookTextParseJob.booktext_id == booktext.id))
+        assert (job.status, job.attempts) == ("failed", 2)
+        assert await session.scalar(select(BookText.parse_status).where(BookText.id == booktext.id)) == "failed"
+
+
+async def test_queue_is_notified_after_commit(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    notified: list[bool] = []
+    monkeypatch.setattr(get_parse_queue(), "notify", lambda: notified.append(True))
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."}, auto_commit=False)
+        assert not notified
+        await session.commit()
+    assert notified == [True]
+
+
+async def test_update_without_text_change_is_not_queued(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+    assert await ParseQueue().run_next()
+
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        await booktext_service.update({"title": "Chapter 1"}, item_id=booktext.id, auto_commit=True)
+        assert await session.scalar(select(BookText.parse_status).where(BookText.id == booktext.id)) == "parsed"
+        await booktext_service.update({"book_text": "See you tomorrow."}, item_id=booktext.id, auto_commit=True)
+        assert await session.scalar(select(BookText.parse_status).where(BookText.id == booktext.id)) == "queued"
+
+
+async def test_update_of_a_modified_instance_is_queued(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+    assert await ParseQueue().run_next()
+
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        db_obj = await booktext_service.get(booktext.id)
+        db_obj.book_text = "See you tomorrow."
+        await booktext_service.update(db_obj, auto_commit=True)
+        assert await session.scalar(select(BookText.parse_status).where(BookText.id == booktext.id)) == "queued"
+
+
+async def test_read_racing_the_queue_keeps_its_entries(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """the read misses the entries the queue commits after its lookup, its inserts conflict with them"""
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+    assert await ParseQueue().run_next()
+
+    async def miss(**kwargs: Any) -> None:
+        return None
+
+    async with sessionmaker() as session:
+        async with BookTextParseCacheService.new(session) as parse_cache_service:
+            monkeypatch.setattr(parse_cache_service, "get_one_or_none", miss)
+            segments = await parse_cache_service.get_tokenized_segments(booktext, "english")
+        async with BookTextSegmentIndexService.new(session) as segment_index_service:
+            monkeypatch.setattr(segment_index_service, "get_one_or_none", miss)
+            segment_index = await segment_index_service.get_segment_index(booktext)
+        assert [segment.segment_type for segment in segments] == ["tokenizedparagraph"]
+        assert segment_index.total_paragraphs == 1
+        assert (
+            await session.scalar(
+                select(func.count(BookTextParseCache.id)).where(BookTextParseCache.booktext_id == booktext.id)
+            )
+            == 1
+        )
+        assert (
+            await session.scalar(
+                select(func.count(BookTextSegmentChunk.id)).where(BookTextSegmentChunk.booktext_id == booktext.id)
+            )
+            == 1
+        )
+
+
+def test_booktext_schema_hides_the_parse_job(app: Litestar) -> None:
+    schemas = app.openapi_schema.to_schema()["components"]["schemas"]
+    properties = {name for schema in schemas.values() for name in schema.get("properties", {})}
+    assert "parseStatus" in properties
+    assert not {"parseJob", "lastError", "attempts"} & properties
@@ -0,0 +1,27 @@
+import pytest
+from httpx import AsyncClient
+
+from app.domain.parser import executor
+from app.domain.parser.warmup import start_parser_warm_up, warm_up_state
+
+pytestmark = [pytest.mark.anyio, pytest.mark.usefixtures("_thread_parse_executor")]
+
+
+async def test_warm_up_loads_language_parsers(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(warm_up_state, "ready", True)
+    monkeypatch.setattr(warm_up_state, "task", None)
+    start_parser_warm_up()
+    assert not warm_up_state.ready
+
+    assert warm_up_state.task is not None
+    await warm_up_state.task
+    assert warm_up_state.ready
+    assert warm_up_state.failed_parsers == []
+    assert list(executor.get_parse_executor()._parser_versions) == ["english"]
+
+
+async def test_loaded_parsers_report(client: AsyncClient) -> None:
+    await executor.get_parse_executor().warm_up(["english"])
+    response = await client.get("/language/parsers/loaded")
+    assert response.status_code == 200
+    assert "english" in [model["parserName"] for model in response.json()]
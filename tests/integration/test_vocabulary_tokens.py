@@ -0,0 +1,127 @@
+from typing import Any
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models.book import BookTextParseCache
+from app.db.models.word import VocabularyToken, Word
+from app.domain.book.services import BookTextParseCacheService, BookTextService
+from app.domain.parser import parser_tool
+from app.domain.parser.language_parsers.vocabulary import normalize_token
+from app.domain.parser.markdown_text_parser import MatchedWord, TokenizedParagraphSegment
+from app.domain.word.services import WordService
+from app.domain.word.vocabulary_manager import VocabularyManager
+from app.domain.word.word_index import WordIndexManager
+
+pytestmark = pytest.mark.anyio
+
+
+async def get_table_tokens(session: AsyncSession) -> dict[int, str]:
+    return dict((await session.execute(select(VocabularyToken.id, VocabularyToken.token))).tuples().all())
+
+
+async def test_word_tokens_are_stored_as_vocabulary_ids(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        await word_service.create(
+            {
+                "language_id": 1,
+                "word_string": "have to cafe\u0301",
+                "is_multiple_words": True,
+                "word_status": 1,
+                "word_counts": 1,
+                # the decomposed form of "café" gets the id of the normalized token
+                "word_tokens": ["have", "to", "café"],
+            }
+        )
+        words = (await session.execute(select(Word.word_tokens, Word.word_token_ids))).tuples().all()
+        table_tokens = await get_table_tokens(session)
+
+    assert sorted(table_tokens.values()) == ["caf\u00e9", "have", "hello", "to"]
+    for word_tokens, word_token_ids in words:
+        assert word_token_ids is not None
+        assert [table_tokens[token_id] for token_id in word_token_ids] == [
+            normalize_token(token) for token in word_tokens
+        ]
+
+
+@pytest.mark.usefixtures("_thread_parse_executor")
+async def test_parse_cache_stores_token_ids(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session, BookTextService.new(session) as booktext_service:
+        booktext = await booktext_service.create({"ref_book_id": 1, "book_text": "I have to go home."})
+        async with BookTextParseCacheService.new(session) as parse_cache_service:
+            segments = await parse_cache_service.get_tokenized_segments(booktext, "english")
+
+    async with sessionmaker() as session:
+        tokenized_text = await session.scalar(select(BookTextParseCache.tokenized_text))
+        table_tokens = await get_table_tokens(session)
+        # a new worker reads the tokens back from the vocabulary table
+        loaded = await VocabularyManager().load_tokenized_segments(session, 1, tokenized_text)
+        term_trie = (await WordIndexManager().get(session, 1)).term_trie
+
+    assert tokenized_text is not None
+    sentence = tokenized_text[0]["token_ids"][0]
+    assert all(isinstance(token_id, int) for token_id in sentence)
+    assert [table_tokens[token_id] for token_id in sentence[:: parser_tool.TOKEN_STRIDE]] == [
+        "I",
+        "have",
+        "to",
+        "go",
+        "home",
+        ".",
+    ]
+    assert loaded == segments
+    paragraph = loaded[0]
+    assert isinstance(paragraph, TokenizedParagraphSegment)
+    assert [table_tokens[token_id] for token_id in paragraph.token_ids[0]] == ["I", "have", "to", "go", "home", "."]
+
+    parsed = await parser_tool.match_tokenized_segments(loaded, term_trie)
+    matched = [word.word.word_string for word in parsed[0].segment_words if isinstance(word, MatchedWord)]
+    assert matched == ["have to"]
+
+
+async def test_rolled_back_tokens_are_not_kept(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    manager = VocabularyManager()
+    async with sessionmaker() as session:
+        vocabulary = await manager.get_token_ids(session, 1, ["zebra"])
+        assert vocabulary.get_id("zebra") in await get_table_tokens(session)
+        # the id is not used outside of the transaction before it is committed
+        assert "zebra" not in manager.languages[1].ids
+        await session.rollback()
+        assert "zebra" not in manager.languages[1].ids
+        assert "zebra" not in (await get_table_tokens(session)).values()
+
+        vocabulary = await manager.get_token_ids(session, 1, ["zebra"])
+        assert "zebra" not in manager.languages[1].ids
+        await session.commit()
+
+    assert manager.languages[1].get_id("zebra") == vocabulary.get_id("zebra")
+
+
+async def test_concurrent_token_insert_reads_the_committed_id(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async with sessionmaker() as session:
+        zebra_id = (await VocabularyManager().get_token_ids(session, 1, ["zebra"])).get_id("zebra")
+        await session.commit()
+
+    manager = VocabularyManager()
+    select_tokens = manager._select
+    selects: list[Any] = []
+
+    async def select_after_insert(*args: Any) -> list[tuple[int, str]]:
+        # the first lookup runs before the other transaction commits "zebra"
+        selects.append(args)
+        return [] if len(selects) == 1 else await select_tokens(*args)
+
+    monkeypatch.setattr(manager, "_select", select_after_insert)
+    async with sessionmaker() as session:
+        vocabulary = await manager.get_token_ids(session, 1, ["zebra", "zebu"])
+        await session.commit()
+        table_tokens = await get_table_tokens(session)
+
+    assert len(selects) == 3
+    assert vocabulary.get_id("zebra") == zebra_id
+    assert table_tokens[vocabulary.get_id("zebu")] == "zebu"
+    assert list(table_tokens.values()).count("zebra") == 1
+    assert manager.languages[1].get_id("zebu") == vocabulary.get_id("zebu")
@@ -0,0 +1,146 @@
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config.base import get_word_index_settings
+from app.db.models.word import Word, WordImage, WordIndexDeletion
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.word.services import WordService
+from app.domain.word.vocabulary_manager import vocabulary_manager
+from app.domain.word.word_index import WordIndexManager
+
+pytestmark = pytest.mark.anyio
+
+
+async def first_tokens(session: AsyncSession, term_trie: TermTrie) -> list[str]:
+    """the first tokens of the terms of the trie, which is keyed by their vocabulary ids"""
+    vocabulary = await vocabulary_manager.get_tokens(session, 1, term_trie.root.children)
+    return sorted(vocabulary.tokens.values())
+
+
+async def test_word_index_follows_other_worker_writes(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    worker_a, worker_b = WordIndexManager(), WordIndexManager()
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        index = await worker_b.get(session, 1)
+        assert sorted(index.word_index) == ["have", "hello"]
+        assert index.generation == 0
+
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        await worker_a.get(session, 1)
+        await word_service.create(
+            {
+                "language_id": 1,
+                "word_string": "have to go",
+                "is_multiple_words": True,
+                "word_status": 1,
+                "word_counts": 1,
+                "word_tokens": ["have", "to", "go"],
+            }
+        )
+        hello = await word_service.get_one(word_string="hello")
+        await word_service.delete(hello.id)
+
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        index = await worker_b.get(session, 1)
+        again = await worker_b.get(session, 1)
+
+    assert again is index
+    assert index.generation == 2
+    assert sorted(index.word_index) == ["have"]
+    assert [word.word_string for word in index.word_index["have"]] == ["have to", "have to go"]
+    assert hello.word_token_ids is not None
+    assert hello.word_token_ids[0] not in index.term_trie.root.children
+    async with sessionmaker() as session:
+        deletions = (await session.execute(select(WordIndexDeletion.word_id, WordIndexDeletion.generation))).all()
+    assert deletions == [(hello.id, 2)]
+
+
+async def test_word_write_and_generation_bump_share_the_transaction(
+    sessionmaker: async_sessionmaker[AsyncSession],
+) -> None:
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        await word_service.create(
+            {
+                "language_id": 1,
+                "word_string": "go",
+                "is_multiple_words": False,
+                "word_status": 1,
+                "word_counts": 1,
+                "word_tokens": ["go"],
+            },
+            auto_commit=False,
+        )
+        assert await WordIndexManager.get_generation(session, 1) == 1
+        await session.rollback()
+
+    async with sessionmaker() as session:
+        assert await WordIndexManager.get_generation(session, 1) == 0
+        assert await session.scalar(select(Word.id).where(Word.word_string == "go")) is None
+
+
+async def test_word_with_several_images_is_one_record(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    async with sessionmaker() as session:
+        have_id = await session.scalar(select(Word.id).where(Word.first_word == "have").limit(1))
+        session.add_all(
+            [
+                WordImage(word_id=have_id, word_image_name="old", word_image_path="old.png"),
+                WordImage(word_id=have_id, word_image_name="new", word_image_path="new.png"),
+            ]
+        )
+        await session.commit()
+        index = await WordIndexManager().get(session, 1)
+
+    assert [word.word_image_path for word in index.word_index["have"] if word.id == have_id] == ["new.png"]
+    assert len(index.words) == sum(len(words) for words in index.word_index.values())
+
+
+async def test_lazy_word_index_fetches_text_words(
+    sessionmaker: async_sessionmaker[AsyncSession], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(get_word_index_settings(), "LOOKUP_CHUNK_SIZE", 1)
+    monkeypatch.setattr(get_word_index_settings(), "LAZY_MAX_BUCKETS", 2)
+    worker = WordIndexManager()
+    async with sessionmaker() as session:
+        term_trie = await worker.get_text_term_trie(session, 1, {"have", "go"})
+        assert await first_tokens(session, term_trie) == ["have"]
+        assert list(worker.lazy_languages[1].buckets) == ["go", "have"]
+
+        await worker.get_text_term_trie(session, 1, {"hello"})
+        assert list(worker.lazy_languages[1].buckets) == ["have", "hello"]
+
+
+async def test_lazy_word_index_drops_only_changed_buckets(sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+    worker = WordIndexManager()
+    async with sessionmaker() as session, WordService.new(session) as word_service:
+        # the "have" words are older than the sync overlap of the latest update, so they do not count as changed
+        await session.execute(update(Word).values(updated_at=datetime(2025, 1, 1, tzinfo=UTC)))
+        await session.execute(
+            update(Word).where(Word.first_word == "have").values(updated_at=datetime(2024, 1, 1, tzinfo=UTC))
+        )
+        await session.commit()
+        await worker.get_text_term_trie(session, 1, {"have", "hello", "go"})
+        have_bucket = worker.lazy_languages[1].buckets["have"]
+        assert worker.lazy_languages[1].buckets["go"] == []
+
+        await word_service.create(
+            {
+                "language_id": 1,
+                "word_string": "go home",
+                "is_multiple_words": True,
+                "word_status": 1,
+                "word_counts": 1,
+                "word_tokens": ["go", "home"],
+            }
+        )
+        hello = await word_service.get_one(word_string="hello")
+        await word_service.delete(hello.id)
+        term_trie = await worker.get_text_term_trie(session, 1, {"have", "hello", "go"})
+        assert await first_tokens(session, term_trie) == ["go", "have"]
+
+    index = worker.lazy_languages[1]
+    assert index.generation == 2
+    assert index.buckets["have"] is have_bucket
+    assert [word.word_string for word in index.buckets["go"]] == ["go home"]
+    assert index.buckets["hello"] == []
@@ -1,9 +1,13 @@
+from collections.abc import Callable, Iterable
+
 from pytest import fixture
 from spacy.tokens import Token
 
-from app.db.models.word import Word
 from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
 from app.domain.parser.markdown_text_parser import VWord
+from app.domain.word.word_index import WordRecord
 
 
 # async def match_word_in_sentence(sentence: Iterable[Token], max_loop_num: int,word_index:WordIndex) -> TokenSentence:
@@ -28,8 +32,10 @@ def assert_vword_list_equal(vwordlist1: list[VWord], vwordlist2: list[VWord]) ->
 
 
 @fixture()
-def word_index() -> dict[str, list[Word]]:
-    word1 = Word(
+def word_index(add_tokens: Callable[[Iterable[str]], Vocabulary]) -> dict[str, list[WordRecord]]:
+    vocabulary = add_tokens(["have", "to"])
+    word1 = WordRecord(
+        id=1,
         word_string="have",
         word_lemma="have",
         word_pos="v",
@@ -38,10 +44,14 @@ def word_index() -> dict[str, list[Word]]:
         word_pronunciation="",
         word_explanation="own",
         word_counts=1,
-        word_tokens=["have"],
+        word_tokens=("have",),
+        word_token_ids=(vocabulary.get_id("have"),),
         first_word="have",
+        word_image_path=None,
+        updated_at=None,
     )
-    word2 = Word(
+    word2 = WordRecord(
+        id=2,
         word_string="have to",
         word_lemma="have to",
         word_pos="v",
@@ -50,8 +60,11 @@ def word_index() -> dict[str, list[Word]]:
         word_pronunciation="",
         word_explanation="must do something",
         word_counts=2,
-        word_tokens=["have", "to"],
+        word_tokens=("have", "to"),
+        word_token_ids=(vocabulary.get_id("have"), vocabulary.get_id("to")),
         first_word="have",
+        word_image_path=None,
+        updated_at=None,
     )
 
     return {"have": [word2, word1]}
@@ -67,10 +80,14 @@ def sentence_tokens() -> list[Token]:
 
 
 @fixture()
-async def get_vwords(sentence_tokens: list[Token], word_index: dict[str, list[Word]]) -> list[VWord]:
+async def get_vwords(
+    sentence_tokens: list[Token], word_index: dict[str, list[WordRecord]], vocabulary: Vocabulary
+) -> list[VWord]:
     max_loop_num = 100
-    token_sentence = await parser_tool.match_word_in_sentence(sentence_tokens, word_index, max_loop_num)
-    return token_sentence.segment_value
+    term_trie = TermTrie.from_word_index(word_index)
+    token_ids = vocabulary.encode(token.word_string for token in sentence_tokens)
+    token_sentence = await parser_tool.match_word_in_sentence(sentence_tokens, token_ids, term_trie, max_loop_num)
+    return [parser_tool.to_vword(word) for word in token_sentence.segment_value]
 
 
 @fixture()
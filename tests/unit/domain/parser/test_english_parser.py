@@ -1,4 +1,5 @@
 from app.domain.parser import LanguageParser
+from app.domain.parser.language_parsers.spacy_parser import load_pipeline
 
 
 def test_english_parser() -> None:
@@ -10,3 +11,18 @@ def test_english_tokenizer() -> None:
     parser = LanguageParser.get_parser("english")
     text = "I am good. "
     assert [t.word_string for t in parser.tokenize(text)] == ["I", "am", "good", "."]
+
+
+def test_english_split_sentences_and_tokenize_many() -> None:
+    parser = LanguageParser.get_parser("english")
+    texts = ["I am good. You are good.", "Hello world.", ""]
+    assert parser.split_sentences_and_tokenize_many(texts, batch_size=2) == [
+        parser.split_sentences_and_tokenize(text) for text in texts
+    ]
+
+
+def test_english_lean_pipeline_profile() -> None:
+    nlp = load_pipeline("en_core_web_sm", "lean")
+    assert not {"parser", "ner"}.intersection(nlp.pipe_names)
+    text = "I am good. You are good."
+    assert [sent.text for sent in nlp(text).sents] == ["I am good.", "You are good."]
@@ -1,4 +1,11 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.config.base import get_parser_settings
 from app.domain.parser import LanguageParser
+from app.domain.parser.language_parsers.fugashi_parser import SpokenJapaneseParser
+from app.domain.parser.language_parsers.paser_config import get_fugashi_unidic
 
 
 def test_japanese_parser() -> None:
@@ -10,3 +17,25 @@ def test_japanese_tokenizer() -> None:
     parser = LanguageParser.get_parser("japanese")
     text = "私は元気です。"
     assert [t.word_string for t in parser.tokenize(text)] == ["私", "は", "元気", "です", "。"]
+
+
+def test_spoken_japanese_tagger_pool(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(get_parser_settings(), "TAGGER_POOL_SIZE", 3)
+    parser = SpokenJapaneseParser("spoken_japanese", undic_path=get_fugashi_unidic()["spoken_japanese"])
+    texts = ["私は元気です。今日は晴れ。", "吾輩は猫である。名前はまだ無い。", "", "雨が降った。"] * 5
+
+    expected = [[parser.tokenize(sentence) for sentence in parser.split_sentences(text)] for text in texts]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: parser._split_sentences_and_tokenize_many(texts), range(8)))
+    assert all(result == expected for result in results)
+    assert parser._tagger_pool._created <= 3
+
+
+def test_spoken_japanese_raw_features_match_named_tuple() -> None:
+    parser = SpokenJapaneseParser("spoken_japanese", undic_path=get_fugashi_unidic()["spoken_japanese"])
+    text = "東京でコーヒーを飲んだ。「テスト」\uff0cｷﾞｬﾙ foo-bar、今日はこんにちは\uff01野家"
+    with parser._tagger_pool.checkout() as tagger:
+        expected = [parser._node_word_token(node) for node in tagger(text)]
+        assert parser._tokenize(tagger, text) == expected
+        # the memoized readings give the same tokens again
+        assert parser._tokenize(tagger, text) == expected
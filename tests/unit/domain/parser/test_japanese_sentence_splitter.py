@@ -0,0 +1,49 @@
+import pytest
+from konoha import SentenceTokenizer
+
+from app.domain.parser import LanguageParser
+from app.domain.parser.language_parsers import paser_config
+from app.domain.parser.language_parsers.japanese_parser import JapaneseParser
+from app.domain.parser.language_parsers.japanese_sentence_splitter import split_japanese_sentences
+
+KONOHA_TEXTS = [
+    "吾輩は猫である。名前はまだ無い。どこで生れたかとんと見当がつかぬ。",
+    "彼は「もう帰る。明日また来る。」と言った。そして出て行った。",
+    "会議（午後三時から。場所は未定。）に出る。",
+    "（a「b）c。」d。「閉じない。まま。",
+    "一行目。\r\n\n   二行目の途中。 続き   \n\n最後の行",
+    "",
+    "句点のない文",
+]
+
+
+@pytest.mark.parametrize("text", KONOHA_TEXTS)
+def test_conforms_to_konoha(text: str) -> None:
+    assert split_japanese_sentences(text) == SentenceTokenizer().tokenize(text)
+
+
+def test_exclamation_and_question_marks() -> None:
+    text = "本当？！うそでしょう！「待って！」と叫んだ。どうして？"
+    assert split_japanese_sentences(text) == ["本当？！", "うそでしょう！", "「待って！」と叫んだ。", "どうして？"]
+
+
+def test_japanese_parser_rules_splitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(paser_config.japanese_sentence_splitters, "japanese", "rules")
+    parser = JapaneseParser("japanese")
+    texts = ["私は元気です。今日は晴れ！", "雨が降った。"]
+
+    paragraphs = parser._split_sentences_and_tokenize_many(texts)
+    assert [
+        ["".join(token.word_string for token in sentence) for sentence in sentences] for sentences in paragraphs
+    ] == [
+        ["私は元気です。", "今日は晴れ！"],
+        ["雨が降った。"],
+    ]
+    assert paragraphs[0] == parser._split_sentences_and_tokenize(texts[0])
+    assert parser.get_parser_version() != LanguageParser.get_parser("japanese").get_parser_version()
+
+
+def test_unsupported_sentence_splitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(paser_config.japanese_sentence_splitters, "japanese", "konoha")
+    with pytest.raises(ValueError, match="not supported"):
+        JapaneseParser("japanese")
@@ -0,0 +1,57 @@
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+
+from app.domain.parser.language_parsers import model_manager
+from app.domain.parser.language_parsers.model_manager import ParserModelManager
+
+MIB = 2**20
+
+
+@pytest.fixture()
+def fake_rss(monkeypatch: pytest.MonkeyPatch) -> list[int]:
+    """every load grows the resident memory by the size appended to the list"""
+    rss = [0]
+    monkeypatch.setattr(model_manager, "get_rss_bytes", lambda: rss[-1])
+    return rss
+
+
+def loader(name: str, size: int, rss: list[int], loads: list[str]) -> Callable[[], Any]:
+    def load() -> Any:
+        loads.append(name)
+        rss.append(rss[-1] + size)
+        return object()
+
+    return load
+
+
+def test_evicts_least_recently_used_over_budget(fake_rss: list[int]) -> None:
+    manager = ParserModelManager(memory_budget=250 * MIB)
+    loads: list[str] = []
+    english = manager.get("english", loader("english", 100 * MIB, fake_rss, loads))
+    manager.get("japanese", loader("japanese", 100 * MIB, fake_rss, loads))
+    assert manager.get("english", loader("english", 100 * MIB, fake_rss, loads)) is english
+
+    manager.get("spoken_japanese", loader("spoken_japanese", 100 * MIB, fake_rss, loads))
+    assert [loaded.parser_name for loaded in manager.loaded()] == ["english", "spoken_japanese"]
+    assert [model.size_bytes for model in manager.model_info()] == [100 * MIB, 100 * MIB]
+
+    manager.get("japanese", loader("japanese", 100 * MIB, fake_rss, loads))
+    assert loads == ["english", "japanese", "spoken_japanese", "japanese"]
+    assert [loaded.parser_name for loaded in manager.loaded()] == ["spoken_japanese", "japanese"]
+
+
+def test_evicts_idle_parsers(fake_rss: list[int], monkeypatch: pytest.MonkeyPatch) -> None:
+    clock: Iterator[float] = iter([0.0, 50.0])
+    monkeypatch.setattr(model_manager.time, "monotonic", lambda: next(clock))
+    manager = ParserModelManager(idle_timeout=60)
+    monkeypatch.setattr(manager, "_start_sweeper", lambda: None)
+    loads: list[str] = []
+    manager.get("english", loader("english", MIB, fake_rss, loads))
+    manager.get("japanese", loader("japanese", MIB, fake_rss, loads))
+
+    assert manager.evict_idle(now=100.0) == ["english"]
+    assert [loaded.parser_name for loaded in manager.loaded()] == ["japanese"]
+    assert manager.unload("japanese")
+    assert not manager.unload("japanese")
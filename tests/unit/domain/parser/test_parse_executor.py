@@ -0,0 +1,33 @@
+import pytest
+
+from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.executor import ParseExecutor
+from app.domain.parser.markdown_text_parser import parse_markdown
+from app.lib.exceptions import ParserBusyError
+
+pytestmark = pytest.mark.anyio
+
+TEXT = """I have to go home. It is late.
+
+See you tomorrow.
+"""
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+async def test_parse_executor_tokenize_segments(mode: str) -> None:
+    parse_executor = ParseExecutor(mode=mode, pool_size=1)
+    try:
+        segments = await parse_executor.tokenize_segments(parse_markdown(TEXT), "english")
+        parser_version = await parse_executor.get_parser_version("english")
+    finally:
+        parse_executor.shutdown()
+    parser = LanguageParser.get_parser("english")
+    assert segments == parser_tool.tokenize_segments(parse_markdown(TEXT), parser)
+    assert parser_version == parser.get_parser_version()
+    assert parse_executor.pending == 0
+
+
+async def test_parse_executor_queue_full() -> None:
+    parse_executor = ParseExecutor(mode="thread", pool_size=1, max_queue_size=0)
+    with pytest.raises(ParserBusyError):
+        await parse_executor.tokenize_segments(parse_markdown(TEXT), "english")
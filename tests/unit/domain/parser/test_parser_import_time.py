@@ -0,0 +1,42 @@
+"""The parser package is imported by the models, the CLI and the migrations, it must not load the NLP libraries."""
+
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = {"spacy", "fugashi", "konoha", "jaconv"}
+
+
+def import_time(statement: str) -> dict[str, int]:
+    """cumulative import time in µs of every module imported by ``statement``, from ``python -X importtime``"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        check=True,
+        env=env,
+        text=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module_name = line.removeprefix("import time:").split("|")
+            if cumulative.strip().isdigit():
+                modules[module_name.strip()] = int(cumulative)
+    return modules
+
+
+def test_parser_package_does_not_import_nlp_libraries() -> None:
+    modules = import_time("import app.domain.parser, app.domain.parser.executor")
+    assert "app.domain.parser" in modules
+    assert HEAVY_MODULES.isdisjoint(modules), sorted(HEAVY_MODULES & modules.keys())
+
+
+def test_get_parser_imports_its_implementation() -> None:
+    modules = import_time(
+        "from app.domain.parser import LanguageParser, parser_tool\n"
+        "assert 'english' in parser_tool.list_all_parsers()\n"
+        "LanguageParser.get_parser('english')"
+    )
+    assert "spacy" in modules
+    assert {"fugashi", "konoha"}.isdisjoint(modules)
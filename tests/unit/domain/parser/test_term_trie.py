@@ -0,0 +1,35 @@
+from array import array
+from collections.abc import Callable
+
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
+from app.domain.word.word_index import WordRecord
+
+
+def test_term_trie_longest_match(make_word_record: Callable[..., WordRecord], vocabulary: Vocabulary) -> None:
+    term_trie = TermTrie([make_word_record("have"), make_word_record("have to"), make_word_record("have to go home")])
+    token_ids = vocabulary.encode("I have to go now".split())
+    assert term_trie.longest_match(token_ids, 0) is None
+    match = term_trie.longest_match(token_ids, 1)
+    assert match is not None
+    assert (match[0].word_string, match[1]) == ("have to", 2)
+
+
+def test_term_trie_matches_token_ids(make_word_record: Callable[..., WordRecord], vocabulary: Vocabulary) -> None:
+    have_to = make_word_record("have to")
+    term_trie = TermTrie([have_to])
+    assert set(term_trie.root.children) == {have_to.word_token_ids[0]}
+    match = term_trie.longest_match(array("I", have_to.word_token_ids), 0)
+    assert match is not None
+    assert match[0] is have_to
+    assert vocabulary.decode(have_to.word_token_ids) == ["have", "to"]
+
+
+def test_term_trie_replace_branches(make_word_record: Callable[..., WordRecord], vocabulary: Vocabulary) -> None:
+    have = make_word_record("have")
+    term_trie = TermTrie([have, make_word_record("have to"), make_word_record("go")])
+    term_trie.replace_branches([have.word_token_ids[0]], [have])
+    match = term_trie.longest_match(vocabulary.encode(["have", "to", "go"]), 0)
+    assert match is not None
+    assert (match[0].word_string, match[1]) == ("have", 0)
+    assert term_trie.longest_match(vocabulary.encode(["go"]), 0) is not None
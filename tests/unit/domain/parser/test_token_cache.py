@@ -0,0 +1,41 @@
+from app.domain.parser import LanguageParser
+from app.domain.parser.language_parsers.token_cache import TokenCache, get_token_cache
+from app.domain.parser.markdown_text_parser import WordToken
+
+SENTENCES = [[WordToken(word_string="home", word_lemma="home", word_pos="NOUN", is_word=True)]]
+
+
+def test_token_cache_returns_copies() -> None:
+    token_cache = TokenCache(max_bytes=1024 * 1024)
+    token_cache.put("english", "home", SENTENCES)
+    cached = token_cache.get("english", "home")
+    assert cached == SENTENCES
+    assert cached is not None
+    cached[0][0].word_string = "changed"
+    assert token_cache.get("english", "home") == SENTENCES
+    assert token_cache.get("japanese", "home") is None
+    stats = token_cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 1, 1)
+
+
+def test_token_cache_evicts_by_size() -> None:
+    token_cache = TokenCache(max_bytes=1024 * 1024)
+    token_cache.put("english", "home", SENTENCES)
+    entry_size = token_cache.current_bytes
+    token_cache = TokenCache(max_bytes=entry_size * 2)
+    for text in ("a", "b", "c"):
+        token_cache.put("english", text, SENTENCES)
+    stats = token_cache.stats()
+    assert (stats.entries, stats.evictions) == (2, 1)
+    assert stats.current_bytes <= stats.max_bytes
+    assert token_cache.get("english", "a") is None
+    assert token_cache.get("english", "c") == SENTENCES
+
+
+def test_parser_uses_token_cache() -> None:
+    parser = LanguageParser.get_parser("english")
+    text = "The token cache is shared by every parser."
+    hits = get_token_cache().stats().hits
+    first = parser.split_sentences_and_tokenize(text)
+    assert parser.split_sentences_and_tokenize_many([text]) == [first]
+    assert get_token_cache().stats().hits == hits + 1
@@ -0,0 +1,106 @@
+from collections.abc import Callable, Iterable
+
+import msgspec
+import pytest
+
+from app.domain.parser import LanguageParser, parser_tool
+from app.domain.parser.language_parsers.term_trie import TermTrie
+from app.domain.parser.language_parsers.vocabulary import Vocabulary
+from app.domain.parser.markdown_text_parser import (
+    MatchedWord,
+    TokenizedParagraphSegment,
+    TokenizedSegment,
+    VWordStruct,
+    parse_markdown,
+)
+from app.domain.word.word_index import WordRecord
+
+pytestmark = pytest.mark.anyio
+
+TEXT = """I have to go home. It is late.
+
+![cover](cover.png)
+
+See you tomorrow.
+"""
+
+
+def tokenize(add_tokens: Callable[[Iterable[str]], Vocabulary]) -> list[TokenizedSegment]:
+    """the tokenized segments of ``TEXT`` with the ids of the ``vocabulary`` fixture"""
+    segments = parser_tool.tokenize_segments(parse_markdown(TEXT), LanguageParser.get_parser("english"))
+    parser_tool.set_token_ids(segments, add_tokens(parser_tool.get_vocabulary_strings(segments)))
+    return segments
+
+
+def test_tokenize_segments() -> None:
+    parser = LanguageParser.get_parser("english")
+    segments = parser_tool.tokenize_segments(parse_markdown(TEXT), parser)
+    paragraphs = [segment for segment in segments if isinstance(segment, TokenizedParagraphSegment)]
+    assert [paragraph.paragraph_order for paragraph in paragraphs] == [1, 2]
+    assert [token.word_string for token in paragraphs[1].segment_value[0]] == ["See", "you", "tomorrow", "."]
+
+
+def test_tokenized_segments_roundtrip(add_tokens: Callable[[Iterable[str]], Vocabulary]) -> None:
+    segments = tokenize(add_tokens)
+    vocabulary = add_tokens(())
+    data = msgspec.json.decode(msgspec.json.encode(parser_tool.dump_tokenized_segments(segments, vocabulary)))
+    paragraph = next(item for item in data if item["segment_type"] == TokenizedParagraphSegment.segment_type)
+    # every token is stored as the ids of its strings and its flags
+    sentence = paragraph["token_ids"][0]
+    assert all(isinstance(token_id, int) for token_id in sentence)
+    assert len(sentence) == parser_tool.TOKEN_STRIDE * len(segments[0].segment_value[0])  # type: ignore[union-attr]
+    assert vocabulary.decode(sentence[:: parser_tool.TOKEN_STRIDE]) == ["I", "have", "to", "go", "home", "."]
+    assert parser_tool.get_stored_token_ids(data) <= set(vocabulary.tokens)
+
+    loaded = parser_tool.load_tokenized_segments(data, vocabulary)
+    assert loaded == segments
+    # the loaded tokens share the strings of the vocabulary
+    token = loaded[0].segment_value[0][1]  # type: ignore[union-attr]
+    assert token.word_string is vocabulary.tokens[vocabulary.get_id("have")]
+
+
+async def test_word_overlay_matches_parsed_segments(
+    make_word_record: Callable[..., WordRecord], add_tokens: Callable[[Iterable[str]], Vocabulary]
+) -> None:
+    segments = tokenize(add_tokens)
+    term_trie = TermTrie([make_word_record("go home", id=1), make_word_record("tomorrow", id=2)])
+    overlay = parser_tool.get_word_overlay(segments, term_trie)
+    assert [(o.paragraph_order, o.sentence_order, o.token_start, o.token_count, o.word_db_id) for o in overlay] == [
+        (1, 1, 3, 2, 1),
+        (2, 1, 2, 1, 2),
+    ]
+    parsed = await parser_tool.match_tokenized_segments(segments, term_trie)
+    matched = [
+        (segment.paragraph_order, parser_tool.to_vword(word).word_db_id)
+        for segment in parsed
+        for word in segment.segment_words
+    ]
+    assert [(o.paragraph_order, o.word_db_id) for o in overlay] == [m for m in matched if m[1] != -1]
+
+
+async def test_matched_words_are_views_of_the_tokens(
+    make_word_record: Callable[..., WordRecord], add_tokens: Callable[[Iterable[str]], Vocabulary]
+) -> None:
+    segments = tokenize(add_tokens)
+    go_home = make_word_record("go home", id=7, word_status=2, word_explanation="return")
+    parsed = await parser_tool.match_tokenized_segments(segments, TermTrie([go_home]))
+
+    tokens = next(segment for segment in segments if isinstance(segment, TokenizedParagraphSegment)).segment_value[0]
+    words = parsed[0].segment_words
+    # the unmatched tokens are not copied, the matched ones only keep their WordRecord
+    assert words[0] is tokens[0]
+    assert words[3] == MatchedWord(word=go_home, next_is_ws=tokens[4].next_is_ws)
+    vword = parser_tool.to_vword(words[3])
+    assert (vword.word_string, vword.word_tokens, vword.word_status, vword.word_explanation, vword.word_db_id) == (
+        "go home",
+        ["go", "home"],
+        2,
+        "return",
+        7,
+    )
+    assert (vword.is_word, vword.is_multiple_words, vword.word_lemma) == (True, True, "go home")
+    vword = parser_tool.to_vword(words[0])
+    assert (vword.word_string, vword.word_tokens, vword.word_db_id) == ("I", ["I"], -1)
+    for word in (words[0], words[3]):
+        vword_struct = msgspec.convert(parser_tool.to_vword(word), VWordStruct, from_attributes=True)
+        assert parser_tool.to_vword_struct(word) == vword_struct
@@ -0,0 +1,22 @@
+import pytest
+
+from app.domain.parser.language_parsers.vocabulary import UNKNOWN_ID, Vocabulary, normalize_token
+
+
+def test_vocabulary_roundtrip() -> None:
+    vocabulary = Vocabulary({"have": 3, "to": 7})
+    token_ids = vocabulary.encode(["have", "to", "go"])
+    assert token_ids.typecode == "I"
+    assert list(token_ids) == [3, 7, UNKNOWN_ID]
+    assert vocabulary.decode(token_ids[:2]) == ["have", "to"]
+    assert vocabulary.get_token(UNKNOWN_ID) is None
+    with pytest.raises(KeyError):
+        vocabulary.get_id("go")
+
+
+def test_vocabulary_keys_are_normalized() -> None:
+    decomposed = "cafe\u0301"
+    assert normalize_token(decomposed) == "caf\u00e9"
+    vocabulary = Vocabulary({normalize_token(decomposed): 1})
+    assert vocabulary.get_id(decomposed) == vocabulary.get_id("caf\u00e9") == 1
+    assert vocabulary.decode([1]) == ["caf\u00e9"]